@@ -5,9 +5,16 @@ from rectangle_packing.excel_parser import ExcelParser
 from rectangle_packing.database_manager import DatabaseManager
 
 import cProfile
+import argparse
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--deadline", type=float, default=None, help="stack all orders automatically and commit the best layout after this many seconds")
+    parser.add_argument("--millimeters", action="store_true", help="stack the exact sizes on millimeters in one pass")
+    args = parser.parse_args()
+
     stacker = Stacker()
+    stacker.setStackOnMillimeters(args.millimeters)
     excel_parser = ExcelParser("./example/paklijsten/", "paklijst.xlsx")
     grid = Grid(name="0", width=130, height=1500, brand="Ambiant", color="2400.0205")
     grid.setDxfDrawing("./example/grids/", "example.dxf")
@@ -21,7 +28,10 @@ if __name__ == "__main__":
     stacker.setGrid(grid)
     
     prof.enable()
-    stacker.start(automatic=False)
+    if args.deadline is None:
+        stacker.start(automatic=False)
+    else:
+        stacker.start(automatic=True, deadline=args.deadline)
     prof.disable()
 
     prof.print_stats()
@@ -241,6 +241,27 @@ class Gui(QWidget):
         self.fill_orders_with_smaller_in_larger_grid_widths_radiobutton.setChecked(True)
         layout.addWidget(self.fill_orders_with_smaller_in_larger_grid_widths_radiobutton)
 
+        self.stack_on_millimeters_checkbox = QCheckBox("Stack on millimeters")
+        layout.addWidget(self.stack_on_millimeters_checkbox)
+
+        # identical orders are stacked together as one block of rows and columns
+        self.tile_identical_orders_checkbox = QCheckBox("Stack identical orders as a tile")
+        layout.addWidget(self.tile_identical_orders_checkbox)
+
+        # independent brands, colors and grid widths are stacked in one process per core, the default is one process
+        self.stack_in_parallel_checkbox = QCheckBox("Stack in parallel on all cores")
+        layout.addWidget(self.stack_in_parallel_checkbox)
+
+        # new packing lists first fill the gaps of the grids that are not cut yet
+        self.fill_open_grids_checkbox = QCheckBox("Fill gaps of open grids first")
+        layout.addWidget(self.fill_open_grids_checkbox)
+
+        # empty deadline means stacking until all orders are stacked
+        deadline_label = QLabel("Deadline (min)")
+        self.deadline_line_edit = QLineEdit("")
+        layout.addWidget(deadline_label)
+        layout.addWidget(self.deadline_line_edit)
+
         code_status_label = QLabel("Status")
         self.code_status_line_edit = QLineEdit()
 
@@ -413,6 +434,7 @@ class Gui(QWidget):
         popup_message = ""
         popup_message += str(self.stacker.getDataLogger().getSuccessfullyStackedRectangles()) + "/" + str(self.stacker.getDataLogger().getTotalRectanglesToStack()) + " succesfully stacked orders \n \n"
         popup_message += "Total execution time is " + str(round(self.stacker.getDataLogger().getTotalExecutionTime()/60, 2)) + "min \n \n"
+        popup_message += "Estimated cut time is " + str(round(self.stacker.getDataLogger().getTotalCutTime()/60, 2)) + "min \n \n"
         popup_message += str(self.stacker.getDataLogger().getAmountOfErrors()) + " error(s) occured: \n"
         if self.stacker.getDataLogger().getAmountOfErrors() > 0:
             for error in self.stacker.getDataLogger().getErrorData():
@@ -444,9 +466,21 @@ class Gui(QWidget):
         else:
             self.stacker.setFillOrdersWithSmallerGridWidths(False)
 
+    def getDeadline(self):
+        try:
+            return float(self.deadline_line_edit.text()) * 60
+        except ValueError:
+            return None
+
     def loadOrdersCreateNecessaryGridsAndStartStacking(self):
         self.updateCodeStatus("Creating grids, stacking and exporting. Please wait...")
-        self.stacker.start(automatic=True)
+        if self.stack_in_parallel_checkbox.isChecked():
+            self.stacker.setNumProcesses(os.cpu_count())
+        else:
+            self.stacker.setNumProcesses(1)
+        self.stacker.setTileIdenticalRectangles(self.tile_identical_orders_checkbox.isChecked())
+        self.stacker.setStackOnMillimeters(self.stack_on_millimeters_checkbox.isChecked())
+        self.stacker.start(automatic=True, deadline=self.getDeadline(), incremental=self.fill_open_grids_checkbox.isChecked())
         self.refreshGrids()
         self.refreshNewOrders()
         self.updateCodeStatus("Done with automatic stacking!")
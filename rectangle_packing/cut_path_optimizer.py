@@ -0,0 +1,139 @@
+from rectangle_packing.geometry import Geometry
+
+import numpy as np
+import time
+
+class CutPathOptimizer(object):
+    """
+    Orders the cut paths of a grid and chooses the direction every path is cut in, to reduce the travel of the knife between
+    the paths. A path is a sequence of points, like a polyline. A nearest neighbour route from the start point is improved with
+    2-opt moves: reversing a part of the route also reverses the direction of its paths, so only the travel at both ends of that
+    part changes.
+    """
+
+    def __init__(self, max_passes=50, time_limit=5):
+        self.setMaxPasses(max_passes)
+        self.setTimeLimit(time_limit)
+
+    def setMaxPasses(self, max_passes):
+        self.max_passes = max_passes
+
+    def getMaxPasses(self):
+        return self.max_passes
+
+    def setTimeLimit(self, seconds):
+        self.time_limit = seconds
+
+    def getTimeLimit(self):
+        return self.time_limit
+
+    def optimize(self, paths, start_point=(0, 0)):
+        """
+        Returns the paths as a list of (path, is_reversed) in cutting order, a reversed path is cut from its last point to its
+        first point
+        """
+
+        if len(paths) == 0:
+            return []
+
+        start_points = np.array([path[0] for path in paths], dtype=float)
+        end_points = np.array([path[-1] for path in paths], dtype=float)
+
+        order, is_reversed = self.computeNearestNeighbourPath(start_points, end_points, start_point)
+        order, is_reversed = self.improveWithTwoOpt(start_points, end_points, order, is_reversed, start_point)
+
+        return [(paths[i], bool(reverse)) for i, reverse in zip(order, is_reversed)]
+
+    def computeNearestNeighbourPath(self, start_points, end_points, start_point):
+        """
+        Cuts the path with the closest first or last point next, starting at start_point
+        """
+
+        num_paths = len(start_points)
+        is_cut = np.zeros(num_paths, dtype=bool)
+        position = np.array(start_point, dtype=float)
+
+        order = []
+        is_reversed = []
+        for _ in range(num_paths):
+            distances_to_start = np.where(is_cut, np.inf, np.linalg.norm(start_points - position, axis=1))
+            distances_to_end = np.where(is_cut, np.inf, np.linalg.norm(end_points - position, axis=1))
+
+            i = int(np.argmin(distances_to_start))
+            j = int(np.argmin(distances_to_end))
+
+            # on equal distance the path is cut in its own direction
+            if distances_to_end[j] < distances_to_start[i] - Geometry.tolerance:
+                order.append(j)
+                is_reversed.append(True)
+                position = start_points[j]
+                is_cut[j] = True
+            else:
+                order.append(i)
+                is_reversed.append(False)
+                position = end_points[i]
+                is_cut[i] = True
+
+        return np.array(order), np.array(is_reversed)
+
+    def improveWithTwoOpt(self, start_points, end_points, order, is_reversed, start_point):
+        """
+        Reverses the part of the route between position i and j when that shortens the travel into position i and out of
+        position j, until no reversal improves the route or the pass or time limit is reached
+        """
+
+        order = order.copy()
+        is_reversed = is_reversed.copy()
+        entries, exits = self.getEntriesAndExits(start_points, end_points, order, is_reversed)
+
+        num_paths = len(order)
+        deadline = time.time() + self.time_limit
+        start_point = np.array(start_point, dtype=float)
+
+        for _ in range(self.max_passes):
+            is_improved = False
+
+            for i in range(num_paths):
+                previous_exit = exits[i - 1] if i > 0 else start_point
+
+                # travel into i and out of every j >= i, the route ends after the last path
+                j = np.arange(i, num_paths)
+                next_entries = entries[np.minimum(j + 1, num_paths - 1)]
+                has_next = (j + 1 < num_paths)
+
+                old_travel = np.linalg.norm(entries[i] - previous_exit) + np.where(has_next, np.linalg.norm(next_entries - exits[j], axis=1), 0)
+                new_travel = np.linalg.norm(exits[j] - previous_exit, axis=1) + np.where(has_next, np.linalg.norm(next_entries - entries[i], axis=1), 0)
+
+                k = int(np.argmax(old_travel - new_travel))
+                if old_travel[k] - new_travel[k] > Geometry.tolerance:
+                    j = i + k
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    is_reversed[i:j + 1] = ~is_reversed[i:j + 1][::-1]
+                    entries[i:j + 1], exits[i:j + 1] = exits[i:j + 1][::-1].copy(), entries[i:j + 1][::-1].copy()
+                    is_improved = True
+
+            if not is_improved or time.time() > deadline:
+                break
+
+        return order, is_reversed
+
+    def getEntriesAndExits(self, start_points, end_points, order, is_reversed):
+        entries = np.where(is_reversed[:, None], end_points[order], start_points[order])
+        exits = np.where(is_reversed[:, None], start_points[order], end_points[order])
+
+        return entries, exits
+
+    @staticmethod
+    def computeTravelDistance(cut_paths, start_point=(0, 0)):
+        """
+        Returns the distance the knife travels between the (path, is_reversed) paths, starting at start_point
+        """
+
+        if len(cut_paths) == 0:
+            return 0.0
+
+        entries = np.array([path[-1] if reverse else path[0] for path, reverse in cut_paths], dtype=float)
+        exits = np.array([path[0] if reverse else path[-1] for path, reverse in cut_paths], dtype=float)
+        previous_exits = np.vstack([np.array(start_point, dtype=float), exits[:-1]])
+
+        return float(np.linalg.norm(entries - previous_exits, axis=1).sum())
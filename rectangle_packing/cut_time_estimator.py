@@ -0,0 +1,45 @@
+class Error(Exception):
+    """Base class for other exceptions"""
+    pass
+
+class InvalidFeedRateError(Error):
+    """Raised when a feed rate is not larger than zero"""
+    pass
+
+class CutTimeEstimator(object):
+    """
+    Estimates the time a grid takes on the cutter from the length that is cut, the distance the knife travels raised between the
+    cuts and the number of times the knife is lowered and raised. Speeds are in millimeters per second, times in seconds.
+    """
+
+    def __init__(self, cut_speed=200, travel_speed=600, pen_lift_time=0.5):
+        self.setCutSpeed(cut_speed)
+        self.setTravelSpeed(travel_speed)
+        self.setPenLiftTime(pen_lift_time)
+
+    def setCutSpeed(self, cut_speed):
+        if cut_speed <= 0:
+            raise InvalidFeedRateError
+
+        self.cut_speed = cut_speed
+
+    def getCutSpeed(self):
+        return self.cut_speed
+
+    def setTravelSpeed(self, travel_speed):
+        if travel_speed <= 0:
+            raise InvalidFeedRateError
+
+        self.travel_speed = travel_speed
+
+    def getTravelSpeed(self):
+        return self.travel_speed
+
+    def setPenLiftTime(self, pen_lift_time):
+        self.pen_lift_time = pen_lift_time
+
+    def getPenLiftTime(self):
+        return self.pen_lift_time
+
+    def estimateCutTime(self, cut_length, travel_distance, num_pen_lifts):
+        return cut_length / self.cut_speed + travel_distance / self.travel_speed + num_pen_lifts * self.pen_lift_time
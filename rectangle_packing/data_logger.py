@@ -5,6 +5,7 @@ class DataLogger(object):
         
         self.setStoragePath(Helper.createAndGetFolderOnDesktop("log"))
         self.error_data = []
+        self.cut_metrics = []
 
     def setTotalExecutionTime(self, time):
         self.total_execution_time = time
@@ -44,12 +45,38 @@ class DataLogger(object):
 
     def getAmountOfErrors(self):
         return len(self.error_data)
+
+    def addCutMetrics(self, metrics):
+        self.cut_metrics.append(metrics)
+
+    def getCutMetrics(self):
+        return self.cut_metrics
+
+    def clearCutMetrics(self):
+        self.cut_metrics = []
+
+    def getTotalCutTime(self):
+        return sum(metrics["cut_time"] for metrics in self.cut_metrics)
+
+    def cutMetricsToString(self):
+        """
+        Lists the exported grids with the longest estimated cut time first
+        """
+
+        data_string = "Estimated cut time of " + str(len(self.cut_metrics)) + " grids is " + str(round(self.getTotalCutTime()/60, 2)) + "min \n"
+        for metrics in sorted(self.cut_metrics, key=lambda metrics: metrics["cut_time"], reverse=True):
+            data_string += ("Grid " + str(metrics["grid"]) + ": " + str(round(metrics["cut_time"]/60, 2)) + "min, " +
+                str(round(metrics["cut_length"]/1000, 2)) + "m cut, " + str(metrics["pen_lifts"]) + " pen lifts, " +
+                str(round(metrics["travel_distance"]/1000, 2)) + "m travel \n")
+
+        return data_string
     
     def dataToString(self):
         try:
             data_string = ""
             data_string += str(self.getTotalRectanglesToStack()) + "/" + str(self.getSuccessfullyStackedRectangles()) + " succesfully stacked orders \n \n"
             data_string += "Total execution time is " + str(round(self.getTotalExecutionTime()/60, 2)) + "min \n \n"
+            data_string += self.cutMetricsToString() + "\n"
             data_string += str(self.getAmountOfErrors()) + " amount of errors occured: \n"
             if self.getAmountOfErrors() > 0:
                 for error in self.getErrorData():
@@ -93,56 +93,65 @@ class DatabaseManager(object):
         
         return names
 
-    def createUniqueGrid(self, width, height=None, article_name='', material='kokos', brand='kokos', color='naturel'):
-        
+    def getStandardHeight(self, width, material='kokos', brand='kokos'):
+        """
+        Returns the standard height of a grid with the width, brand and material
+        """
+
         brand_lower_case = brand.lower()
         material_lower_case = material.lower()
 
+        if brand_lower_case == 'kokos' and width == 100:
+            height = 1225
+        elif brand_lower_case == 'kokos' and width == 200:
+            height = 600
+
+        # ambiant except lobby
+        elif brand_lower_case == 'ambiant' and material_lower_case.split()[1] != 'lobby' and width == 123:
+            height = 975
+        elif brand_lower_case == 'ambiant' and material_lower_case.split()[1] != 'lobby' and width == 193:
+            height = 600   
+        
+        # ambiant lobby
+        elif brand_lower_case == 'ambiant' and material_lower_case.split()[1] == 'lobby' and width == 123:
+            height = 975     
+        elif brand_lower_case == 'ambiant' and material_lower_case.split()[1] == 'lobby' and width == 200:
+            height = 600  
+
+        # forbo
+        elif brand_lower_case.split()[0] == 'forbo' and width == 98:
+            height = 975
+        elif brand_lower_case.split()[0] == 'forbo' and width == 148:
+            height = 975
+        elif brand_lower_case.split()[0] == 'forbo' and width == 198:
+            height = 600
+
+        # zeno protect
+        elif brand_lower_case.split()[0] == 'zeno' and width == 98:
+            height = 975
+        elif brand_lower_case.split()[0] == 'zeno' and width == 198:
+            height = 600
+
+        # ondervloer
+        elif brand_lower_case == 'ondervloer 5 mm' and width == 135:
+            height = 700
+        elif brand_lower_case == 'ondervloer 3,6 mm' and width == 130:
+            height = 1100
+
+        elif brand_lower_case.split()[0] == 'squid' and width == 137:
+            height = 1500
+        
+        # TODO: might want to throw an exception here
+        else:
+            height = 980
+
+        return height
+
+    def createUniqueGrid(self, width, height=None, article_name='', material='kokos', brand='kokos', color='naturel'):
+
         # only do this when the height is not specified
         if height == None:
-            if brand_lower_case == 'kokos' and width == 100:
-                height = 1225
-            elif brand_lower_case == 'kokos' and width == 200:
-                height = 600
-
-            # ambiant except lobby
-            elif brand_lower_case == 'ambiant' and material_lower_case.split()[1] != 'lobby' and width == 123:
-                height = 975
-            elif brand_lower_case == 'ambiant' and material_lower_case.split()[1] != 'lobby' and width == 193:
-                height = 600   
-            
-            # ambiant lobby
-            elif brand_lower_case == 'ambiant' and material_lower_case.split()[1] == 'lobby' and width == 123:
-                height = 975     
-            elif brand_lower_case == 'ambiant' and material_lower_case.split()[1] == 'lobby' and width == 200:
-                height = 600  
-
-            # forbo
-            elif brand_lower_case.split()[0] == 'forbo' and width == 98:
-                height = 975
-            elif brand_lower_case.split()[0] == 'forbo' and width == 148:
-                height = 975
-            elif brand_lower_case.split()[0] == 'forbo' and width == 198:
-                height = 600
-
-            # zeno protect
-            elif brand_lower_case.split()[0] == 'zeno' and width == 98:
-                height = 975
-            elif brand_lower_case.split()[0] == 'zeno' and width == 198:
-                height = 600
-
-            # ondervloer
-            elif brand_lower_case == 'ondervloer 5 mm' and width == 135:
-                height = 700
-            elif brand_lower_case == 'ondervloer 3,6 mm' and width == 130:
-                height = 1100
-
-            elif brand_lower_case.split()[0] == 'squid' and width == 137:
-                height = 1500
-            
-            # TODO: might want to throw an exception here
-            else:
-                height = 980
+            height = self.getStandardHeight(width, material, brand)
 
         try:
             used_names = self.listUsedGridNames()
@@ -176,20 +185,39 @@ class DatabaseManager(object):
         is_cut = grid.isCut()
 
         return { "name": name, "width": width, "height": height, "article_name": article_name, "material": material, "brand": brand, "color": color, "numRectangles" : num_rectangles, "isFull" : is_full, "isCut": is_cut}
+
+    def createGridFromDocument(self, document):
+        return Grid(width=document['width'], height=document['height'], name=document['name'], article_name=document['article_name'], material=document['material'], brand=document['brand'], color=document['color'], is_cut=document['isCut'])
+
+    def createRectangleFromDocument(self, document, for_cutting=False):
+        """ 
+        Parameters 
+        ----------
+        for_cutting: use the exact sizes (in mm) instead of the sizes rounded to centimeters
+        """
+
+        if for_cutting:
+            width = document['exact_width']
+            height = document['exact_height']
+        else:
+            width = document['width']
+            height = document['height']
+
+        return Rectangle(width=width, height=height, name=document['name'], article_name=document['article_name'], material=document['material'], brand=document['brand'], color=document['color'], grid_width=document['grid_width'], position=[document['x position'], document['y position']], grid_number=document['grid_number'], is_stacked=document['isStacked'], client_name=document['client_name'], coupage_batch=document["coupage_batch"], exact_width=document['exact_width'], exact_height=document['exact_height'], is_rotated=document.get('isRotated', False))
     
     def convertGridsNotCutToDxf(self):
         grids_not_cut = self.getGridsNotCut()
         for grid in grids_not_cut:
             grid.toDxf()        
 
-    def getGridsNotCut(self, sort=False):
+    def getGridsNotCut(self, sort=False, for_cutting=False):
         grids = []
 
         cursor = self.grids_collection.find({})
         for document in cursor:
             print("getGridsNotCut material = " + str(document['material']))
-            grid = Grid(width=document['width'], height=document['height'], name=document['name'], article_name=document['article_name'], material=document['material'], color=document['color'], brand=document['brand'], is_cut=document['isCut'])
-            rectangles = self.getRectangles(grid)
+            grid = self.createGridFromDocument(document)
+            rectangles = self.getRectangles(grid, for_cutting)
             grid.setStackedRectangles(rectangles)
             
             if not grid.isCut():
@@ -218,7 +246,7 @@ class DatabaseManager(object):
         cursor = self.grids_collection.find(query)
         for document in cursor:
             print(document)
-            grid = Grid(width=document['width'], height=document['height'], brand=document['brand'], article_name=document['article_name'], material=document['material'], color=document['color'], name=document['name'], is_cut=document['isCut'])
+            grid = self.createGridFromDocument(document)
             rectangles = self.getRectangles(grid)
             grid.setStackedRectangles(rectangles)
             
@@ -233,7 +261,7 @@ class DatabaseManager(object):
 
         cursor = self.grids_collection.find({})
         for document in cursor:
-            grid = Grid(width=document['width'], height=document['height'], brand=document['brand'], article_name=document['article_name'], material=document['material'], color=document['color'], name=document['name'], is_cut=document['isCut'])
+            grid = self.createGridFromDocument(document)
             rectangles = self.getRectangles(grid)
             grid.setStackedRectangles(rectangles)
             
@@ -256,7 +284,7 @@ class DatabaseManager(object):
     
         cursor = self.grids_collection.find(query)
         for document in cursor:
-            grid = Grid(width=document['width'], height=document['height'], article_name=document['article_name'], material=document['material'], brand=document['brand'], color=document['color'], name=document['name'], is_cut=document['isCut'])
+            grid = self.createGridFromDocument(document)
             rectangles = self.getRectangles(grid)
             grid.setStackedRectangles(rectangles)
             
@@ -273,7 +301,7 @@ class DatabaseManager(object):
 
         for document in cursor:
                 print("Loaded grid " + str(document["name"]) + " from database")
-                grid = Grid(width=document['width'], height=document['height'], article_name=document['article_name'], brand=document['brand'], material=document['material'], color=document['color'], name=document['name'], is_cut=document['isCut'])
+                grid = self.createGridFromDocument(document)
                 rectangles = self.getRectangles(grid)
                 grid.setStackedRectangles(rectangles)
                 grids.append(grid)
@@ -291,7 +319,7 @@ class DatabaseManager(object):
 
         cursor = self.grids_collection.find(query)
         for document in cursor:
-            grid = Grid(width=document['width'], height=document['height'], article_name=document['article_name'], brand=document['brand'], material=document['material'], color=document['color'], name=document['name'], is_cut=document['isCut'])
+            grid = self.createGridFromDocument(document)
             if for_cutting == True:
                 rectangles = self.getRectangles(grid, for_cutting)
             else:
@@ -310,7 +338,7 @@ class DatabaseManager(object):
 
             for document in cursor:
                     print("Loaded grid " + str(document["name"]) + " from database")
-                    grid = Grid(width=document['width'], height=document['height'], article_name=document['article_name'], material=document['material'], brand=document['brand'], color=document['color'], name=document['name'], is_cut=document['isCut'])
+                    grid = self.createGridFromDocument(document)
                     rectangles = self.getRectangles(grid)
                     grid.setStackedRectangles(rectangles)
                     
@@ -323,8 +351,8 @@ class DatabaseManager(object):
         return grids
 
     def createRectangleDocument(self, rectangle):
-        width = rectangle.getWidth()
-        height = rectangle.getHeight()
+        width = rectangle.getExactWidth()
+        height = rectangle.getExactHeight()
         material = rectangle.getMaterial()
         article_name = rectangle.getArticleName()
         print("Article name set in database: " + str(article_name))
@@ -339,6 +367,7 @@ class DatabaseManager(object):
         grid_number = rectangle.getGridNumber()
         client_name = rectangle.getClientName()
         coupage_batch = rectangle.getCoupageBatch()
+        is_rotated = rectangle.isRotated()
 
         # ceiled with height needed to first stack the rectangles on cm accuracy
         w = int(np.ceil(width))
@@ -352,7 +381,7 @@ class DatabaseManager(object):
         # if h % 2 > 0:
         #     h += 1
         
-        return { "name": name, "width": w , "height": h, "exact_width": width, "exact_height": height, "article_name": article_name, "material": material, "brand": brand, "color": color, "x position": int(position[0]), "y position": int(position[1]), "isStacked": is_stacked, "grid_number": grid_number, 'grid_width': grid_width, 'quantity': quantity, 'client_name': client_name, "coupage_batch": coupage_batch}
+        return { "name": name, "width": w , "height": h, "exact_width": width, "exact_height": height, "article_name": article_name, "material": material, "brand": brand, "color": color, "x position": self.roundPosition(position[0]), "y position": self.roundPosition(position[1]), "isStacked": is_stacked, "grid_number": grid_number, 'grid_width': grid_width, 'quantity': quantity, 'client_name': client_name, "coupage_batch": coupage_batch, "isRotated": is_rotated}
 
     def addGrid(self, grid):
         document = self.createGridDocument(grid)
@@ -405,12 +434,8 @@ class DatabaseManager(object):
         query = {"name" : str(rectangle_number)}
 
         document = self.rectangles_collection.find_one(query)
-        if not for_cutting:
-            rectangle = Rectangle(width=document['width'], height=document['height'], name=document['name'], article_name=document['article_name'], material=document['material'], brand=document['brand'], color=document['color'], grid_width=document['grid_width'], position=[document['x position'], document['y position']], grid_number=document['grid_number'], is_stacked=document['isStacked'], client_name=document['client_name'], coupage_batch=document["coupage_batch"])
-        else: 
-            rectangle = Rectangle(width=document['exact_width'], height=document['exact_height'], name=document['name'], article_name=document['article_name'], material=document['material'], brand=document['brand'], color=document['color'], grid_width=document['grid_width'], position=[document['x position'], document['y position']], grid_number=document['grid_number'], is_stacked=document['isStacked'], client_name=document['client_name'], coupage_batch=document["coupage_batch"])
 
-        return rectangle        
+        return self.createRectangleFromDocument(document, for_cutting)        
 
 
     def getRectangles(self, grid, for_cutting = False, sort = False):
@@ -426,10 +451,7 @@ class DatabaseManager(object):
 
         rectangles = []
         for rectangle in rectangles_dict:
-            if for_cutting == True:
-                rectangles.append(Rectangle(rectangle['exact_width'], rectangle['exact_height'], rectangle['name'], article_name=rectangle['article_name'], material=rectangle['material'], brand=rectangle['brand'], color=rectangle['color'], position=[rectangle['x position'], rectangle['y position']], grid_number=rectangle['grid_number'], is_stacked=rectangle['isStacked'], client_name=rectangle['client_name'], coupage_batch=rectangle["coupage_batch"]))
-            else:
-                rectangles.append(Rectangle(rectangle['width'], rectangle['height'], rectangle['name'], article_name=rectangle['article_name'], material=rectangle['material'], brand=rectangle['brand'], color=rectangle['color'], position=[rectangle['x position'], rectangle['y position']], grid_number=rectangle['grid_number'], is_stacked=rectangle['isStacked'], client_name=rectangle['client_name'], coupage_batch=rectangle["coupage_batch"]))
+            rectangles.append(self.createRectangleFromDocument(rectangle, for_cutting))
             print("Rectangle " + str(rectangle['name']) + " loaded from database")
         return rectangles
     
@@ -474,10 +496,7 @@ class DatabaseManager(object):
 
         rectangles = []
         for rectangle in rectangles_dict:
-            if not for_cutting:
-                rectangles.append(Rectangle(width=rectangle['width'], height=rectangle['height'], name=rectangle['name'], article_name=rectangle['article_name'], material=rectangle['material'], brand=rectangle['brand'], color=rectangle['color'], grid_width=rectangle['grid_width'],client_name=rectangle['client_name'], coupage_batch=rectangle["coupage_batch"]))
-            elif for_cutting:
-                rectangles.append(Rectangle(width=rectangle['exact_width'], height=rectangle['exact_height'], name=rectangle['name'], article_name=rectangle['article_name'], material=rectangle['material'], brand=rectangle['brand'], color=rectangle['color'], grid_width=rectangle['grid_width'],client_name=rectangle['client_name'], coupage_batch=rectangle["coupage_batch"]))
+            rectangles.append(self.createRectangleFromDocument(rectangle, for_cutting))
 
         return rectangles
     
@@ -489,19 +508,27 @@ class DatabaseManager(object):
         print()
         print()
         query = {"name" : grid.getName()}
-
-        new_values = { "$set": { "numRectangles" : grid.getNumStackedRectangles() + 1 ,
-            "isCut": grid.isCut(), "height": grid.getHeight(),
-            "width": grid.getWidth()} }
+        new_values = { "$set": self.createGridUpdate(grid) }
 
         self.grids_collection.update_one(query, new_values)
+
+    def createGridUpdate(self, grid):
+        return { "numRectangles" : grid.getNumStackedRectangles(), "isCut": grid.isCut(), "height": grid.getHeight(), "width": grid.getWidth() }
     
     def updateRectangle(self, rectangle):
         print("Updating rectangle " + str(rectangle.getName()) + " in database")
         query = {"name" : rectangle.getName()}
-        
-        width = rectangle.getWidth()
-        height = rectangle.getHeight()
+        new_values = { "$set": self.createRectangleUpdate(rectangle) }
+
+        self.rectangles_collection.update_one(query, new_values)
+
+    def roundPosition(self, value):
+        # the edges are on whole millimeters, so a center on half a millimeter needs three decimals in centimeters
+        return round(float(value), 3)
+
+    def createRectangleUpdate(self, rectangle):
+        width = rectangle.getExactWidth()
+        height = rectangle.getExactHeight()
         w = int(np.ceil(width))
         h = int(np.ceil(height))
         
@@ -512,8 +539,7 @@ class DatabaseManager(object):
             h += 1
 
         print(width, height)
-        new_values = { "$set": { "grid_number" : rectangle.getGridNumber(), "x position" : int(rectangle.getPosition()[0]), "y position": int(rectangle.getPosition()[1]), "isStacked": rectangle.isStacked(), 'width': w, 'height': h, 'exact_width': width, 'exact_height': height } }
-        self.rectangles_collection.update_one(query, new_values)
+        return { "grid_number" : rectangle.getGridNumber(), "x position" : self.roundPosition(rectangle.getPosition()[0]), "y position": self.roundPosition(rectangle.getPosition()[1]), "isStacked": rectangle.isStacked(), 'width': w, 'height': h, 'exact_width': width, 'exact_height': height, "isRotated": rectangle.isRotated() }
     
     def emptyGrid(self, grid):
         rectangles = self.getRectangles(grid)
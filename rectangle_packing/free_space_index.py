@@ -0,0 +1,103 @@
+from rectangle_packing.geometry import Geometry
+
+import numpy as np
+
+class FreeSpaceIndex(object):
+    """
+    Maximal free rectangles (MaxRects) of a grid. Every free rectangle is stored as [x_start, y_start, x_end, y_end], the union of
+    them is the free area of the grid and none of them is contained in another one. Any rectangle that fits somewhere in the grid
+    fits in at least one of the free rectangles.
+    """
+
+    def __init__(self, width, height, rectangles=[]):
+        self.width = width
+        self.height = height
+        self.free_rectangles = np.array([[0, 0, width, height]], dtype=float)
+
+        for rectangle in rectangles:
+            self.addRectangle(rectangle)
+
+    def getHeight(self):
+        return self.height
+
+    def setHeight(self, height, rectangles=[]):
+        """
+        Changes the height of the grid without building the free rectangles again. A lower grid cuts off the free rectangles.
+        In a higher grid the free rectangles that touch the old top are extended, because the grid above the old top is free
+        except for the given rectangles that stick out above it, these are added again.
+        """
+
+        free_rectangles = self.free_rectangles.copy()
+
+        if height > self.height:
+            touches_top = free_rectangles[:, 3] >= self.height - Geometry.tolerance
+            free_rectangles[touches_top, 3] = height
+            free_rectangles = np.vstack([free_rectangles, [[0, self.height, self.width, height]]])
+        else:
+            free_rectangles[:, 3] = np.minimum(free_rectangles[:, 3], height)
+            free_rectangles = free_rectangles[free_rectangles[:, 3] - free_rectangles[:, 1] > Geometry.tolerance]
+
+        self.height = height
+        self.free_rectangles = self.removeContainedRectangles(free_rectangles)
+
+        for rectangle in rectangles:
+            self.addRectangle(rectangle)
+
+    def getFreeRectangles(self):
+        return self.free_rectangles
+
+    def getNumFreeRectangles(self):
+        return len(self.free_rectangles)
+
+    def addRectangle(self, rectangle):
+        x_start, y_start = rectangle.getBottomLeft()
+        x_end, y_end = rectangle.getTopRight()
+
+        free_rectangles = self.free_rectangles
+        is_intersecting = ((free_rectangles[:, 0] < x_end - Geometry.tolerance) & (free_rectangles[:, 2] > x_start + Geometry.tolerance) &
+            (free_rectangles[:, 1] < y_end - Geometry.tolerance) & (free_rectangles[:, 3] > y_start + Geometry.tolerance))
+
+        if not is_intersecting.any():
+            return
+
+        # split every intersecting free rectangle in the (at most) four free rectangles around the new rectangle
+        intersecting = free_rectangles[is_intersecting]
+        left = intersecting.copy()
+        left[:, 2] = x_start
+        right = intersecting.copy()
+        right[:, 0] = x_end
+        below = intersecting.copy()
+        below[:, 3] = y_start
+        above = intersecting.copy()
+        above[:, 1] = y_end
+
+        free_rectangles = np.vstack([free_rectangles[~is_intersecting], left, right, below, above])
+        is_not_empty = ((free_rectangles[:, 2] - free_rectangles[:, 0] > Geometry.tolerance) &
+            (free_rectangles[:, 3] - free_rectangles[:, 1] > Geometry.tolerance))
+
+        self.free_rectangles = self.removeContainedRectangles(free_rectangles[is_not_empty])
+
+    def removeContainedRectangles(self, free_rectangles):
+        # contains[i, j] is True when free rectangle j contains free rectangle i
+        contains = ((free_rectangles[None, :, 0] <= free_rectangles[:, None, 0] + Geometry.tolerance) &
+            (free_rectangles[None, :, 1] <= free_rectangles[:, None, 1] + Geometry.tolerance) &
+            (free_rectangles[None, :, 2] >= free_rectangles[:, None, 2] - Geometry.tolerance) &
+            (free_rectangles[None, :, 3] >= free_rectangles[:, None, 3] - Geometry.tolerance))
+        np.fill_diagonal(contains, False)
+
+        # of two equal free rectangles only the first one is kept
+        indices = np.arange(len(free_rectangles))
+        is_dominated = contains & (~contains.T | (indices[None, :] < indices[:, None]))
+
+        return free_rectangles[~is_dominated.any(axis=1)]
+
+    def getFreeRegions(self, width, height):
+        """
+        Returns the free rectangles that can hold a rectangle of width x height
+        """
+
+        free_rectangles = self.free_rectangles
+        can_hold = ((free_rectangles[:, 2] - free_rectangles[:, 0] >= width - Geometry.tolerance) &
+            (free_rectangles[:, 3] - free_rectangles[:, 1] >= height - Geometry.tolerance))
+
+        return free_rectangles[can_hold]
@@ -0,0 +1,80 @@
+import numpy as np
+
+class Geometry(object):
+    """
+    Integer millimeter geometry kernel. The edges of the stacked rectangles are on whole millimeters, so edges, lines and points
+    are represented exactly as int32 millimeters. Comparing them is an exact integer compare, which vectorizes over all the
+    rectangles of a grid without tolerances or rounding.
+
+    The kernel is only used at the boundary: Rectangle and Grid still store float centimeter positions, which are converted to
+    int32 millimeters for intersection tests, line overlap and export. Stacking is still done on centimeters first with the
+    optimization to millimeters at export by default, the single pass on millimeters is only used with stack on millimeters.
+    """
+
+    millimeters_per_centimeter = 10
+
+    # tolerance used when comparing or rounding (exact) floating point coordinates and distances in centimeters
+    tolerance = 1e-9
+
+    @staticmethod
+    def toMillimeters(value):
+        return np.rint(np.asarray(value, dtype=float) * Geometry.millimeters_per_centimeter).astype(np.int32)
+
+    @staticmethod
+    def toCentimeters(value):
+        return np.asarray(value) / Geometry.millimeters_per_centimeter
+
+    @staticmethod
+    def ceilToMillimeters(value):
+        """
+        Rounds centimeters up to whole millimeters, floating point noise below a micrometer is ignored
+        """
+
+        return np.ceil(np.round(np.asarray(value, dtype=float) * Geometry.millimeters_per_centimeter, 6)) / Geometry.millimeters_per_centimeter
+
+    @staticmethod
+    def getBounds(rectangles):
+        """
+        Returns the bounds [x_start, y_start, x_end, y_end] of the rectangles in millimeters
+        """
+
+        bounds = np.zeros((len(rectangles), 4), dtype=np.int32)
+        for i, rectangle in enumerate(rectangles):
+            bounds[i] = rectangle.getBoundsInMillimeters()
+
+        return bounds
+
+    @staticmethod
+    def intersects(bounds, other_bounds):
+        """
+        Returns True where the bounds overlap, touching edges are no overlap. Arrays of bounds are compared element wise with
+        numpy broadcasting.
+        """
+
+        bounds = np.asarray(bounds)
+        other_bounds = np.asarray(other_bounds)
+
+        return ((bounds[..., 0] < other_bounds[..., 2]) & (bounds[..., 2] > other_bounds[..., 0]) &
+            (bounds[..., 1] < other_bounds[..., 3]) & (bounds[..., 3] > other_bounds[..., 1]))
+
+    @staticmethod
+    def snapToMillimeters(rectangle):
+        """
+        Moves the rectangle up and to the right, by less than a millimeter, so its bottom left corner is on whole millimeters.
+        Rectangles with a millimeter size then have all their edges on whole millimeters.
+        """
+
+        bottom_left = rectangle.getBottomLeft()
+        rectangle.setPosition(rectangle.getPosition() + Geometry.ceilToMillimeters(bottom_left) - bottom_left)
+
+    @staticmethod
+    def getLength(polylines):
+        """
+        Returns the total length of the polylines, every polyline is an array of its points
+        """
+
+        if len(polylines) == 0:
+            return 0.0
+
+        segments = np.concatenate([np.diff(np.asarray(polyline, dtype=float), axis=0) for polyline in polylines])
+        return float(np.linalg.norm(segments, axis=1).sum())
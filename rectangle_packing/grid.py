@@ -3,6 +3,12 @@ from rectangle_packing.rectangle import Rectangle
 from rectangle_packing.helper import Helper
 from rectangle_packing.zcc_creator import ZccCreator
 from rectangle_packing.line import Line
+from rectangle_packing.polyline_chainer import PolylineChainer
+from rectangle_packing.geometry import Geometry
+from rectangle_packing.skyline import Skyline
+from rectangle_packing.free_space_index import FreeSpaceIndex
+from rectangle_packing.occupancy_map import OccupancyMap
+from rectangle_packing.spatial_index import SpatialIndex
 
 # external dependencies
 import numpy as np
@@ -29,7 +35,18 @@ class InvalidGridPositionError(Error):
     pass
 
 class Grid(object):
-    def __init__(self, width=-1, height=-1, name="-1", article_name='default', material='kokos', brand = "kokos", color = "naturel", stacked_rectangles = [], is_full = False, is_cut = False):
+    def __init__(self, width=-1, height=-1, name="-1", article_name='default', material='kokos', brand = "kokos", color = "naturel", stacked_rectangles = None, is_full = False, is_cut = False, create_dxf_drawing = True):
+        # the version changes on every change of the grid, sizes that do not fit are only remembered for one version
+        self.version = 0
+        self.no_fit_version = -1
+        self.no_fit_frontier = []
+
+        # spatial indices of the stacked rectangles, built when first needed
+        self.clearIndices()
+
+        if stacked_rectangles is None:
+            stacked_rectangles = []
+
         self.setWidth(width)
         self.setName(name)
         self.setHeight(height)
@@ -42,13 +59,17 @@ class Grid(object):
         self.is_full = is_full
         self.is_cut = is_cut
 
-        self.initEmptyDxfDrawing()
+        # grids that are only used to compute a layout do not create the DXF folder on disk
+        if create_dxf_drawing:
+            self.initEmptyDxfDrawing()
+        else:
+            self.dxf_drawing = None
         
         # used for removing duplicates
-        self.points = []
         self.lines = []
-        self.dxf_lines_without_overlap = []
+        self.dxf_polylines_without_overlap = []
         self.lines_without_overlap = []
+        self.polylines_without_overlap = []
 
     def setDxfDrawing(self, path, file_name):
         self.dxf_file_path = path + file_name
@@ -74,6 +95,7 @@ class Grid(object):
     
     def setWidth(self, width):
         self.width = int(width)
+        self.clearIndices()
 
     def getHeight(self):
         return self.height
@@ -82,6 +104,16 @@ class Grid(object):
         print("Setting height of grid " + str(self.getName()) + " to " + str(height))
         self.height = int(height)
 
+        # the skyline and the spatial index do not depend on the height, the free space index is cut off or extended
+        if self.free_space_index is not None:
+            lowest_height = min(self.free_space_index.getHeight(), self.height)
+            rectangles_above = [rectangle for rectangle in self.stacked_rectangles if rectangle.getTopLeft()[1] > lowest_height]
+            self.free_space_index.setHeight(self.height, rectangles_above)
+
+        self.occupancy_map = None
+        self.version += 1
+        self.warm_starts = {}
+
     def getName(self):
         return self.name
     
@@ -121,6 +153,136 @@ class Grid(object):
 
     def setStackedRectangles(self, rectangles):
         self.stacked_rectangles = rectangles
+        self.clearIndices()
+
+    def clearIndices(self):
+        self.skyline = None
+        self.free_space_index = None
+        self.occupancy_map = None
+        self.spatial_index = None
+        self.version += 1
+
+        # where the search for the next position of a size can resume, only valid while the grid does not get free space
+        self.warm_starts = {}
+
+    def getVersion(self):
+        return self.version
+
+    def addNotFittingSize(self, width, height):
+        """
+        Remembers that a rectangle of width x height does not fit in the current version of the grid. Only the smallest sizes
+        are kept: a size that is at least as wide and as tall as a size in the frontier does not fit either.
+        """
+
+        if self.no_fit_version != self.version:
+            self.no_fit_frontier = []
+            self.no_fit_version = self.version
+
+        if self.isKnownNotToFit(width, height):
+            return
+
+        self.no_fit_frontier = [size for size in self.no_fit_frontier if not (size[0] >= width and size[1] >= height)]
+        self.no_fit_frontier.append((width, height))
+
+    def isKnownNotToFit(self, width, height):
+        if self.no_fit_version != self.version:
+            return False
+
+        for size in self.no_fit_frontier:
+            if width >= size[0] and height >= size[1]:
+                return True
+
+        return False
+
+    def getSkyline(self):
+        if self.skyline is None:
+            self.skyline = Skyline(self.getWidth(), self.stacked_rectangles)
+
+        return self.skyline
+
+    def getFreeSpaceIndex(self):
+        if self.free_space_index is None:
+            self.free_space_index = FreeSpaceIndex(self.getWidth(), self.getHeight(), self.stacked_rectangles)
+
+        return self.free_space_index
+
+    def getFreeRegions(self, width, height):
+        """
+        Returns the maximal free rectangles [x_start, y_start, x_end, y_end] in which a rectangle of width x height fits
+        """
+
+        return self.getFreeSpaceIndex().getFreeRegions(width, height)
+
+    def hasFreeRegion(self, width, height):
+        return len(self.getFreeRegions(width, height)) > 0
+
+    def getCandidatePositions(self, width, height, on_millimeters=False):
+        """
+        Returns the centimeter positions [x, y] where a rectangle of width x height touches the grid border or a stacked rectangle
+        on its left side and on its bottom side, sorted on the distance to the origin. The position closest to the origin is
+        always one of these candidates, because a rectangle that does not touch anything can be moved closer.
+
+        on_millimeters: put the edges of the rectangle on whole millimeters instead of the center on whole centimeters
+        """
+
+        right_edges = np.array([0] + [rectangle.getTopRight()[0] for rectangle in self.stacked_rectangles])
+        top_edges = np.array([0] + [rectangle.getTopRight()[1] for rectangle in self.stacked_rectangles])
+
+        # an order as wide as the grid is centered, also when it has an odd width
+        if width == self.getWidth():
+            x = np.array([width / 2])
+        elif on_millimeters:
+            x = np.unique(Geometry.ceilToMillimeters(right_edges) + width/2)
+        else:
+            x = np.unique(np.ceil(right_edges + width/2 - Geometry.tolerance))
+
+        if on_millimeters:
+            y = np.unique(Geometry.ceilToMillimeters(top_edges) + height/2)
+        else:
+            y = np.unique(np.ceil(top_edges + height/2 - Geometry.tolerance))
+
+        x = x[x + width/2 <= self.getWidth() + Geometry.tolerance]
+        y = y[y + height/2 <= self.getHeight() + Geometry.tolerance]
+
+        x, y = np.meshgrid(x, y)
+        x = x.ravel()
+        y = y.ravel()
+
+        # on equal distance the position with the largest x comes first like in the brute force scan
+        order = np.lexsort((-x, x**2 + y**2))
+
+        return np.column_stack((x[order], y[order]))
+
+    def getWarmStart(self, width, height):
+        """
+        Returns (squared distance, x) of the last position found for a rectangle of width x height, the candidate positions
+        before it in the order of getCandidatePositions were not valid. None when there is no search to resume.
+        """
+
+        return self.warm_starts.get((width, height))
+
+    def setWarmStart(self, width, height, squared_distance, x):
+        self.warm_starts[(width, height)] = (squared_distance, x)
+
+    def getSpatialIndex(self):
+        if self.spatial_index is None:
+            self.spatial_index = SpatialIndex(self.stacked_rectangles)
+
+        return self.spatial_index
+
+    def getOccupancyMap(self):
+        if self.occupancy_map is None:
+            self.occupancy_map = OccupancyMap(self.getWidth(), self.getHeight(), self.stacked_rectangles)
+
+        return self.occupancy_map
+
+    def getFitMask(self, cells_width, cells_height):
+        """
+        Returns a mask where element [y, x] is True when a rectangle of cells_width x cells_height raster cells with its bottom
+        left corner in cell [y, x] does not overlap any occupied cell of the grid
+        """
+
+        return self.getOccupancyMap().getFitMask(cells_width, cells_height)
 
     def isEmpty(self):
         is_empty = (len(self.stacked_rectangles) == 0)
@@ -130,6 +292,7 @@ class Grid(object):
 
     def empty(self):
         self.stacked_rectangles = []
+        self.clearIndices()
         
     def isFull(self):
         return self.is_full
@@ -154,6 +317,23 @@ class Grid(object):
     def getArea(self):
         return self.width * self.height
 
+    def getCutLength(self):
+        """
+        Returns the length in millimeters of the polylines without overlap, the line at the top is added by the ZCC export
+        """
+
+        return Geometry.getLength(self.polylines_without_overlap)
+
+    def getNumPenLifts(self):
+        return len(self.polylines_without_overlap)
+
+    def getCutMetrics(self):
+        """
+        Returns the cut metrics of the last ZCC export of the grid
+        """
+
+        return self.zcc_creator.getCutMetrics()
+
     def getHighestVerticalPoint(self):
         highest_vertical_point = 0
         for rectangle in self.stacked_rectangles:
@@ -169,21 +349,49 @@ class Grid(object):
         if self.isOutOfGrid(rectangle):
             return False
         
-        for stacked_rectangle in self.stacked_rectangles:
+        return not self.getSpatialIndex().intersects(rectangle)
+    
+    def getStackedBounds(self):
+        """
+        Returns the bounds [x_start, y_start, x_end, y_end] of the stacked rectangles in millimeters
+        """
 
-            if rectangle.intersection(stacked_rectangle):
-                return False
+        return Geometry.getBounds(self.stacked_rectangles)
+
+    def getLeftClearance(self, rectangle):
+        """
+        Returns the distance in centimeters the rectangle can move to the left before it touches the grid border or a stacked
+        rectangle
+        """
+
+        x_start, y_start, x_end, y_end = rectangle.getBoundsInMillimeters()
+        bounds = self.getStackedBounds()
+
+        is_obstacle = (bounds[:, 1] < y_end) & (bounds[:, 3] > y_start) & (bounds[:, 2] <= x_start)
+
+        return float(Geometry.toCentimeters(max(np.min(x_start - bounds[is_obstacle, 2], initial=x_start), 0)))
+
+    def getBottomClearance(self, rectangle):
+        """
+        Returns the distance in centimeters the rectangle can move downwards before it touches the grid border or a stacked
+        rectangle
+        """
+
+        x_start, y_start, x_end, y_end = rectangle.getBoundsInMillimeters()
+        bounds = self.getStackedBounds()
+
+        is_obstacle = (bounds[:, 0] < x_end) & (bounds[:, 2] > x_start) & (bounds[:, 3] <= y_start)
+
+        return float(Geometry.toCentimeters(max(np.min(y_start - bounds[is_obstacle, 3], initial=y_start), 0)))
 
-        return True
-    
     def isOutOfGrid(self, rectangle):
-        if rectangle.getPosition()[0] - rectangle.getWidth()/2 < 0:
+        if rectangle.getPosition()[0] - rectangle.getWidth()/2 < -Geometry.tolerance:
             return True
-        if rectangle.getPosition()[1] + rectangle.getHeight()/2 > self.getHeight():
+        if rectangle.getPosition()[1] + rectangle.getHeight()/2 > self.getHeight() + Geometry.tolerance:
             return True
-        if rectangle.getPosition()[0] + rectangle.getWidth()/2 > self.getWidth():
+        if rectangle.getPosition()[0] + rectangle.getWidth()/2 > self.getWidth() + Geometry.tolerance:
             return True
-        if rectangle.getPosition()[1] - rectangle.getHeight()/2 < 0:
+        if rectangle.getPosition()[1] - rectangle.getHeight()/2 < -Geometry.tolerance:
             return True
     
         return False
@@ -208,7 +416,7 @@ class Grid(object):
             print("DXF file opened in another program")
     
     def isHeighestLine(self, line):
-        y_heighest = self.getHighestVerticalPoint()
+        y_heighest = Geometry.toMillimeters(self.getHighestVerticalPoint())
         
         if line.start_point[1] == y_heighest and line.end_point[1] == y_heighest:
             return True
@@ -216,10 +424,10 @@ class Grid(object):
             return False
         
     def addLargeHorizontalLineAtTop(self):
-        y_start = Helper.toMillimeters(self.getHighestVerticalPoint())
+        y_start = Geometry.toMillimeters(self.getHighestVerticalPoint())
         x_start = 0
-        y_end = Helper.toMillimeters(self.getHighestVerticalPoint())
-        x_end = Helper.toMillimeters(self.getWidth() + 20)
+        y_end = Geometry.toMillimeters(self.getHighestVerticalPoint())
+        x_end = Geometry.toMillimeters(self.getWidth() + 20)
 
         line = dxf.line((y_start, x_start), (y_end, x_end))
         self.dxf_drawing.add(line)
@@ -229,206 +437,108 @@ class Grid(object):
         self.lines = []
 
         for rectangle in self.stacked_rectangles:
-            self.lines.extend(rectangle.getLines())
-
-    def getVerticalLinesPerXValue(self, x):
-        result = []
-
-        for line in self.lines:
-            if round(line.start_point[0], 2) == x and round(line.end_point[0], 2) == x:
-                result.append(line)
-
-        return result
+            self.lines.extend(rectangle.getLinesInMillimeters())
 
-    def getHorizontalLinesPerYValue(self, y):
-        result = []
+    def getLinesPerCoordinate(self, axis):
+        """
+        Groups the lines in one pass: the horizontal lines (axis 1) on their y value or the vertical lines (axis 0) on their x value
+        """
 
+        lines_per_coordinate = {}
         for line in self.lines:
-            if round(line.start_point[1], 2) == y and round(line.end_point[1], 2) == y:
-                result.append(line)
+            if line.start_point[axis] == line.end_point[axis]:
+                lines_per_coordinate.setdefault(line.start_point[axis], []).append(line)
 
-        return result
+        return lines_per_coordinate
 
     """
-    1) Make an array containing the points of all the vertices in the grid. The x and y values are extracted and the unique x, and y values are calculated. 
-    2) Loop over the unique y values and if there are more than two points with the same y value but different x value, use the point with the highest x value as the end point x_end. If the value is lower
-    than the current start x value, this is chosen as starting value x_start.  
-    3) Loop over the unique x values and if there are more than two points with the same x value but different y value, use the point with the highest y value as y_end. Use the point with the lowest
-    y value as y_start
+    The lines of the rectangles are grouped on their coordinate: horizontal lines on their y value and vertical lines on their x value. The lines of one
+    coordinate are sorted on their start and merged in a single sweep, a line that starts before the end of the current merged line overlaps it.
+    The lines without overlap are then chained into polylines where they meet.
     """
     def removeOverlappingLines(self, for_prime_center=True):            
-        self.points = []
         self.lines = []
 
         self.convertRectanglesToLines()
-        self.convertRectanglesToPoints()
-
-        self.x_, self.y_ = self.getXYfromPointsAndRound()
-
-        self.x_unique = self.getUniqueValues(self.x_)
-        self.y_unique = self.getUniqueValues(self.y_)
 
         self.removeOverlappingHorizontalLines(for_prime_center)
         self.removeOverlappingVerticalLines(for_prime_center)
+        self.chainLinesWithoutOverlap(for_prime_center)
 
-    def convertRectanglesToPoints(self):
-        for rectangle in self.stacked_rectangles:
-            top_left, top_right, bottom_left, bottom_right = rectangle.getVertices()
-            self.points.append(tuple(top_left))
-            self.points.append(tuple(top_right))
-            self.points.append(tuple(bottom_left))
-            self.points.append(tuple(bottom_right))
-
-    def getXYfromPointsAndRound(self):
-        x_ = [round(k[0], 2) for k in self.points]
-        y_ = [round(k[1], 2) for k in self.points]
-        
-        return x_, y_
-    
-    def getUniqueValues(self, array):
-        return np.unique(array)
+    def mergeOverlappingLines(self, lines, axis):
+        """
+        Returns the lines with the overlapping lines merged along the axis, lines that only touch are not merged. A merged line
+        takes the place of the first of its lines, so the lines keep the order of the rectangles.
+        """
 
-    def thereAreOverlappingLines(self, lines):
-        if len(lines) == 1:
-            return False
+        merged_lines = []
+        for index in sorted(range(len(lines)), key=lambda k: lines[k].start_point[axis]):
+            line = lines[index]
 
-        for l1 in lines:
-            for l2 in lines:
-                if not (l1 == l2):
-                    if l1.overlaps(l2):
-                        return True
-        
-        print("No overlapping lines")
-        
-        return False
+            if len(merged_lines) > 0 and line.start_point[axis] < merged_lines[-1][1].end_point[axis]:
+                first_index, merged_line = merged_lines[-1]
+                if line.end_point[axis] > merged_line.end_point[axis]:
+                    merged_line.setEndPoint(line.end_point)
 
-    def removeOverlappingHorizontalLines(self, for_prime_center):
-        for y in self.y_unique:
-            horizontal_lines = self.getHorizontalLinesPerYValue(y)
+                merged_lines[-1] = (min(first_index, index), merged_line)
+            else:
+                merged_lines.append((index, Line(line.start_point, line.end_point)))
 
-            i = 0
-            j = 1
-            
-            while self.thereAreOverlappingLines(horizontal_lines):
-                
-                l1 = horizontal_lines[i]
-                l2 = horizontal_lines[j]
-                
-                if i != j:
-                    if l1.overlaps(l2):
-                        if l2.end_point[0] > l1.end_point[0]:
-                            l1.setEndPoint(l2.end_point)
-
-                        if l2.start_point[0] < l1.start_point[0]:
-                            l1.setStartPoint(l2.start_point)
-
-                        del horizontal_lines[j]
-
-                        i = 0
-                        j = 1
-                    else:
-                        if (j + 1 >= len(horizontal_lines)):
-                            if (i + 1 >= len(horizontal_lines)):
-                                break
-                            else:
-                                i += 1
-                                j = 0
-                        else:
-                            j += 1
-                else:
-                    if (j + 1 >= len(horizontal_lines)):
-                        if (i + 1 >= len(horizontal_lines)):
-                            break
-                        else:
-                            i += 1
-                            j = 0
-                    else:
-                        j += 1            
-            
+        return [merged_line for _, merged_line in sorted(merged_lines, key=lambda k: k[0])]
+
+    def removeOverlappingHorizontalLines(self, for_prime_center):
+        for y, horizontal_lines in sorted(self.getLinesPerCoordinate(1).items()):
+            horizontal_lines = self.mergeOverlappingLines(horizontal_lines, 0)
 
             if for_prime_center == True:
                 for line in horizontal_lines:
                     if self.isHeighestLine(line):
                         continue
 
+                    # x and y are swapped for prime center
                     new_line = Line()
-                    new_line.setStartPoint([Helper.toMillimeters(line.start_point[1]), Helper.toMillimeters(line.start_point[0])])
-                    new_line.setEndPoint([Helper.toMillimeters(line.end_point[1]), Helper.toMillimeters(line.end_point[0])])
+                    new_line.setStartPoint([line.start_point[1], line.start_point[0]])
+                    new_line.setEndPoint([line.end_point[1], line.end_point[0]])
 
-                    y = Helper.toMillimeters(y)
-                    
                     self.lines_without_overlap.append(new_line)
-                    self.dxf_lines_without_overlap.append(dxf.line((y, new_line.start_point[0]), (y, new_line.end_point[0])))
             else:
-                for line in horizontal_lines:
-                    self.lines_without_overlap.append(line)
-                    dxf_line = dxf.line((line.start_point[0], y), (line.end_point[0], y), color=random.randint(0, 255), thickness=100.0)
-                    # self.drawing.add(dxf_line)
-                    self.dxf_lines_without_overlap.append(dxf_line)
+                self.lines_without_overlap.extend(horizontal_lines)
 
     def removeOverlappingVerticalLines(self, for_prime_center):
+        for x, vertical_lines in sorted(self.getLinesPerCoordinate(0).items()):
+            vertical_lines = self.mergeOverlappingLines(vertical_lines, 1)
 
-        for x in self.x_unique:
-            vertical_lines = self.getVerticalLinesPerXValue(x)
-
-            i = 0
-            j = 1
-
-            while self.thereAreOverlappingLines(vertical_lines):
-                l1 = vertical_lines[i]
-                l2 = vertical_lines[j]
-                
-                if i != j:
-                    if l1.overlaps(l2):
-                        if l2.end_point[1] > l1.end_point[1]:
-                            l1.setEndPoint(l2.end_point)
-
-                        if l2.start_point[1] < l1.start_point[1]:
-                            l1.setStartPoint(l2.start_point)
-
-                        del vertical_lines[j]
-
-                        i = 0
-                        j = 1
-                    else:
-                        if (j + 1 >= len(vertical_lines)):
-                            if (i + 1 >= len(vertical_lines)):
-                                break
-                            else:
-                                i += 1
-                                j = 0
-                        else:
-                            j += 1
-                else:
-                    if (j + 1 >= len(vertical_lines)):
-                        if (i + 1 >= len(vertical_lines)):
-                            break
-                        else:
-                            i += 1
-                            j = 0
-                    else:
-                        j += 1            
-            
             if for_prime_center == True:
                 for line in vertical_lines:
+                    # x and y are swapped for prime center
                     new_line = Line()
-                    new_line.setStartPoint([Helper.toMillimeters(line.start_point[1]), Helper.toMillimeters(line.start_point[0])])
-                    new_line.setEndPoint([Helper.toMillimeters(line.end_point[1]), Helper.toMillimeters(line.end_point[0])])    
-
-                    x = Helper.toMillimeters(x)
+                    new_line.setStartPoint([line.start_point[1], line.start_point[0]])
+                    new_line.setEndPoint([line.end_point[1], line.end_point[0]])
 
                     self.lines_without_overlap.append(new_line)
-                    self.dxf_lines_without_overlap.append(dxf.line((new_line.start_point[1], x), (new_line.end_point[1], x)))
             else:
-                for line in vertical_lines:
-                    dxf_line = dxf.line((x, line.start_point[1]), (x, line.end_point[1]), color=random.randint(0, 255), thickness=100.0)
-                    self.lines_without_overlap.append(line)
-                    self.dxf_lines_without_overlap.append(dxf_line)
-            
+                self.lines_without_overlap.extend(vertical_lines)
+
+    def chainLinesWithoutOverlap(self, for_prime_center):
+        """
+        Chains the lines without overlap into polylines, a polyline is cut without raising the knife
+        """
+
+        self.polylines_without_overlap = PolylineChainer().chain(self.lines_without_overlap)
+
+        self.dxf_polylines_without_overlap = []
+        for polyline in self.polylines_without_overlap:
+            if for_prime_center == True:
+                dxf_polyline = dxf.polyline(polyline.tolist())
+            else:
+                dxf_polyline = dxf.polyline(Geometry.toCentimeters(polyline).tolist(), color=random.randint(0, 255), thickness=100.0)
+
+            self.dxf_polylines_without_overlap.append(dxf_polyline)
+
     def addLinesToDxf(self, for_prime_center = True):
-        print("Adding " + str(len(self.dxf_lines_without_overlap)) + " lines to DXF")
-        for line in self.dxf_lines_without_overlap:
-            self.dxf_drawing.add(line)
+        print("Adding " + str(len(self.dxf_polylines_without_overlap)) + " polylines to DXF")
+        for polyline in self.dxf_polylines_without_overlap:
+            self.dxf_drawing.add(polyline)
 
     def addLabelsToDxf(self, for_prime_center = True):
         for rectangle in self.stacked_rectangles:
@@ -456,11 +566,29 @@ class Grid(object):
     def addRectangle(self, rectangle):
         self.stacked_rectangles.append(copy.deepcopy(rectangle))
 
+        # a rectangle only takes free space, so a size that did not fit still does not fit in the new version
+        if self.no_fit_version == self.version:
+            self.no_fit_version += 1
+        self.version += 1
+
+        if self.skyline is not None:
+            self.skyline.addRectangle(self.stacked_rectangles[-1])
+
+        if self.free_space_index is not None:
+            self.free_space_index.addRectangle(self.stacked_rectangles[-1])
+
+        if self.occupancy_map is not None:
+            self.occupancy_map.addRectangle(self.stacked_rectangles[-1])
+
+        if self.spatial_index is not None:
+            self.spatial_index.addRectangle(self.stacked_rectangles[-1])
+
     def removeRectangle(self, rectangle):
         for i, stacked_rectangle in enumerate(self.getStackedRectangles()):
             if stacked_rectangle.getName() == rectangle.getName():
                 print("Removed " + str(self.stacked_rectangles[i].getName()) + " from grid " + str(self.getName()))
                 del self.stacked_rectangles[i]
+                self.clearIndices()
                 break
 
     def printStackedRectangles(self):
@@ -515,11 +643,14 @@ class Grid(object):
         # show(graph) 
         save(graph)
     
-    def toZcc(self):
+    def toZcc(self, cut_time_estimator=None):
         self.getHighestVerticalPoint()
         self.zcc_creator = ZccCreator(self.getMaterial(), self.getDxfFileName())
         self.getHighestVerticalPoint()
 
+        if cut_time_estimator is not None:
+            self.zcc_creator.setCutTimeEstimator(cut_time_estimator)
+
         self.zcc_creator.addGrid(self)
         self.zcc_creator.save()
         self.getHighestVerticalPoint()
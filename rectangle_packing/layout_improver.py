@@ -0,0 +1,222 @@
+from rectangle_packing.geometry import Geometry
+from rectangle_packing.grid import Grid
+from rectangle_packing.rectangle import Rectangle
+from rectangle_packing.placement_engine import NormOrderedPlacementEngine
+
+import numpy as np
+import copy
+import math
+import random
+import time
+import multiprocessing
+
+class LayoutImprover(object):
+    """
+    Improvement phase after the greedy stacking of a grid. Simulated annealing over the insertion order and the orientation of
+    the rectangles of the grid: every candidate is a small change (swap, move or rotation) of the current solution, which is
+    stacked again in an empty grid with the placement engine and scored on the used length of the grid (highest vertical point).
+    A batch of candidates is evaluated on a process pool in every iteration. The search stops at the time or iteration limit,
+    the best layout is only returned when it uses less length than the current layout of the grid. Only simulated annealing
+    is implemented, there is no genetic search.
+    """
+
+    def __init__(self, placement_engine=None, num_processes=1, time_limit=10, max_iterations=200, initial_temperature=10, cooling_rate=0.95, seed=None):
+        if placement_engine is None:
+            placement_engine = NormOrderedPlacementEngine()
+
+        self.setPlacementEngine(placement_engine)
+        self.setNumProcesses(num_processes)
+        self.setTimeLimit(time_limit)
+        self.setMaxIterations(max_iterations)
+
+        self.initial_temperature = initial_temperature
+        self.cooling_rate = cooling_rate
+        self.random = random.Random(seed)
+
+    def setPlacementEngine(self, placement_engine):
+        self.placement_engine = placement_engine
+
+    def getPlacementEngine(self):
+        return self.placement_engine
+
+    def setNumProcesses(self, num_processes):
+        self.num_processes = max(int(num_processes), 1)
+
+    def getNumProcesses(self):
+        return self.num_processes
+
+    def setTimeLimit(self, seconds):
+        self.time_limit = seconds
+
+    def getTimeLimit(self):
+        return self.time_limit
+
+    def setMaxIterations(self, max_iterations):
+        self.max_iterations = max_iterations
+
+    def getMaxIterations(self):
+        return self.max_iterations
+
+    def improveGrids(self, grids):
+        """
+        Returns a list of (grid, rectangles) with the rectangles at their new positions for the grids with an improved layout.
+        The time limit is shared by the grids, every grid gets an equal part of the time that is left.
+        """
+
+        deadline = time.time() + self.time_limit
+        improved_grids = []
+
+        if self.num_processes > 1:
+            pool = multiprocessing.Pool(self.num_processes)
+        else:
+            pool = None
+
+        try:
+            for i, grid in enumerate(grids):
+                grid_deadline = time.time() + (deadline - time.time()) / (len(grids) - i)
+                rectangles = self.improveGrid(grid, grid_deadline, pool)
+
+                if rectangles is not None:
+                    improved_grids.append((grid, rectangles))
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        return improved_grids
+
+    def improveGrid(self, grid, deadline=None, pool=None):
+        """
+        Returns the rectangles of the grid at improved positions with their exact sizes, or None when no layout is found that
+        uses less length than the current one
+        """
+
+        if deadline is None:
+            deadline = time.time() + self.time_limit
+
+        rectangles = self.getRoundedRectangles(grid)
+        if len(rectangles) <= 1:
+            return None
+
+        current_score = max(rectangle.getTopLeft()[1] for rectangle in rectangles)
+        sizes = [(rectangle.getWidth(), rectangle.getHeight()) for rectangle in rectangles]
+        print("Improving layout of grid " + str(grid.getName()) + " with used length " + str(current_score))
+
+        # start from the greedy solution: descending area in the orientation the rectangles are stacked in
+        areas = [rectangle.getArea() for rectangle in rectangles]
+        order = list(reversed(sorted(range(len(areas)), key=lambda k: areas[k])))
+        rotations = [False] * len(rectangles)
+
+        result = packRectangles((grid.getWidth(), grid.getHeight(), self.getSizesAndRotations(sizes, rotations), order, self.placement_engine))
+        if result is None:
+            score = math.inf
+        else:
+            score = result[0]
+
+        best_score = current_score
+        best_solution = None
+        if score < best_score - Geometry.tolerance:
+            best_score, best_solution = score, (order, rotations, result[1])
+
+        temperature = self.initial_temperature
+        iteration = 0
+        while iteration < self.max_iterations and time.time() < deadline:
+            neighbours = [self.createNeighbour(order, rotations) for _ in range(self.num_processes)]
+            arguments = [(grid.getWidth(), grid.getHeight(), self.getSizesAndRotations(sizes, n_rotations), n_order, self.placement_engine) for n_order, n_rotations in neighbours]
+
+            if pool is not None:
+                results = pool.map(packRectangles, arguments)
+            else:
+                results = [packRectangles(argument) for argument in arguments]
+
+            # the best neighbour of the batch competes with the current solution
+            candidates = [(result[0], i) for i, result in enumerate(results) if result is not None]
+            if len(candidates) > 0:
+                neighbour_score, i = min(candidates)
+
+                if neighbour_score <= score or self.random.random() < math.exp(-(neighbour_score - score) / max(temperature, Geometry.tolerance)):
+                    order, rotations = neighbours[i]
+                    score = neighbour_score
+
+                if neighbour_score < best_score - Geometry.tolerance:
+                    print("Found layout with used length " + str(neighbour_score) + " in iteration " + str(iteration))
+                    best_score = neighbour_score
+                    best_solution = (neighbours[i][0], neighbours[i][1], results[i][1])
+
+            temperature *= self.cooling_rate
+            iteration += 1
+
+        if best_solution is None:
+            print("No better layout found for grid " + str(grid.getName()) + " in " + str(iteration) + " iterations")
+            return None
+
+        print("Used length of grid " + str(grid.getName()) + " improved from " + str(current_score) + " to " + str(best_score))
+        _, best_rotations, positions = best_solution
+
+        improved_rectangles = []
+        for rectangle, is_rotated, position in zip(grid.getStackedRectangles(), best_rotations, positions):
+            rectangle = copy.deepcopy(rectangle)
+            if is_rotated:
+                rectangle.rotate()
+
+            rectangle.setPosition(position)
+            rectangle.useExactSize()
+            improved_rectangles.append(rectangle)
+
+        return improved_rectangles
+
+    def getRoundedRectangles(self, grid):
+        rectangles = []
+        for rectangle in grid.getStackedRectangles():
+            rectangle = copy.deepcopy(rectangle)
+            rectangle.roundWidth()
+            rectangle.roundHeight()
+            rectangles.append(rectangle)
+
+        return rectangles
+
+    def getSizesAndRotations(self, sizes, rotations):
+        # only the sizes are sent to the worker processes, not the rectangles with their DXF drawings
+        return [(width, height, is_rotated) for (width, height), is_rotated in zip(sizes, rotations)]
+
+    def createNeighbour(self, order, rotations):
+        order = list(order)
+        rotations = list(rotations)
+        i, j = self.random.sample(range(len(order)), 2)
+
+        move = self.random.randrange(3)
+        if move == 0:
+            order[i], order[j] = order[j], order[i]
+        elif move == 1:
+            order.insert(j, order.pop(i))
+        else:
+            rotations[order[i]] = not rotations[order[i]]
+
+        return order, rotations
+
+def packRectangles(arguments):
+    """
+    Stacks the rectangles in an empty grid in the given order and orientations, used to evaluate a candidate in a worker
+    process. The rectangles are given as (width, height, is_rotated). Returns the used length of the grid and the positions of
+    the rectangles, or None when a rectangle does not fit.
+    """
+
+    width, height, sizes, order, placement_engine = arguments
+    grid = Grid(width=width, height=height, create_dxf_drawing=False)
+    positions = [None] * len(sizes)
+
+    for i in order:
+        rectangle_width, rectangle_height, is_rotated = sizes[i]
+        if is_rotated:
+            rectangle_width, rectangle_height = rectangle_height, rectangle_width
+
+        rectangle = Rectangle(width=rectangle_width, height=rectangle_height, name=i, create_dxf_drawing=False)
+
+        position = placement_engine.computeStackingPosition(grid, rectangle)
+        if position[0] == grid.getWidth() and position[1] == grid.getHeight():
+            return None
+
+        rectangle.setPosition(position)
+        grid.addRectangle(rectangle)
+        positions[i] = np.array(position)
+
+    return grid.getHighestVerticalPoint(), positions
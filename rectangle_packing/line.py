@@ -1,5 +1,6 @@
 import numpy as np
 import copy
+import math
 
 class Error(Exception):
     """Base class for other exceptions"""
@@ -22,7 +23,7 @@ class Line(object):
             raise StartPointCannotBeLargerThanEndPointException
         
         if (start_point[0] == end_point[0] and start_point[1] == end_point[1]):
-            raise StartAndEndPointAreTheSameException
+            raise StartAndEndPointAreSameException
 
         self.start_point = copy.deepcopy(start_point)
         self.end_point = copy.deepcopy(end_point)
@@ -47,7 +48,7 @@ class Line(object):
     def resolveOverlap(self, other):
         if self.completelyOverlaps(other):
 
-            if self.lenght > other.length:
+            if self.length() > other.length():
                 return self
             else:
                 return other
@@ -71,21 +72,12 @@ class Line(object):
     # other line
     # ----------------
     def completelyOverlaps(self, other):
+        # the points are integer millimeters, so lines on the same x or y compare exactly
+        start_1_x, start_1_y = self.start_point
+        end_1_x, end_1_y = self.end_point
 
-        # rounding is needed
-        # otherwise lines with same y values are not detected properly
-        # because there can be a slight difference of e.g. 0.0001
-        start_1_x = round(self.start_point[0], 2)
-        start_1_y = round(self.start_point[1], 2)
-
-        end_1_x = round(self.end_point[0], 2)
-        end_1_y = round(self.end_point[1], 2)      
-
-        start_2_x = round(other.start_point[0], 2)
-        start_2_y = round(other.start_point[1], 2)
-
-        end_2_x = round(other.end_point[0], 2)
-        end_2_y = round(other.end_point[1], 2)      
+        start_2_x, start_2_y = other.start_point
+        end_2_x, end_2_y = other.end_point
 
         if (start_1_x >= start_2_x) and (end_1_x <= end_2_x):
             if (start_1_y == start_2_y and end_1_y == end_2_y):
@@ -120,8 +112,8 @@ class Line(object):
             return True
 
     def length(self):
-        dist_x = abs(self.self.end_point[0] - self.start_point[0])
-        dist_y = abs(self.self.end_point[1] - self.start_point[1])
+        dist_x = abs(self.end_point[0] - self.start_point[0])
+        dist_y = abs(self.end_point[1] - self.start_point[1])
         dist_x_squared = dist_x ** 2
         dist_y_squared = dist_y ** 2
         line_length = math.sqrt(dist_x_squared + dist_y_squared)
@@ -0,0 +1,72 @@
+from rectangle_packing.geometry import Geometry
+
+import numpy as np
+
+class OccupancyMap(object):
+    """
+    Raster of the grid where every cell is occupied when a stacked rectangle covers (part of) it. By default a cell is half a
+    centimeter wide, so rectangles with an odd width or height, which have their edges on half centimeters, are represented
+    exactly. A 2D prefix sum (summed-area table) of the raster gives the number of occupied cells in any window in constant
+    time, which is used to find all the positions where a rectangle fits with one vectorized computation.
+    """
+
+    def __init__(self, width, height, rectangles=[], cells_per_centimeter=2):
+        self.cells_per_centimeter = cells_per_centimeter
+        self.occupied = np.zeros((height * cells_per_centimeter, width * cells_per_centimeter), dtype=bool)
+        self.summed_area_table = None
+
+        for rectangle in rectangles:
+            self.addRectangle(rectangle)
+
+    def getCellsPerCentimeter(self):
+        return self.cells_per_centimeter
+
+    def getNumCellsHorizontal(self):
+        return self.occupied.shape[1]
+
+    def getNumCellsVertical(self):
+        return self.occupied.shape[0]
+
+    def getOccupiedCells(self):
+        return self.occupied
+
+    def toCells(self, value, rounding=np.floor):
+        if rounding == np.floor:
+            return int(np.floor(value * self.cells_per_centimeter + Geometry.tolerance))
+
+        return int(np.ceil(value * self.cells_per_centimeter - Geometry.tolerance))
+
+    def addRectangle(self, rectangle):
+        x_start, y_start = rectangle.getBottomLeft()
+        x_end, y_end = rectangle.getTopRight()
+
+        x_start = max(self.toCells(x_start, np.floor), 0)
+        y_start = max(self.toCells(y_start, np.floor), 0)
+        x_end = min(self.toCells(x_end, np.ceil), self.getNumCellsHorizontal())
+        y_end = min(self.toCells(y_end, np.ceil), self.getNumCellsVertical())
+
+        if x_end > x_start and y_end > y_start:
+            self.occupied[y_start:y_end, x_start:x_end] = True
+            self.summed_area_table = None
+
+    def getSummedAreaTable(self):
+        if self.summed_area_table is None:
+            self.summed_area_table = np.zeros((self.getNumCellsVertical() + 1, self.getNumCellsHorizontal() + 1), dtype=np.int32)
+            self.summed_area_table[1:, 1:] = np.cumsum(np.cumsum(self.occupied, axis=0, dtype=np.int32), axis=1)
+
+        return self.summed_area_table
+
+    def getFitMask(self, cells_width, cells_height):
+        """
+        Returns a boolean mask where element [y, x] is True when a window of cells_width x cells_height cells with its bottom left
+        cell at [y, x] contains no occupied cells
+        """
+
+        if cells_width > self.getNumCellsHorizontal() or cells_height > self.getNumCellsVertical():
+            return np.zeros((0, 0), dtype=bool)
+
+        table = self.getSummedAreaTable()
+        occupied_cells = (table[cells_height:, cells_width:] - table[:-cells_height, cells_width:]
+            - table[cells_height:, :-cells_width] + table[:-cells_height, :-cells_width])
+
+        return occupied_cells == 0
@@ -0,0 +1,329 @@
+from rectangle_packing.geometry import Geometry
+
+import numpy as np
+import copy
+
+class Error(Exception):
+    """Base class for other exceptions"""
+    pass
+
+class StackOnMillimetersNotSupportedError(Error):
+    """Raised when stacking on millimeters is set on a placement engine that only stacks on centimeters"""
+    pass
+
+class PlacementEngine(object):
+    """
+    Base class of the strategies used by the stacker to compute the position of a rectangle in a grid. The stacking position
+    is the center of the rectangle. When the rectangle does not fit in the grid, [grid width, grid height] is returned.
+
+    Positions are on whole centimeters by default. When stacking on millimeters the edges of the rectangle are put on whole
+    millimeters instead, this is supported by the skyline, free space and norm ordered placement engines. The other engines
+    raise a StackOnMillimetersNotSupportedError instead of silently stacking on centimeters.
+    """
+
+    stack_on_millimeters = False
+    supports_stack_on_millimeters = True
+
+    def getName(self):
+        return self.__class__.__name__
+
+    def setStackOnMillimeters(self, stack_on_millimeters):
+        if stack_on_millimeters and not self.supports_stack_on_millimeters:
+            raise StackOnMillimetersNotSupportedError
+
+        self.stack_on_millimeters = stack_on_millimeters
+
+    def getStackOnMillimeters(self):
+        return self.stack_on_millimeters
+
+    def computeStackingPosition(self, grid, rectangle):
+        raise NotImplementedError
+
+    def computeOriginalAndRotatedStackingPositions(self, grid, rectangle):
+        """
+        Returns the stacking positions of the original and the rotated rectangle. Engines that evaluate both orientations
+        together may return the not fitting position for the orientation that cannot be closer to the origin than the other.
+        """
+
+        stacking_position = self.computeStackingPosition(grid, rectangle)
+
+        rectangle.rotate()
+        stacking_position_rotated = self.computeStackingPosition(grid, rectangle)
+        rectangle.rotate()
+
+        return stacking_position, stacking_position_rotated
+
+    def getNotFittingPosition(self, grid):
+        return [grid.getWidth(), grid.getHeight()]
+
+    def snapToGrid(self, value, size):
+        if self.stack_on_millimeters:
+            return Geometry.ceilToMillimeters(np.asarray(value) - size/2) + size/2
+
+        # positions are stacked on centimeter accuracy
+        return np.ceil(np.asarray(value) - Geometry.tolerance)
+
+    def snapHorizontallyToGrid(self, grid, rectangle, x):
+        # an order as wide as the grid is centered, also when it has an odd width
+        if rectangle.getWidth() == grid.getWidth():
+            return np.full(np.shape(x), rectangle.getWidth()/2)
+
+        return self.snapToGrid(x, rectangle.getWidth())
+
+    def getClosestToOrigin(self, x, y):
+        """
+        Returns the index of the position closest to the origin, on equal distance the position with the largest x is chosen
+        like the brute force scan does
+        """
+
+        squared_norms = np.round(x**2 + y**2, 6)
+        return np.lexsort((-x, squared_norms))[0]
+
+class BruteForcePlacementEngine(PlacementEngine):
+    """
+    Tries every centimeter position in the grid and returns the position closest to the origin
+    """
+
+    supports_stack_on_millimeters = False
+
+    def computeStackingPosition(self, grid, rectangle):
+        stacking_position = self.getNotFittingPosition(grid)
+
+        if grid.getWidth() > rectangle.getWidth():
+            for x in self.getHorizontalLoopRange(grid, rectangle):
+                for y in self.getVerticalLoopRange(grid, rectangle):
+                    position = np.array([x,y])
+                    rectangle.setPosition(position)
+                    if grid.isValidPosition(rectangle) and np.linalg.norm(position) < np.linalg.norm(stacking_position):
+                        stacking_position = position
+
+        elif grid.getWidth() == rectangle.getWidth():
+            x = rectangle.getWidth() / 2
+            for y in self.getVerticalLoopRange(grid, rectangle):
+                position = np.array([x,y])
+                rectangle.setPosition(position)
+                if grid.isValidPosition(rectangle) and np.linalg.norm(position) < np.linalg.norm(stacking_position):
+                    stacking_position = position
+
+        return stacking_position
+
+    def getHorizontalLoopRange(self, grid, rectangle):
+        if rectangle.getWidth() % 2 > 0:
+            width = rectangle.getWidth() + 1
+        else:
+            width = rectangle.getWidth()
+
+        return reversed(range(int(width/2), int(grid.getWidth() - width/2) + 1))
+
+    def getVerticalLoopRange(self, grid, rectangle):
+        if rectangle.getHeight() % 2 > 0:
+            height = rectangle.getHeight() + 1
+        else:
+            height = rectangle.getHeight()
+
+        return reversed(range(int(height/2), int(grid.getHeight() - height/2) + 1))
+
+class SkylinePlacementEngine(PlacementEngine):
+    """
+    Bottom-left placement on top of the skyline of the grid: returns the lowest, and then leftmost, position where the rectangle
+    can be placed on the height profile of the stacked rectangles. Only the start of every skyline segment is evaluated, so the
+    search time depends on the number of segments instead of the grid area. Gaps below the skyline are not filled.
+    """
+
+    def computeStackingPosition(self, grid, rectangle):
+        stacking_position = self.getNotFittingPosition(grid)
+
+        width = rectangle.getWidth()
+        height = rectangle.getHeight()
+        skyline = grid.getSkyline()
+
+        best_position = None
+        for segment in skyline.getSegments():
+            x = float(self.snapHorizontallyToGrid(grid, rectangle, segment[0] + width/2))
+            if x + width/2 > grid.getWidth() + Geometry.tolerance:
+                break
+
+            y = float(self.snapToGrid(skyline.getMaximumHeight(x - width/2, x + width/2) + height/2, height))
+            if y + height/2 > grid.getHeight() + Geometry.tolerance:
+                continue
+
+            if best_position is None or y < best_position[1]:
+                best_position = np.array([x, y])
+
+        if best_position is not None:
+            stacking_position = best_position
+
+        return stacking_position
+
+class FreeSpacePlacementEngine(PlacementEngine):
+    """
+    Uses the maximal free rectangles of the grid: the position closest to the origin is always in the bottom left corner of one
+    of the free rectangles that can hold the rectangle, so only those corners are evaluated.
+    """
+
+    def computeStackingPosition(self, grid, rectangle):
+        width = rectangle.getWidth()
+        height = rectangle.getHeight()
+        free_regions = grid.getFreeRegions(width, height)
+
+        if len(free_regions) == 0:
+            return self.getNotFittingPosition(grid)
+
+        x = self.snapHorizontallyToGrid(grid, rectangle, free_regions[:, 0] + width/2)
+        y = self.snapToGrid(free_regions[:, 1] + height/2, height)
+
+        # rounding to centimeters can push the rectangle out of a narrow free rectangle
+        fits = (x + width/2 <= free_regions[:, 2] + Geometry.tolerance) & (y + height/2 <= free_regions[:, 3] + Geometry.tolerance)
+        if not fits.any():
+            return self.getNotFittingPosition(grid)
+
+        x = x[fits]
+        y = y[fits]
+        i = self.getClosestToOrigin(x, y)
+
+        return np.array([x[i], y[i]])
+
+class FitMapPlacementEngine(PlacementEngine):
+    """
+    Uses the occupancy raster of the grid to compute, in one vectorized call, a mask of all the positions where the rectangle
+    fits. The valid position closest to the origin is then selected with a single argmin. Only positions with the center on a
+    whole centimeter are considered, like the brute force scan does.
+    """
+
+    supports_stack_on_millimeters = False
+
+    def computeStackingPosition(self, grid, rectangle):
+        cells_per_centimeter = grid.getOccupancyMap().getCellsPerCentimeter()
+        half_cells_width = self.getNumHalfCells(rectangle.getWidth(), cells_per_centimeter)
+        half_cells_height = self.getNumHalfCells(rectangle.getHeight(), cells_per_centimeter)
+
+        fit_mask = grid.getFitMask(2 * half_cells_width, 2 * half_cells_height)
+        if not fit_mask.any():
+            return self.getNotFittingPosition(grid)
+
+        x = (np.arange(fit_mask.shape[1]) + half_cells_width) / cells_per_centimeter
+        y = (np.arange(fit_mask.shape[0]) + half_cells_height) / cells_per_centimeter
+
+        # an order as wide as the grid is centered, also when it has an odd width
+        if rectangle.getWidth() == grid.getWidth():
+            is_valid_x = np.ones(len(x), dtype=bool)
+        else:
+            is_valid_x = (x == np.round(x))
+
+        is_valid_y = (y == np.round(y))
+        squared_norms = np.where(fit_mask & is_valid_x[None, :] & is_valid_y[:, None], x[None, :]**2 + y[:, None]**2, np.inf)
+
+        i, j = np.unravel_index(np.argmin(squared_norms), squared_norms.shape)
+        if np.isinf(squared_norms[i, j]):
+            return self.getNotFittingPosition(grid)
+
+        # on equal distance the first position in row order has the lowest y and thus the largest x, like the brute force scan
+        return np.array([x[j], y[i]])
+
+    def getNumHalfCells(self, size, cells_per_centimeter):
+        return int(np.ceil(size * cells_per_centimeter / 2 - Geometry.tolerance))
+
+class NormOrderedPlacementEngine(PlacementEngine):
+    """
+    Visits the candidate positions of the grid, the positions where the rectangle touches the grid border or a stacked rectangle
+    on its left and bottom side, in order of increasing distance from the origin. The first valid position is the position
+    closest to the origin, so the search stops there. With n stacked rectangles there are at most (n + 1)^2 candidates instead
+    of one for every centimeter of the grid.
+
+    Stacking a rectangle only takes free space, so a candidate that was not valid for a size stays invalid. The search for the
+    next rectangle of the same size resumes at the position where the last search ended, until free space is added to the grid.
+    """
+
+    def computeStackingPosition(self, grid, rectangle):
+        width = rectangle.getWidth()
+        height = rectangle.getHeight()
+
+        # when no free rectangle can hold the rectangle, every candidate position is invalid
+        if not grid.hasFreeRegion(width, height):
+            return self.getNotFittingPosition(grid)
+
+        for position in self.generateCandidatePositions(grid, rectangle):
+            rectangle.setPosition(position)
+            if grid.isValidPosition(rectangle):
+                grid.setWarmStart(width, height, position[0]**2 + position[1]**2, position[0])
+                return position
+
+        grid.setWarmStart(width, height, np.inf, np.inf)
+        return self.getNotFittingPosition(grid)
+
+    def generateCandidatePositions(self, grid, rectangle):
+        if rectangle.getWidth() > grid.getWidth():
+            return
+
+        positions = grid.getCandidatePositions(rectangle.getWidth(), rectangle.getHeight(), self.stack_on_millimeters)
+        for position in positions[self.getWarmStartIndex(grid, positions, rectangle.getWidth(), rectangle.getHeight()):]:
+            yield position
+
+    def getWarmStartIndex(self, grid, positions, width, height):
+        """
+        Returns the index of the first candidate position that is not before the warm start of the size
+        """
+
+        warm_start = grid.getWarmStart(width, height)
+        if warm_start is None:
+            return 0
+
+        squared_distance, x = warm_start
+        squared_distances = positions[:, 0]**2 + positions[:, 1]**2
+        is_before = ((squared_distances < squared_distance - Geometry.tolerance) |
+            ((np.abs(squared_distances - squared_distance) <= Geometry.tolerance) & (positions[:, 0] > x + Geometry.tolerance)))
+
+        return int(np.count_nonzero(is_before))
+
+    def computeOriginalAndRotatedStackingPositions(self, grid, rectangle):
+        """
+        Visits the candidate positions of both orientations in one pass, ordered on distance to the origin. The first valid
+        position ends the search for both orientations, the other orientation cannot be closer to the origin anymore. On equal
+        distance the original orientation comes first, because the rotated rectangle is only used when it is closer.
+        """
+
+        rotated_rectangle = copy.copy(rectangle)
+        rotated_rectangle.rotate()
+        orientations = [rectangle, rotated_rectangle]
+
+        candidates = []
+        for orientation, oriented_rectangle in enumerate(orientations):
+            width = oriented_rectangle.getWidth()
+            height = oriented_rectangle.getHeight()
+
+            if width <= grid.getWidth() and grid.hasFreeRegion(width, height):
+                positions = grid.getCandidatePositions(width, height, self.stack_on_millimeters)
+                positions = positions[self.getWarmStartIndex(grid, positions, width, height):]
+                candidates.append(np.column_stack((positions, np.full(len(positions), orientation))))
+
+        stacking_positions = [self.getNotFittingPosition(grid), self.getNotFittingPosition(grid)]
+        if len(candidates) == 0:
+            return stacking_positions
+
+        candidates = np.vstack(candidates)
+        order = np.lexsort((-candidates[:, 0], candidates[:, 2], candidates[:, 0]**2 + candidates[:, 1]**2))
+
+        squared_distance = np.inf
+        x_found = np.inf
+        orientation_found = None
+        for x, y, orientation in candidates[order]:
+            oriented_rectangle = orientations[int(orientation)]
+            oriented_rectangle.setPosition(np.array([x, y]))
+
+            if grid.isValidPosition(oriented_rectangle):
+                stacking_positions[int(orientation)] = np.array([x, y])
+                squared_distance = x**2 + y**2
+                x_found = x
+                orientation_found = int(orientation)
+                break
+
+        # the candidates of the other orientation closer to the origin were all visited, the search for it resumes at this distance
+        for orientation, oriented_rectangle in enumerate(orientations):
+            if orientation != orientation_found:
+                grid.setWarmStart(oriented_rectangle.getWidth(), oriented_rectangle.getHeight(), squared_distance, np.inf)
+
+        if orientation_found is not None:
+            oriented_rectangle = orientations[orientation_found]
+            grid.setWarmStart(oriented_rectangle.getWidth(), oriented_rectangle.getHeight(), squared_distance, x_found)
+
+        return stacking_positions
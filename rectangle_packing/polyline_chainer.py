@@ -0,0 +1,78 @@
+import numpy as np
+
+class PolylineChainer(object):
+    """
+    Chains cut lines that share an end point into polylines, so a chain is cut with one lowering and raising of the knife.
+    A chain continues straight ahead where it can, and the points between collinear lines are left out.
+    """
+
+    def chain(self, lines):
+        """
+        Returns the lines chained into polylines, every polyline is an array of its points
+        """
+
+        points = [(tuple(int(value) for value in line.start_point), tuple(int(value) for value in line.end_point)) for line in lines]
+
+        lines_per_point = {}
+        for i, (start_point, end_point) in enumerate(points):
+            lines_per_point.setdefault(start_point, []).append(i)
+            lines_per_point.setdefault(end_point, []).append(i)
+
+        is_chained = [False] * len(points)
+        polylines = []
+        for i, (start_point, end_point) in enumerate(points):
+            if is_chained[i]:
+                continue
+
+            is_chained[i] = True
+            polyline = [start_point, end_point]
+
+            # extend the end of the chain and then its start
+            self.extendPolyline(polyline, points, lines_per_point, is_chained)
+            polyline.reverse()
+            self.extendPolyline(polyline, points, lines_per_point, is_chained)
+            polyline.reverse()
+
+            polylines.append(np.array(polyline))
+
+        return polylines
+
+    def extendPolyline(self, polyline, points, lines_per_point, is_chained):
+        while True:
+            i = self.getNextLine(polyline, points, lines_per_point, is_chained)
+            if i is None:
+                return
+
+            is_chained[i] = True
+            start_point, end_point = points[i]
+            next_point = end_point if start_point == polyline[-1] else start_point
+
+            if self.getDirection(polyline[-2], polyline[-1]) == self.getDirection(polyline[-1], next_point):
+                polyline[-1] = next_point
+            else:
+                polyline.append(next_point)
+
+    def getNextLine(self, polyline, points, lines_per_point, is_chained):
+        """
+        Returns the line that continues the chain straight ahead, or else the first line that touches its end
+        """
+
+        next_line = None
+        direction = self.getDirection(polyline[-2], polyline[-1])
+
+        for i in lines_per_point[polyline[-1]]:
+            if is_chained[i]:
+                continue
+
+            start_point, end_point = points[i]
+            next_point = end_point if start_point == polyline[-1] else start_point
+            if self.getDirection(polyline[-1], next_point) == direction:
+                return i
+
+            if next_line is None:
+                next_line = i
+
+        return next_line
+
+    def getDirection(self, point, next_point):
+        return tuple(int(value) for value in np.sign(np.subtract(next_point, point)))
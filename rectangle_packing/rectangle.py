@@ -2,6 +2,7 @@
 from rectangle_packing.helper import Helper
 from rectangle_packing.zcc_creator import ZccCreator
 from rectangle_packing.line import Line
+from rectangle_packing.geometry import Geometry
 
 # external dependencies
 import numpy as np
@@ -10,10 +11,20 @@ from dxfwrite import DXFEngine as dxf
 import random
 
 class Rectangle(object):
-    def __init__(self, width=-1, height=-1, name="-1", article_name='default', material="Kokos", brand='kokos', color='naturel', grid_width=100, position=np.array([-1, -1]), grid_number=-1, is_stacked=False, quantity=1, client_name='', coupage_batch="batch"):
+    def __init__(self, width=-1, height=-1, name="-1", article_name='default', material="Kokos", brand='kokos', color='naturel', grid_width=100, position=np.array([-1, -1]), grid_number=-1, is_stacked=False, quantity=1, client_name='', coupage_batch="batch", exact_width=None, exact_height=None, is_rotated=False, create_dxf_drawing=True):
         self.position = np.asarray(position)
         self.setWidth(width)
         self.setHeight(height)
+
+        # exact (millimeter accurate) size of the order, width and height can be rounded to centimeters for stacking
+        if exact_width is None:
+            exact_width = width
+        if exact_height is None:
+            exact_height = height
+
+        self.setExactWidth(exact_width)
+        self.setExactHeight(exact_height)
+        self.is_rotated = is_rotated
         self.setArticleName(article_name)
         self.setMaterial(material)
         self.setName(name)
@@ -27,7 +38,11 @@ class Rectangle(object):
         
         self.is_stacked = is_stacked
 
-        self.initEmptyDxfDrawing()
+        # rectangles that are only used to compute a layout do not create the DXF folder on disk
+        if create_dxf_drawing:
+            self.initEmptyDxfDrawing()
+        else:
+            self.dxf_drawing = None
 
     def __str__(self):
         string = "-------------------------------"
@@ -36,6 +51,9 @@ class Rectangle(object):
         string += "\nPosition: " + str(self.getPosition())
         string += "\nWidth: " + str(self.getWidth())
         string += "\nHeight: " + str(self.getHeight())
+        string += "\nExact width: " + str(self.getExactWidth())
+        string += "\nExact height: " + str(self.getExactHeight())
+        string += "\nRotated: " + str(self.isRotated())
         string += "\nTop Left: " + str(self.getTopLeft())
         string += "\nBottom Left: " + str(self.getBottomLeft()) 
         string += "\nBottom Right: " + str(self.getBottomRight())
@@ -47,14 +65,12 @@ class Rectangle(object):
     def toPrimeCenterFormat(self):
         self.rotate()
 
-        x = Helper.toMillimeters(self.getPosition()[0])
-        y = Helper.toMillimeters(self.getPosition()[1])
-        width = Helper.toMillimeters(self.getWidth())
-        height = Helper.toMillimeters(self.getHeight())
+        # the center is on half millimeters when the size is odd, the edges are on whole millimeters
+        x_start, y_start, x_end, y_end = self.getBoundsInMillimeters()
 
-        self.setPosition([x, y])
-        self.setWidth(width)
-        self.setHeight(height)
+        self.setPosition([(x_start + x_end) / 2, (y_start + y_end) / 2])
+        self.setWidth(int(x_end - x_start))
+        self.setHeight(int(y_end - y_start))
         # return Rectangle(width=width, height=height, name=self.getName(),
         #     article_name=self.getArticleName(), material=self.getMaterial(),
         #     brand=self.getBrand(), color=self.getColor(), grid_width=self.getGridWidth(),
@@ -158,6 +174,21 @@ class Rectangle(object):
     def setHeight(self, height):
         self.height = height
 
+    def getExactWidth(self):
+        return self.exact_width
+
+    def setExactWidth(self, exact_width):
+        self.exact_width = exact_width
+
+    def getExactHeight(self):
+        return self.exact_height
+
+    def setExactHeight(self, exact_height):
+        self.exact_height = exact_height
+
+    def isRotated(self):
+        return self.is_rotated
+
     def getPosition(self):
         return self.position
 
@@ -188,6 +219,13 @@ class Rectangle(object):
     def getBottomLeft(self):
         return self.getPosition() + np.array([-self.getWidth()/2, -self.getHeight()/2])
     
+    def getBoundsInMillimeters(self):
+        """
+        Returns [x_start, y_start, x_end, y_end] in millimeters as int32
+        """
+
+        return Geometry.toMillimeters(np.concatenate((self.getBottomLeft(), self.getTopRight())))
+
     def getArea(self):
         return self.width * self.height
 
@@ -203,23 +241,20 @@ class Rectangle(object):
     def rotate(self):
         width = self.getHeight()
         height = self.getWidth()
+        exact_width = self.getExactHeight()
+        exact_height = self.getExactWidth()
         x = self.getPosition()[1]
         y = self.getPosition()[0]
 
         self.setWidth(width)
         self.setHeight(height)
+        self.setExactWidth(exact_width)
+        self.setExactHeight(exact_height)
         self.setPosition([x, y])
+        self.is_rotated = not self.is_rotated
 
     def intersection(self, other):
-        
-        if self.getBottomRight()[0] <= other.getBottomLeft()[0] or self.getBottomLeft()[0] >= other.getBottomRight()[0]:
-            return False
-
-        if self.getBottomRight()[1] >= other.getTopRight()[1] or self.getTopLeft()[1] <= other.getBottomLeft()[1]:
-            return False
-        
-                
-        return True
+        return bool(Geometry.intersects(self.getBoundsInMillimeters(), other.getBoundsInMillimeters()))
 
     def toDxf(self, for_prime_center=True):
         rectangle_dxf = self.getRectangleDxf(for_prime_center)
@@ -242,11 +277,9 @@ class Rectangle(object):
         #     height = self.getWidth()
 
         if for_prime_center == True:
-            x = Helper.toMillimeters(x)
-            y = Helper.toMillimeters(y)
-
-            width = Helper.toMillimeters(width)
-            height = Helper.toMillimeters(height)
+            x, y, x_end, y_end = self.getBoundsInMillimeters()
+            width = x_end - x
+            height = y_end - y
 
             bgcolor = random.randint(1,255)
             
@@ -271,10 +304,9 @@ class Rectangle(object):
         #     height = self.getWidth()
 
         if for_prime_center == True:
-            x = Helper.toMillimeters(x)
-            y = Helper.toMillimeters(y)
-            width = Helper.toMillimeters(width)
-            height = Helper.toMillimeters(width)
+            x, y, x_end, y_end = self.getBoundsInMillimeters()
+            width = x_end - x
+            height = y_end - y
 
             text = dxf.text(str(self.getClientName()), (y, x + width), 100.0, rotation=0)
             
@@ -298,20 +330,34 @@ class Rectangle(object):
         bottom_right_to_top_right = Line(self.getBottomRight(), self.getTopRight())
 
         return top_left_to_top_right, bottom_left_to_top_left, bottom_left_to_bottom_right, bottom_right_to_top_right
+
+    def getLinesInMillimeters(self):
+        x_start, y_start, x_end, y_end = self.getBoundsInMillimeters()
+
+        top_left_to_top_right = Line(np.array([x_start, y_end]), np.array([x_end, y_end]))
+        bottom_left_to_top_left = Line(np.array([x_start, y_start]), np.array([x_start, y_end]))
+        bottom_left_to_bottom_right = Line(np.array([x_start, y_start]), np.array([x_end, y_start]))
+        bottom_right_to_top_right = Line(np.array([x_end, y_start]), np.array([x_end, y_end]))
+
+        return top_left_to_top_right, bottom_left_to_top_left, bottom_left_to_bottom_right, bottom_right_to_top_right
     
     def roundWidth(self):
-        rounded_width = int(np.ceil(self.getWidth()))
+        rounded_width = int(np.ceil(self.getExactWidth()))
         # if rounded_width % 2 > 0:
         #     rounded_width += 1
         
         self.setWidth(rounded_width)
 
     def roundHeight(self):
-        rounded_height = int(np.ceil(self.getHeight()))
+        rounded_height = int(np.ceil(self.getExactHeight()))
         # if rounded_height % 2 > 0:
         #     rounded_height += 1
         
         self.setHeight(rounded_height)
+
+    def useExactSize(self):
+        self.setWidth(self.getExactWidth())
+        self.setHeight(self.getExactHeight())
     
     def toZcc(self):
         self.zcc_creator = ZccCreator(self.getMaterial(), self.getDxfFileName())
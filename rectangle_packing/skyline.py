@@ -0,0 +1,78 @@
+from rectangle_packing.geometry import Geometry
+
+import numpy as np
+
+class Skyline(object):
+    """
+    Height profile of the rectangles stacked in a grid. The profile is a list of horizontal segments [x_start, x_end, y] that
+    together cover the complete grid width, where y is the highest stacked point above that part of the grid.
+    """
+
+    def __init__(self, width, rectangles=[]):
+        self.width = width
+        self.segments = [[0, width, 0]]
+
+        for rectangle in rectangles:
+            self.addRectangle(rectangle)
+
+    def getWidth(self):
+        return self.width
+
+    def getSegments(self):
+        return self.segments
+
+    def getNumSegments(self):
+        return len(self.segments)
+
+    def addRectangle(self, rectangle):
+        x_start = max(rectangle.getBottomLeft()[0], 0)
+        x_end = min(rectangle.getBottomRight()[0], self.width)
+        y = rectangle.getTopLeft()[1]
+
+        if x_end - x_start <= Geometry.tolerance:
+            return
+
+        segments = []
+        for segment in self.segments:
+            if segment[1] <= x_start or segment[0] >= x_end:
+                segments.append(segment)
+                continue
+
+            if segment[0] < x_start:
+                segments.append([segment[0], x_start, segment[2]])
+
+            segments.append([max(segment[0], x_start), min(segment[1], x_end), max(segment[2], y)])
+
+            if segment[1] > x_end:
+                segments.append([x_end, segment[1], segment[2]])
+
+        self.segments = self.mergeSegments(segments)
+
+    def mergeSegments(self, segments):
+        merged_segments = [segments[0]]
+
+        for segment in segments[1:]:
+            if segment[2] == merged_segments[-1][2]:
+                merged_segments[-1] = [merged_segments[-1][0], segment[1], segment[2]]
+            else:
+                merged_segments.append(segment)
+
+        return merged_segments
+
+    def getMaximumHeight(self, x_start, x_end):
+        """
+        Returns the highest point of the skyline between x_start and x_end
+        """
+
+        maximum_height = 0
+        for segment in self.segments:
+            if segment[0] >= x_end - Geometry.tolerance:
+                break
+
+            if segment[1] > x_start + Geometry.tolerance:
+                maximum_height = max(maximum_height, segment[2])
+
+        return maximum_height
+
+    def getHighestPoint(self):
+        return np.max([segment[2] for segment in self.segments])
@@ -0,0 +1,92 @@
+from rectangle_packing.geometry import Geometry
+
+import math
+
+class SpatialIndex(object):
+    """
+    Uniform bucket grid over the stacked rectangles of a grid. Every bucket of bucket_size x bucket_size centimeters holds the ids
+    of the rectangles that (partly) cover it, so an intersection query only compares the rectangles in the buckets the queried
+    rectangle covers instead of all the stacked rectangles.
+    """
+
+    def __init__(self, rectangles=[], bucket_size=10):
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        self.bounds = []
+
+        for rectangle in rectangles:
+            self.addRectangle(rectangle)
+
+    def getBucketSize(self):
+        return self.bucket_size
+
+    def getNumBuckets(self):
+        return len(self.buckets)
+
+    def getNumRectangles(self):
+        return len(self.bounds)
+
+    def getBounds(self, rectangle):
+        x, y = rectangle.getPosition()
+        width = rectangle.getWidth()
+        height = rectangle.getHeight()
+
+        # same arithmetic as Rectangle.getBottomLeft and Rectangle.getTopRight
+        return (float(x - width/2), float(y - height/2), float(x + width/2), float(y + height/2))
+
+    def getBucketRange(self, bounds):
+        x_start, y_start, x_end, y_end = bounds
+
+        return (range(math.floor(x_start / self.bucket_size), math.floor(x_end / self.bucket_size) + 1),
+            range(math.floor(y_start / self.bucket_size), math.floor(y_end / self.bucket_size) + 1))
+
+    def addRectangle(self, rectangle):
+        bounds = self.getBounds(rectangle)
+        rectangle_id = len(self.bounds)
+        self.bounds.append(bounds)
+
+        horizontal_range, vertical_range = self.getBucketRange(bounds)
+        for i in horizontal_range:
+            for j in vertical_range:
+                self.buckets.setdefault((i, j), []).append(rectangle_id)
+
+    def getNearbyRectangleIds(self, rectangle):
+        """
+        Returns the ids, in order of addition, of the rectangles that share at least one bucket with the rectangle
+        """
+
+        horizontal_range, vertical_range = self.getBucketRange(self.getBounds(rectangle))
+
+        rectangle_ids = set()
+        for i in horizontal_range:
+            for j in vertical_range:
+                rectangle_ids.update(self.buckets.get((i, j), ()))
+
+        return sorted(rectangle_ids)
+
+    def intersects(self, rectangle):
+        """
+        Returns True when the rectangle overlaps one of the indexed rectangles, touching edges do not count as overlap like in
+        Rectangle.intersection
+        """
+
+        x_start, y_start, x_end, y_end = self.getBounds(rectangle)
+        horizontal_range, vertical_range = self.getBucketRange((x_start, y_start, x_end, y_end))
+
+        checked_ids = set()
+        for i in horizontal_range:
+            for j in vertical_range:
+                for rectangle_id in self.buckets.get((i, j), ()):
+                    if rectangle_id in checked_ids:
+                        continue
+                    checked_ids.add(rectangle_id)
+
+                    other_x_start, other_y_start, other_x_end, other_y_end = self.bounds[rectangle_id]
+                    if x_end <= other_x_start + Geometry.tolerance or x_start >= other_x_end - Geometry.tolerance:
+                        continue
+                    if y_start >= other_y_end - Geometry.tolerance or y_end <= other_y_start + Geometry.tolerance:
+                        continue
+
+                    return True
+
+        return False
@@ -1,9 +1,14 @@
 from rectangle_packing.rectangle import Rectangle
 from rectangle_packing.grid import Grid
 from rectangle_packing.database_manager import DatabaseManager
+from rectangle_packing.stacking_session import StackingSession
+from rectangle_packing.layout_improver import LayoutImprover
 from rectangle_packing.excel_parser import *
 from rectangle_packing.zcc_creator import ZccCreator
 from rectangle_packing.helper import Helper
+from rectangle_packing.geometry import Geometry
+from rectangle_packing.cut_time_estimator import CutTimeEstimator
+from rectangle_packing.placement_engine import BruteForcePlacementEngine, SkylinePlacementEngine, FreeSpacePlacementEngine, FitMapPlacementEngine, NormOrderedPlacementEngine
 
 import random
 import time
@@ -11,6 +16,7 @@ import numpy as np
 import copy
 import getpass
 import uuid
+import multiprocessing
 
 class Error(Exception):
     """Base class for other exceptions"""
@@ -28,18 +34,50 @@ class RotatedAndOriginalRectangleDoNotFitError(Error):
     """Raised when both original and rotated rectangle do not fit in grid"""
     pass
 
+class UnknownOrderingError(Error):
+    """Raised when an ordering of the orders is not known"""
+    pass
+
 class Stacker(object):
     """
     Contains the algorithm for stacking rectangles in a grid in 2D. The rectangles are first sorted at centimeter accuracy. First the rectangles are sorted
     using in descending order based on the area, after which they are stacked to the most lower left position. After that the rectangles are shrunken to their exact
     millimeter size and moved left and downwards until they cannot be moved further. The result is a millimeter accuracy stacked grid.
+
+    When stacking on millimeters the rectangles are stacked at their exact size with their edges on whole millimeters in one pass,
+    the grids are exported without moving the rectangles afterwards.
     """
 
     def __init__(self, data_logger=DataLogger()):
         self.db_manager = DatabaseManager()
+
+        # changes are written to the database directly, except during start() when they are collected in a stacking session
+        self.session = self.db_manager
         self.setStandardSizesToFill([])
         self.setFillOrdersWithSmallerGridWidths(False)
 
+        # number of worker processes used to stack independent partitions of the orders in automatic mode
+        self.setNumProcesses(1)
+
+        # orderings of the orders that are tried in automatic mode, with more than one the best layout within the budget wins
+        self.setOrderings(["area"])
+        self.setOrderingBudget(60)
+
+        # optional improvement phase over the layouts of the grids stacked in automatic mode
+        self.setLayoutImprover(None)
+
+        # identical orders can be stacked together as one block of rows and columns
+        self.setTileIdenticalRectangles(False)
+
+        # stack the exact sizes on millimeters instead of the rounded sizes on centimeters, set before the placement engine
+        self.stack_on_millimeters = False
+
+        # open grids of earlier incremental runs by name with a hash of their documents, their free space is kept between runs
+        self.open_grids = {}
+
+        # feed rates of the cutter, used to estimate the cut time of the exported grids
+        self.setCutTimeEstimator(CutTimeEstimator())
+
         self.rectangles = []
         self.is_stacking = False
 
@@ -48,6 +86,10 @@ class Stacker(object):
         self.grid = Grid()
         self.setDataLogger(data_logger)
 
+        # strategy used to compute the stacking position of a rectangle in a grid, the norm ordered engine gives the same
+        # positions as the brute force scan and also supports stacking on millimeters
+        self.setPlacementEngine(NormOrderedPlacementEngine())
+
         # stacking position of current rectangle
         self.stacking_position = []
 
@@ -60,6 +102,20 @@ class Stacker(object):
     def getDataLogger(self):
         return self.data_logger
 
+    def setPlacementEngine(self, placement_engine):
+        print("Set placement engine to " + str(placement_engine.getName()))
+        placement_engine.setStackOnMillimeters(self.stack_on_millimeters)
+        self.placement_engine = placement_engine
+
+    def getPlacementEngine(self):
+        return self.placement_engine
+
+    def setCutTimeEstimator(self, cut_time_estimator):
+        self.cut_time_estimator = cut_time_estimator
+
+    def getCutTimeEstimator(self):
+        return self.cut_time_estimator
+
     def setRectangle(self, rectangle):
         self.rectangle = rectangle
 
@@ -94,6 +150,70 @@ class Stacker(object):
     def getFillSmallerGridWidths(self):
         return self.fill_smaller_grid_widths
 
+    def setNumProcesses(self, num_processes):
+        self.num_processes = max(int(num_processes), 1)
+
+    def getNumProcesses(self):
+        return self.num_processes
+
+    def setOrderings(self, orderings):
+        for ordering in orderings:
+            if ordering not in self.getOrderingKeys():
+                raise UnknownOrderingError(ordering)
+
+        self.orderings = list(orderings)
+
+    def getOrderings(self):
+        return self.orderings
+
+    def setOrderingBudget(self, seconds):
+        self.ordering_budget = seconds
+
+    def getOrderingBudget(self):
+        return self.ordering_budget
+
+    def setTileIdenticalRectangles(self, should_be_tiled):
+        self.tile_identical_rectangles = should_be_tiled
+
+    def getTileIdenticalRectangles(self):
+        return self.tile_identical_rectangles
+
+    def setStackOnMillimeters(self, stack_on_millimeters):
+        self.placement_engine.setStackOnMillimeters(stack_on_millimeters)
+        self.stack_on_millimeters = stack_on_millimeters
+
+    def getStackOnMillimeters(self):
+        return self.stack_on_millimeters
+
+    def setLayoutImprover(self, layout_improver):
+        self.layout_improver = layout_improver
+
+    def getLayoutImprover(self):
+        return self.layout_improver
+
+    @staticmethod
+    def getOrderingKeys():
+        return {
+            "area": lambda r: r.getWidth() * r.getHeight(),
+            "longest_side": lambda r: max(r.getWidth(), r.getHeight()),
+            "height": lambda r: r.getHeight(),
+            "width": lambda r: r.getWidth(),
+            "perimeter": lambda r: 2 * (r.getWidth() + r.getHeight())
+        }
+
+    def getSettings(self):
+        return {"placement_engine": self.placement_engine, "standard_sizes_to_fill": self.standard_sizes_to_fill,
+            "fill_orders_with_smaller_grid_widths": self.fill_orders_with_smaller_grid_widths, "orderings": self.orderings[:1],
+            "tile_identical_rectangles": self.tile_identical_rectangles, "stack_on_millimeters": self.stack_on_millimeters}
+
+    def setSettings(self, settings):
+        self.setPlacementEngine(settings["placement_engine"])
+        self.setStandardSizesToFill(settings["standard_sizes_to_fill"])
+        self.setFillOrdersWithSmallerGridWidths(settings["fill_orders_with_smaller_grid_widths"])
+        self.setOrderings(settings["orderings"])
+        self.setTileIdenticalRectangles(settings["tile_identical_rectangles"])
+        self.setStackOnMillimeters(settings["stack_on_millimeters"])
+
     def getUnstackedRectangles(self):
         return [rectangle for rectangle in self.rectangles if not rectangle.isStacked()]
 
@@ -103,7 +223,7 @@ class Stacker(object):
     def getCoupage(self):
         return self.coupage
 
-    def start(self, automatic=True):     
+    def start(self, automatic=True, deadline=None, incremental=False):     
         """ 
         Starts stacking the current unstacked rectangles from database in self.grid
 
@@ -111,20 +231,298 @@ class Stacker(object):
         -----------
         automatic: Automatically create grids when not available and stack all unstacked rectangles in these grids (loop over all the grids instead of only self.grid)
         When automatic is false, the user should manually set a grid to be used for stacking.
+        deadline: Time in seconds after which the best layout found so far is committed and exported, only used in automatic mode.
+        The deadline bounds the refinement and improvement of the layout. The first skyline layout and the export of the grids are
+        always finished, so a large batch can end after the deadline.
+        incremental: First stack the new orders in the gaps of the open grids with the same brand, color and grid width, only the
+        grids that changed are exported. Used when a packing list is added to grids that are not cut yet.
         """
 
         self.start_time = time.time()
+        self.data_logger.clearCutMetrics()
+
+        self.session = StackingSession(self.db_manager)
+        self.session.load()
+
+        try:
+            total_amount_of_unstacked_rectangles = self.stackInSession(automatic, deadline, incremental)
+        finally:
+            self.session = self.db_manager
+
+        self.total_time = time.time() - self.start_time
+        self.data_logger.setTotalExecutionTime(self.total_time)
+        self.data_logger.setSuccessfullyStackedRectangles(total_amount_of_unstacked_rectangles)
+        self.data_logger.storeData()
+
+    def stackInSession(self, automatic=True, deadline=None, incremental=False):
+        # the files of the coupages are written right away, so they are committed before stacking can be stopped
         self.getAndExportCoupages()
+        self.session.commit()
         self.is_stacking = True
         # self.loadOrdersAndAddToDatabase()
 
         self.getAllUnstackedRectanglesFromDatabaseAndSortOnArea()
         total_amount_of_unstacked_rectangles = len(self.getUnstackedRectangles())
 
+        if incremental:
+            self.fillGapsOfOpenGrids()
+
+        if not self.anyUnstackedRectangles():
+            print("No unstacked rectangles left to stack")
+        elif automatic and deadline is not None:
+            self.stackBeforeDeadline(self.start_time + deadline)
+        elif automatic and len(self.orderings) > 1:
+            self.stackOrderingPortfolio()
+        elif automatic and self.num_processes > 1:
+            self.stackPartitionsInParallel()
+        else:
+            self.stackGrids(automatic)
+
+        if self.layout_improver is not None and not self.stackingStopped():
+            if deadline is None:
+                self.improveLayoutsOfGrids()
+            elif time.time() < self.start_time + deadline:
+                # the improvement phase may only use the time that is left
+                time_limit = self.layout_improver.getTimeLimit()
+                self.layout_improver.setTimeLimit(min(time_limit, self.start_time + deadline - time.time()))
+                try:
+                    self.improveLayoutsOfGrids()
+                finally:
+                    self.layout_improver.setTimeLimit(time_limit)
+
+        # nothing is written to the database when the operator pressed stop
+        if self.stackingStopped():
+            print("Stacking stopped, changes are not saved")
+            self.session.rollback()
+
+            # the cached open grids can hold rectangles that are not saved
+            self.open_grids = {}
+        else:
+            self.exportNonEmptyGrids(only_changed=incremental)
+            changed_grid_names = self.session.getChangedGridNames()
+            self.session.commit()
+
+            if incremental:
+                self.refreshOpenGrids(changed_grid_names)
+
+        if deadline is not None and time.time() > self.start_time + deadline:
+            print("Finished " + str(round(time.time() - self.start_time - deadline, 1)) + "s after the deadline, the skyline layout and export are not bounded")
+
+        return total_amount_of_unstacked_rectangles
+
+    def stackPartitionsInParallel(self):
+        """
+        Orders are only stacked in grids with the same brand, color and grid width, so these partitions are stacked
+        independently in worker processes. The changes are merged in the order of the grid numbers, new grids are numbered
+        after merging. Orders of smaller grid widths can fill a grid, in that case the partitions are not split on grid width.
+        """
+
+        partitions = self.session.getPartitions(use_grid_width=not self.fill_orders_with_smaller_grid_widths)
+        if len(partitions) <= 1:
+            self.stackGrids(automatic=True)
+            return
+
+        num_processes = min(self.num_processes, len(partitions))
+        print("Stacking " + str(len(partitions)) + " partitions in " + str(num_processes) + " processes")
+
+        arguments = [(rectangle_documents, grid_documents, self.getSettings()) for rectangle_documents, grid_documents in partitions]
+
+        all_changes = []
+        with multiprocessing.Pool(num_processes) as pool:
+            for changes in pool.imap(stackPartition, arguments):
+                all_changes.append(changes)
+
+                # break out of loop when operator presses stop button
+                if self.stackingStopped():
+                    pool.terminate()
+                    return
+
+        for changes in all_changes:
+            self.session.mergeChanges(changes)
+
+    def stackOrderingPortfolio(self):
+        """
+        Stacks the same orders with every ordering in worker processes and keeps the layout with the lowest sum of the
+        highest vertical points of the grids. Orderings that are not finished within the budget are stopped, but the
+        first finished ordering is always waited for.
+        """
+
+        candidates = []
+        for ordering in self.orderings:
+            settings = self.getSettings()
+            settings["orderings"] = [ordering]
+            candidates.append(("ordering " + ordering, settings))
+
+        best = self.stackCandidatesInPool(candidates, time.time() + self.ordering_budget)
+
+        if self.stackingStopped() or best is None:
+            return
+
+        print("Best layout is stacked with " + best[0])
+        self.session.mergeChanges(best[1])
+
+    def stackBeforeDeadline(self, deadline):
+        """
+        Anytime stacking: the orders are first stacked with the fast skyline placement engine, which gives a valid layout to fall
+        back on. While time is left the orders are stacked again in worker processes with the placement engine of the stacker
+        and every ordering, the best layout that is finished before the deadline is kept. The skyline layout is not bounded by
+        the deadline, it is always finished.
+        """
+
+        rectangle_documents, grid_documents = self.session.getDocuments()
+
+        settings = self.getSettings()
+        settings["placement_engine"] = SkylinePlacementEngine()
+        print("Stacking with " + settings["placement_engine"].getName() + " before refining")
+        changes, score = stackOrdering((rectangle_documents, grid_documents, settings))
+        best = ("skyline", changes, score)
+        print("Layout stacked with skyline has score " + str(score))
+
+        # the orderings of the stacker are tried first
+        orderings = self.orderings + [ordering for ordering in self.getOrderingKeys() if ordering not in self.orderings]
+
+        candidates = []
+        for ordering in orderings:
+            settings = self.getSettings()
+            settings["orderings"] = [ordering]
+            candidates.append(("ordering " + ordering, settings))
+
+        if time.time() < deadline and not self.stackingStopped():
+            best = self.stackCandidatesInPool(candidates, deadline, best)
+        else:
+            print("Deadline passed, no time left to refine the layout")
+
+        if self.stackingStopped():
+            return
+
+        print("Best layout before deadline is stacked with " + best[0])
+        self.session.mergeChanges(best[1])
+
+    def stackCandidatesInPool(self, candidates, deadline, best=None):
+        """
+        Stacks the session with the settings of every (name, settings) candidate in worker processes. Returns the best of the given
+        best (name, changes, score) and the candidates finished before the deadline, the first one wins on equal score. When there
+        is no best layout yet, the first finished candidate is waited for.
+        """
+
+        rectangle_documents, grid_documents = self.session.getDocuments()
+        num_processes = max(min(len(candidates), self.num_processes), 1)
+        print("Stacking " + str(len(candidates)) + " candidates in " + str(num_processes) + " processes")
+
+        with multiprocessing.Pool(num_processes) as pool:
+            results = []
+            for name, settings in candidates:
+                results.append(pool.apply_async(stackOrdering, ((rectangle_documents, grid_documents, settings),)))
+
+            while not all(result.ready() for result in results) and not self.stackingStopped():
+                if time.time() > deadline and (best is not None or any(result.ready() for result in results)):
+                    print("Deadline exceeded, stopping candidates that are not finished")
+                    break
+                time.sleep(0.05)
+
+            for (name, settings), result in zip(candidates, results):
+                if result.ready():
+                    changes, score = result.get()
+                    print("Layout stacked with " + name + " has score " + str(score))
+
+                    if best is None or score < best[2]:
+                        best = (name, changes, score)
+
+            pool.terminate()
+
+        return best
+
+    def fillGapsOfOpenGrids(self):
+        """
+        Stacks the unstacked rectangles in the gaps of the open grids that can hold them, a gap lies below the highest vertical
+        point of the grid. Rectangles that do not fit are left for the normal stacking afterwards, which can also stack them on
+        top, so no new grids are created before every matching open grid is tried.
+        """
+
+        for grid in self.getOpenGridsMatchingUnstackedRectangles():
+            # an empty grid has no gaps
+            highest_vertical_point = int(np.floor(grid.getHighestVerticalPoint()))
+            if highest_vertical_point <= 0:
+                continue
+
+            print("Filling gaps of open grid " + str(grid.getName()))
+            self.setGrid(grid)
+
+            if self.fill_orders_with_smaller_grid_widths:
+                self.getUnstackedRectanglesOfAllSmallerGridWidthsThanOriginalSortedOnArea()
+            else:
+                self.getUnstackedRectanglesFromDatabaseMatchingAllGridPropertiesSortedOnArea()
+
+            # the grid is cut off at its highest vertical point while filling gaps, so nothing is stacked on top
+            height = grid.getHeight()
+            num_stacked_rectangles = grid.getNumStackedRectangles()
+            grid.setHeight(highest_vertical_point)
+            self.stackUnstackedRectanglesInGrid(only_gaps=True)
+            grid.setHeight(height)
+
+            # a grid in which nothing is stacked is not changed, so it is not exported again
+            if grid.getNumStackedRectangles() > num_stacked_rectangles:
+                self.session.updateGrid(grid)
+
+            # break out of loop when operator presses stop button
+            if self.stackingStopped():
+                break
+
+        self.getAllUnstackedRectanglesFromDatabaseAndSortOnArea()
+
+    def getOpenGridsMatchingUnstackedRectangles(self):
+        """
+        Returns the grids that are not cut and have the brand, color and grid width of an unstacked rectangle, sorted on width
+        """
+
+        keys = set((rectangle.getBrand(), rectangle.getColor(), rectangle.getGridWidth()) for rectangle in self.getUnstackedRectangles())
+
+        grids = {}
+        for brand, color, grid_width in keys:
+            # orders of smaller grid widths can fill the gaps of larger grids
+            width = 'all' if self.fill_orders_with_smaller_grid_widths else grid_width
+
+            for document in self.session.getGridDocumentsNotCutByWidthBrandColor(width=width, brand=brand, color=color):
+                if document["width"] >= grid_width:
+                    grids[document["name"]] = self.getOpenGrid(document["name"])
+
+        return sorted(grids.values(), key=lambda g: g.getWidth(), reverse=True)
+
+    def getOpenGrid(self, grid_number):
+        """
+        Returns the open grid from the cache when its documents did not change since it was cached, so its free space is not
+        built again. Otherwise the grid is created from the documents and cached.
+        """
+
+        grid_hash = (self.session.getGridHash(grid_number), self.stack_on_millimeters)
+        if grid_number in self.open_grids and self.open_grids[grid_number][0] == grid_hash:
+            print("Using cached free space of grid " + str(grid_number))
+            return self.open_grids[grid_number][1]
+
+        grid = self.session.getGrid(grid_number, for_cutting=self.stack_on_millimeters)
+        grid.getFreeSpaceIndex()
+        self.open_grids[grid_number] = (grid_hash, grid)
+
+        return grid
+
+    def refreshOpenGrids(self, grid_numbers):
+        """
+        Caches the changed grids again after they are exported and committed, the export moves the rectangles to their final
+        positions. Grids that are cut are not open anymore.
+        """
+
+        open_grid_numbers = [document["name"] for document in self.session.getGridDocumentsNotCutByWidthBrandColor()]
+
+        for grid_number in grid_numbers:
+            self.open_grids.pop(grid_number, None)
+            if grid_number in open_grid_numbers:
+                self.getOpenGrid(grid_number)
+
+    def stackGrids(self, automatic=True):
         while self.anyUnstackedRectangles() and not self.stackingStopped():
             if automatic:
                 self.createGridInDatabaseIfNotAvailable()
-                self.grids = self.db_manager.getGridsNotCut(sort=True)
+                self.grids = self.session.getGridsNotCut(sort=True, for_cutting=self.stack_on_millimeters)
             else:
                 self.grids = []
                 self.grids.append(self.grid)
@@ -153,28 +551,45 @@ class Stacker(object):
 
             self.getAllUnstackedRectanglesFromDatabaseAndSortOnArea()
         
-        self.optimizeOnMillimetersAndExportNonEmptyGrids()
-        self.total_time = time.time() - self.start_time
-        self.data_logger.setTotalExecutionTime(self.total_time)
-        self.data_logger.setSuccessfullyStackedRectangles(total_amount_of_unstacked_rectangles)
-        self.data_logger.storeData()
-        
-    def optimizeOnMillimetersAndExportNonEmptyGrids(self):
-        self.grids = self.db_manager.getGridsNotCut(sort=True)
+    def improveLayoutsOfGrids(self):
+        """
+        Stacks the grids that changed in this session again with the layout improver and keeps the layouts that use less length
+        """
+
+        changed_grid_names = self.session.getChangedGridNames()
+        grids = [grid for grid in self.session.getGridsNotCut(sort=True) if grid.getName() in changed_grid_names and not grid.isEmpty()]
+
+        for grid, rectangles in self.layout_improver.improveGrids(grids):
+            for rectangle in rectangles:
+                self.session.updateRectangle(rectangle)
+
+            grid.setStackedRectangles(rectangles)
+            self.session.updateGrid(grid)
+
+    def exportNonEmptyGrids(self, only_changed=False):
+        self.grids = self.session.getGridsNotCut(sort=True)
+        if only_changed:
+            changed_grid_names = self.session.getChangedGridNames()
+            self.grids = [grid for grid in self.grids if grid.getName() in changed_grid_names]
+
         for grid in self.grids:
             if not grid.isEmpty():
                 self.setGrid(grid)
-                self.convertRectanglesToMillimetersOptimizeAndExportGrid()
+
+                if self.stack_on_millimeters:
+                    self.exportGrid()
+                else:
+                    self.convertRectanglesToMillimetersOptimizeAndExportGrid()
 
     def stackOrdersWithSmallerGridWidths(self):
         self.getUnstackedRectanglesOfAllSmallerGridWidthsThanOriginalSortedOnArea()
-        self.stackUnstackedRectanglesInGrid()
+        self.stackUnstackedRectanglesInGrid(smaller=True)
 
     def shrinkGridToHeighestVerticalStackedPoint(self):
         # set height to heighest point because we only want to stack in the gaps
         # of the stack, not add more at the top
         self.grid.setHeight(self.grid.getHighestVerticalPoint())
-        self.db_manager.updateGrid(self.grid)
+        self.session.updateGrid(self.grid)
 
     def enlargeGridToStandardSize(self):
         if self.grid.getBrand().lower() == 'kokos' and self.grid.getWidth() == 100:
@@ -185,10 +600,10 @@ class Stacker(object):
             grid_height = 980
 
         self.grid.setHeight(grid_height)
-        self.db_manager.updateGrid(self.grid)
+        self.session.updateGrid(self.grid)
                     
     def getUncutAreasOfGrids(self):
-        grids = self.db_manager.getGridsNotCut()
+        grids = self.session.getGridsNotCut()
         result = []
 
         for grid in grids:
@@ -198,7 +613,7 @@ class Stacker(object):
         return result
 
     def getAndExportCoupages(self):
-        coupages = self.db_manager.getUnstackedRectangles(for_cutting=True, coupage_batch="coupage")
+        coupages = self.session.getUnstackedRectangles(for_cutting=True, coupage_batch="coupage")
         for coupage in coupages:
             self.setCoupage(coupage)
             self.rotateCoupageToLargestSideUpwards()
@@ -210,18 +625,16 @@ class Stacker(object):
 
         if _width > _height:
             print("Coupage width is larger than height")
-            width, height = Helper.swap(_width, _height)
             print("Width before swap = " + str(self.coupage.getWidth()))
-            self.coupage.setWidth(width)
-            self.coupage.setHeight(height)
+            self.coupage.rotate()
             print("Width after swap = " + str(self.coupage.getWidth()))
-            self.db_manager.updateRectangle(self.coupage)
+            self.session.updateRectangle(self.coupage)
 
     def exportAndUpdateCoupage(self):
         self.coupage.toDxf(for_prime_center=True)
         self.coupage.toZcc()
         self.coupage.setStacked()
-        self.db_manager.updateRectangle(self.coupage)
+        self.session.updateRectangle(self.coupage)
 
     def loadOrdersAndAddToDatabase(self):
         try:
@@ -230,6 +643,16 @@ class Stacker(object):
         except EmptyExcelError:
             print("Excel file is empty!")
 
+    def computeRectangleOrder(self, rectangles):
+        if self.orderings[0] == "area":
+            return self.computeRectangleOrderArea(rectangles)
+
+        key = self.getOrderingKeys()[self.orderings[0]]
+        values = [key(rectangle) for rectangle in rectangles]
+        indices_ascending_order = sorted(range(len(values)), key=lambda k: values[k])
+
+        return list(reversed([rectangles[idx] for idx in indices_ascending_order]))
+
     def computeRectangleOrderArea(self, rectangles):
         areas = [x.getArea() for x in rectangles]
         indices_descending_order = sorted(range(len(areas)), key=lambda k: areas[k])
@@ -246,19 +669,25 @@ class Stacker(object):
             while True:
                 
                 if not self.stackingStopped():
+                    # stop when there is no gap left that can hold this size
+                    if self.grid.isKnownNotToFit(size[0], size[1]) and self.grid.isKnownNotToFit(size[1], size[0]):
+                        break
+                    if not (self.grid.hasFreeRegion(size[0], size[1]) or self.grid.hasFreeRegion(size[1], size[0])):
+                        break
+
                     rectangle = Rectangle(width=size[0], height=size[1], 
                         client_name="Voorraad_" + str(size[0]) + "x" + str(size[1]) + "_" + str(uuid.uuid4())[-4:], name="Voorraad_" + str(size[0]) + "x" + str(size[1]) + "_" + str(uuid.uuid4())[-4:], 
                         grid_width=self.grid.getWidth(), brand=self.grid.getBrand(),
                         color=self.grid.getColor())
 
-                    self.db_manager.addRectangle(rectangle)
+                    self.session.addRectangle(rectangle)
                     self.setRectangle(rectangle)
 
                     try:
                         print("Grid height = " + str(self.grid.getHeight()))
                         self.stackOriginalOrRotatedRectangleAndUpdateDatabase()
                     except RotatedAndOriginalRectangleDoNotFitError:
-                        self.db_manager.removeRectangle(rectangle)
+                        self.session.removeRectangle(rectangle)
                         break
 
                 else: break
@@ -266,18 +695,25 @@ class Stacker(object):
     def getUnstackedRectanglesOfAllSmallerGridWidthsThanOriginalSortedOnArea(self):
         self.rectangles = []
 
-        unstacked_rectangles = self.db_manager.getUnstackedRectangles(color=self.grid.getColor(), 
+        unstacked_rectangles = self.session.getUnstackedRectangles(color=self.grid.getColor(), 
             brand=self.grid.getBrand(), for_cutting=True)
 
         for rectangle in unstacked_rectangles:
             if rectangle.getGridWidth() <= self.grid.getWidth():
                 self.rectangles.append(rectangle)
 
-        self.rectangles = self.computeRectangleOrderArea(self.rectangles)
+        self.rectangles = self.computeRectangleOrder(self.rectangles)
+        self.roundRectangles()
+        
+    def roundRectangles(self):
+        # when stacking on millimeters the exact sizes are stacked
+        if self.stack_on_millimeters:
+            return
+
         for rectangle in self.rectangles:
             rectangle.roundWidth()
             rectangle.roundHeight()
-        
+
     def anyUnstackedRectangles(self):
         return len(self.getUnstackedRectangles()) > 0
 
@@ -296,32 +732,26 @@ class Stacker(object):
                 else:
                     grid_height = 980
         
-                self.db_manager.createUniqueGrid(width=rectangle.getGridWidth(), height=grid_height, article_name=rectangle.getArticleName(), material=rectangle.getMaterial(), color=rectangle.getColor(), brand=rectangle.getBrand())
+                self.session.createUniqueGrid(width=rectangle.getGridWidth(), height=grid_height, article_name=rectangle.getArticleName(), material=rectangle.getMaterial(), color=rectangle.getColor(), brand=rectangle.getBrand())
 
     def getUnstackedRectanglesFromDatabaseMatchingAllGridPropertiesSortedOnArea(self):
-        self.rectangles = self.db_manager.getUnstackedRectangles(color=self.grid.getColor(),
+        self.rectangles = self.session.getUnstackedRectangles(color=self.grid.getColor(),
             brand=self.grid.getBrand(), grid_width=self.grid.getWidth(), for_cutting=True)
 
-        self.rectangles = self.computeRectangleOrderArea(self.rectangles)
-        for rectangle in self.rectangles:
-            rectangle.roundWidth()
-            rectangle.roundHeight()
+        self.rectangles = self.computeRectangleOrder(self.rectangles)
+        self.roundRectangles()
 
     def getUnstackedRectanglesFromDatabaseMatchingGridColorBrandSortedOnArea(self):
-        self.rectangles = self.db_manager.getUnstackedRectangles(color=self.grid.getColor(),
+        self.rectangles = self.session.getUnstackedRectangles(color=self.grid.getColor(),
             brand=self.grid.getBrand(), for_cutting=True)
 
-        self.rectangles = self.computeRectangleOrderArea(self.rectangles)
-        for rectangle in self.rectangles:
-            rectangle.roundWidth()
-            rectangle.roundHeight()
+        self.rectangles = self.computeRectangleOrder(self.rectangles)
+        self.roundRectangles()
 
     def getAllUnstackedRectanglesFromDatabaseAndSortOnArea(self):
-        self.rectangles = self.db_manager.getUnstackedRectangles(for_cutting=True)
-        self.rectangles = self.computeRectangleOrderArea(self.rectangles)
-        for rectangle in self.rectangles:
-            rectangle.roundWidth()
-            rectangle.roundHeight()
+        self.rectangles = self.session.getUnstackedRectangles(for_cutting=True)
+        self.rectangles = self.computeRectangleOrder(self.rectangles)
+        self.roundRectangles()
 
     def isGridAvailable(self, rectangle):
         grid_width = rectangle.getGridWidth()
@@ -331,7 +761,7 @@ class Stacker(object):
         print("Is grid available?")
         print("Color: " + rectangle.getColor())
         print("Brand: " + rectangle.getBrand())
-        return len(self.db_manager.getGridsNotCutByWidthBrandColor(width=grid_width, color=color, brand=brand)) > 0        
+        return len(self.session.getGridsNotCutByWidthBrandColor(width=grid_width, color=color, brand=brand)) > 0        
 
     def rectangleAndGridPropertiesMatch(self):
         return (self.grid.getBrand() == self.rectangle.getBrand()) and (self.grid.getColor() == self.rectangle.getColor())
@@ -345,13 +775,13 @@ class Stacker(object):
         else:
             grid_height = 980
 
-        new_grid = self.db_manager.createUniqueGrid(width=self.rectangle.getGridWidth(), height = grid_height, 
+        new_grid = self.session.createUniqueGrid(width=self.rectangle.getGridWidth(), height = grid_height, 
         article_name=self.rectangle.getArticleName(), material=self.rectangle.getMaterial(), brand=self.rectangle.getBrand(), color=self.rectangle.getColor())
         
         self.setGrid(new_grid)
 
         # for some reason new_grid starts out filled in an iteration
-        self.db_manager.emptyGrid(new_grid)
+        self.session.emptyGrid(new_grid)
 
         try:
             self.stackOriginalOrRotatedRectangleAndUpdateDatabase()
@@ -363,74 +793,65 @@ class Stacker(object):
         print("Optimizing grid " + str(self.grid.getName()) + " and exporting to DXF...")
         self.getRectanglesExactWidthHeight()            
 
-        self.grid.empty()
-        
-        
-        # size to move rectangles in x and y direction
-        step_size = 0.001
+        # rectangles that are not optimized yet are obstacles at their centimeter stacking position
+        self.grid.setStackedRectangles(copy.deepcopy(self.exact_rectangles))
 
         for exact_rectangle in self.exact_rectangles:
 
             print("Optimizing " + str(exact_rectangle.getName()) + '.....')
-            self.is_optimized_x = False
-            self.is_optimized_y = False
 
             # copy needed because otherwise variables have the same address
             self.optimized_rectangle = copy.deepcopy(exact_rectangle)
+            self.grid.removeRectangle(self.optimized_rectangle)
 
-            while not self.is_optimized_x:
-                self.moveRectangleHorizontally(step_size)
-                        
-            while not self.is_optimized_y:
-                self.moveRectangleVertically(step_size)
+            self.moveRectangleHorizontally()
+            self.moveRectangleVertically()
             
-            self.db_manager.updateRectangle(self.optimized_rectangle)
+            self.session.updateRectangle(self.optimized_rectangle)
             self.grid.addRectangle(self.optimized_rectangle)
             
         self.grid.toDxf(for_prime_center=True, remove_overlap=True)
-        self.grid.toZcc()
+        self.grid.toZcc(self.cut_time_estimator)
+        self.data_logger.addCutMetrics(self.grid.getCutMetrics())
+
+    def exportGrid(self):
+        print("Exporting grid " + str(self.grid.getName()) + " to DXF...")
+        self.getRectanglesExactWidthHeight()
+
+        # rectangles stacked on millimeters are not moved, layouts of the improvement phase are stacked on centimeters
+        for exact_rectangle in self.exact_rectangles:
+            self.session.updateRectangle(exact_rectangle)
+
+        self.grid.setStackedRectangles(self.exact_rectangles)
+        self.grid.toDxf(for_prime_center=True, remove_overlap=True)
+        self.grid.toZcc(self.cut_time_estimator)
+        self.data_logger.addCutMetrics(self.grid.getCutMetrics())
 
     def getRectanglesExactWidthHeight(self):
-        self.exact_rectangles = self.db_manager.getRectangles(self.grid, for_cutting=True, sort=True)
+        self.exact_rectangles = self.session.getRectangles(self.grid, for_cutting=True, sort=True)
+
+        # the exact rectangles are centered in their rounded size, put their edges on whole millimeters
+        for exact_rectangle in self.exact_rectangles:
+            Geometry.snapToMillimeters(exact_rectangle)
         # self.grid.setStackedRectangles(self.exact_rectangles)
         
-    def moveRectangleHorizontally(self, step_size):
-        self.grid.removeRectangle(self.optimized_rectangle)
-
+    def moveRectangleHorizontally(self):
         x = self.optimized_rectangle.getPosition()[0]
         y = self.optimized_rectangle.getPosition()[1]
 
-        x_new = x - step_size
-        
-        self.optimized_rectangle.setPosition([x_new, y])
-
-
-        if not self.grid.isValidPosition(self.optimized_rectangle):
-            print("Cannot optimize further in x direction")
-            self.optimized_rectangle.setPosition([x, y])
-            print(self.optimized_rectangle)
-            self.is_optimized_x = True
-        else:
-            pass
-            # move x to x_new
-
-    def moveRectangleVertically(self, step_size):
-        self.grid.removeRectangle(self.optimized_rectangle)
+        # jump to the nearest obstacle on the left in one move
+        clearance = self.grid.getLeftClearance(self.optimized_rectangle)
+        self.optimized_rectangle.setPosition([x - clearance, y])
+        print("Moved " + str(self.optimized_rectangle.getName()) + " " + str(clearance) + " to the left")
 
+    def moveRectangleVertically(self):
         x = self.optimized_rectangle.getPosition()[0]
         y = self.optimized_rectangle.getPosition()[1]
 
-        y_new = y - step_size
-
-        self.optimized_rectangle.setPosition([x, y_new])
-        
-        if not self.grid.isValidPosition(self.optimized_rectangle):
-            print("Cannot optimize further in y direction")
-            self.optimized_rectangle.setPosition([x, y])
-            self.is_optimized_y = True
-        else:
-            pass
-            # move y to y_new
+        # jump to the nearest obstacle below in one move
+        clearance = self.grid.getBottomClearance(self.optimized_rectangle)
+        self.optimized_rectangle.setPosition([x, y - clearance])
+        print("Moved " + str(self.optimized_rectangle.getName()) + " " + str(clearance) + " downwards")
 
     def createAndAddNewGrid(self, width, article_name='default', material='kokos', brand='kokos', color='naturel'):
         if self.rectangle.getBrand().lower() == 'kokos' and self.rectangle.getGridWidth() == 100:
@@ -444,157 +865,247 @@ class Stacker(object):
             grid = Grid(width=width, height=grid_height, article_name=article_name, material=material, name=self.grids[-1].getName() + 1, brand=brand, color=color, stacked_rectangles=[])
             self.grids.append(grid)
 
-            self.db_manager.addGrid(grid)
+            self.session.addGrid(grid)
             print("Created and added new grid to database")
 
         except IndexError:
             grid = Grid(width=200, height=grid_height, name=1)
             self.grids.append(grid)
-            self.db_manager.addGrid(grid)
+            self.session.addGrid(grid)
             print("Created and added initial grid to database")
 
-    def stackUnstackedRectanglesInGrid(self, smaller=False):
+    def stackUnstackedRectanglesInGrid(self, smaller=False, only_gaps=False):
+        if self.tile_identical_rectangles and not smaller and not only_gaps:
+            groups = self.groupIdenticalRectangles()
+        else:
+            groups = {}
+
         for rectangle in self.rectangles:
+            # the first rectangle of a group of identical rectangles stacks the group as a tile, when that is better
+            key = self.getIdenticalRectangleKey(rectangle)
+            if key in groups and not rectangle.isStacked():
+                self.stackTileOfIdenticalRectangles(groups.pop(key))
+
             self.setRectangle(rectangle)
 
             if self.rectangleAndGridPropertiesMatch() and not rectangle.isStacked():
+                # orders of smaller grid widths are only used to fill the gaps of the grid
+                if (smaller or only_gaps) and not self.rectangleFitsInFreeRegion():
+                    continue
+
                 try:
                     self.stackOriginalOrRotatedRectangleAndUpdateDatabase()
                 except RotatedAndOriginalRectangleDoNotFitError:
                     print("Both rotated and original do not fit in grid")
-                    self.createNewGridAndStackRectangle()
+                    if not only_gaps:
+                        self.createNewGridAndStackRectangle()
                     continue
 
                 # stop the loop if user presses stop button
                 if self.stackingStopped():
                     break
     
+    def getIdenticalRectangleKey(self, rectangle):
+        return (tuple(sorted((rectangle.getExactWidth(), rectangle.getExactHeight()))), rectangle.getBrand(), rectangle.getColor())
+
+    def groupIdenticalRectangles(self):
+        groups = {}
+        for rectangle in self.rectangles:
+            if not rectangle.isStacked():
+                groups.setdefault(self.getIdenticalRectangleKey(rectangle), []).append(rectangle)
+
+        return {key: rectangles for key, rectangles in groups.items() if len(rectangles) > 1}
+
+    def stackTileOfIdenticalRectangles(self, rectangles):
+        """
+        Stacks the identical rectangles as a tile of full rows when it ends lower in the grid than stacking the same rectangles
+        one by one, the remaining rectangles are stacked one by one
+        """
+
+        tile = self.computeBestTile(rectangles)
+        if tile is None:
+            return
+
+        if tile["highest_vertical_point"] >= self.computeHighestVerticalPointOneByOne(rectangles[0], tile["count"]):
+            print("Tile of " + str(tile["count"]) + " rectangles is not better than stacking them one by one")
+            return
+
+        print("Stacking " + str(tile["count"]) + " rectangles of " + str(tile["width"]) + "x" + str(tile["height"]) + " as a tile of " + str(tile["columns"]) + " columns")
+        for i, rectangle in enumerate(rectangles[:tile["count"]]):
+            row, column = divmod(i, tile["columns"])
+
+            self.setRectangle(rectangle)
+            if rectangle.getWidth() != tile["width"] or rectangle.getHeight() != tile["height"]:
+                rectangle.rotate()
+
+            self.stacking_position = np.array([tile["x_start"] + (column + 0.5) * tile["cell_width"], tile["y_start"] + (row + 0.5) * tile["cell_height"]])
+            self.updateUnstackedRectangleInDatabase()
+
+    def computeBestTile(self, rectangles):
+        """
+        Returns the tile of full rows, in the orientation that ends lowest in the grid, or None when no tile of at least two
+        rectangles fits. Every rectangle gets a cell with an even width and height, so the centers are on whole centimeters. When
+        stacking on millimeters the cells have the exact size of the rectangles.
+        """
+
+        width = rectangles[0].getWidth()
+        height = rectangles[0].getHeight()
+
+        best_tile = None
+        for tile_width, tile_height in [(width, height), (height, width)]:
+            if self.stack_on_millimeters:
+                cell_width = tile_width
+                cell_height = tile_height
+            else:
+                cell_width = tile_width + tile_width % 2
+                cell_height = tile_height + tile_height % 2
+
+            columns = min(int(self.grid.getWidth() // cell_width), len(rectangles))
+            if columns == 0:
+                continue
+
+            rows = len(rectangles) // columns
+            if columns * rows < 2:
+                continue
+
+            block = Rectangle(width=columns * cell_width, height=rows * cell_height, name="tile")
+            position = self.placement_engine.computeStackingPosition(self.grid, block)
+            if position[0] == self.grid.getWidth() and position[1] == self.grid.getHeight():
+                continue
+
+            highest_vertical_point = max(self.grid.getHighestVerticalPoint(), position[1] + block.getHeight() / 2)
+            if best_tile is None or highest_vertical_point < best_tile["highest_vertical_point"]:
+                best_tile = {"width": tile_width, "height": tile_height, "cell_width": cell_width, "cell_height": cell_height,
+                    "columns": columns, "count": columns * rows, "highest_vertical_point": highest_vertical_point,
+                    "x_start": position[0] - block.getWidth() / 2, "y_start": position[1] - block.getHeight() / 2}
+
+        return best_tile
+
+    def computeHighestVerticalPointOneByOne(self, rectangle, count):
+        """
+        Stacks count copies of the rectangle one by one in a copy of the grid and returns the highest vertical point, infinity
+        when they do not all fit
+        """
+
+        grid = Grid(width=self.grid.getWidth(), height=self.grid.getHeight(), stacked_rectangles=list(self.grid.getStackedRectangles()), create_dxf_drawing=False)
+
+        for i in range(count):
+            rectangle = copy.copy(rectangle)
+            stacking_position, stacking_position_rotated = self.placement_engine.computeOriginalAndRotatedStackingPositions(grid, rectangle)
+
+            if np.linalg.norm(stacking_position_rotated) < np.linalg.norm(stacking_position):
+                rectangle.rotate()
+                stacking_position = stacking_position_rotated
+
+            if stacking_position[0] == grid.getWidth() and stacking_position[1] == grid.getHeight():
+                return np.inf
+
+            rectangle.setPosition(stacking_position)
+            grid.addRectangle(rectangle)
+
+        return grid.getHighestVerticalPoint()
+
+    def rectangleFitsInFreeRegion(self):
+        width = self.rectangle.getWidth()
+        height = self.rectangle.getHeight()
+        return self.grid.hasFreeRegion(width, height) or self.grid.hasFreeRegion(height, width)
+
     def stackOriginalOrRotatedRectangleAndUpdateDatabase(self):
         self.chooseOriginalOrRotatedRectangle()
         self.updateUnstackedRectangleInDatabase()
 
     def chooseOriginalOrRotatedRectangle(self):
-        try:
-            self.computeRotatedRectangleStackingPosition()
-        except RectangleDoesNotFitError:
-            print("Rotated rectangle does not fit")
-            pass
+        width = self.rectangle.getWidth()
+        height = self.rectangle.getHeight()
+
+        # a rectangle that is at least as large as a rectangle that did not fit in this version of the grid is not searched for
+        if self.grid.isKnownNotToFit(width, height) and self.grid.isKnownNotToFit(height, width):
+            print("Original and rotated rectangle " + str(self.rectangle.getName()) + " are known not to fit in grid " + str(self.grid.getName()))
+            self.stacking_position = [self.grid.getWidth(), self.grid.getHeight()]
+            self.stacking_position_rotated = [self.grid.getWidth(), self.grid.getHeight()]
+            raise RotatedAndOriginalRectangleDoNotFitError
+
+        print("Computing stacking positions for original and rotated rectangle " + str(self.rectangle.getName()))
+        self.computeOriginalAndRotatedStackingPositions()
 
-        try:
-            self.computeOriginalRectangleStackingPosition()
-        except RectangleDoesNotFitError:
-            print("Original rectangle does not fit")
-            pass
-        
         if self.isRotatedRectangleMoreOptimal():
-            self.updateStackingPositionToRotatedInDatabase()
+            self.updateStackingPositionToRotated()
 
         if self.stacking_position_rotated[0] == self.grid.getWidth() and self.stacking_position_rotated[1] == self.grid.getHeight():
             if self.stacking_position[0] == self.grid.getWidth() and self.stacking_position[1] == self.grid.getHeight():
+                self.grid.addNotFittingSize(width, height)
+                self.grid.addNotFittingSize(height, width)
                 raise RotatedAndOriginalRectangleDoNotFitError
 
-    def computeRotatedRectangleStackingPosition(self):
-        print("Computing stacking position for rotated rectangle " + str(self.rectangle.getName()))
-        
-        self.rectangle.rotate()
-        self.stacking_position_rotated = self.computeStackingPosition()
-        self.rectangle.rotate()
+    def computeOriginalAndRotatedStackingPositions(self):
+        # both orientations are evaluated by the placement engine, which can stop as soon as one of them wins
+        self.stacking_position, self.stacking_position_rotated = self.placement_engine.computeOriginalAndRotatedStackingPositions(self.grid, self.rectangle)
 
         if self.stacking_position_rotated[0] == self.grid.getWidth() and self.stacking_position_rotated[1] == self.grid.getHeight():
-            raise RectangleDoesNotFitError
-        
-    def computeOriginalRectangleStackingPosition(self):
-        print("Computing stacking position for original rectangle " + str(self.rectangle.getName()))
-
-        self.stacking_position = self.computeStackingPosition()
+            print("Rotated rectangle does not fit or is not closer to the origin")
 
         if self.stacking_position[0] == self.grid.getWidth() and self.stacking_position[1] == self.grid.getHeight():
-            raise RectangleDoesNotFitError
+            print("Original rectangle does not fit or is not closer to the origin")
 
     def isRotatedRectangleMoreOptimal(self):
         return np.linalg.norm(self.stacking_position_rotated) < np.linalg.norm(self.stacking_position)
 
-    def updateStackingPositionToRotatedInDatabase(self):
+    def updateStackingPositionToRotated(self):
+        # rotates the exact size as well, the database is updated when the rectangle is stacked
         self.rectangle.rotate()
         self.stacking_position = copy.deepcopy(self.stacking_position_rotated)
 
-        # get exact width height to update database correctly
-        # rotate this rectangle
-        rectangle_exact = self.db_manager.getRectangle(self.rectangle.getName(), for_cutting=True)
-        rectangle_exact.rotate()
-        self.db_manager.updateRectangle(rectangle_exact)
-
     def updateUnstackedRectangleInDatabase(self):
         self.rectangle.setPosition(self.stacking_position)
         self.rectangle.setStacked()
         self.rectangle.setGridNumber(self.grid.getName())
 
-        # get exact rectangle width and height
-        rectangle_exact = self.db_manager.getRectangle(self.rectangle.getName(), for_cutting=True)
-
-        width_exact = rectangle_exact.getWidth()
-        height_exact = rectangle_exact.getHeight()
-        
-        # check if rectangle was rotated in start function
-        w = int(np.ceil(width_exact))
-        # if w % 2 > 0:
-        #     w += 1
-
-        if w == self.rectangle.getHeight():
-            t = height_exact
-            height_exact = width_exact
-            width_exact = t
-            
-        # set rectangle width height back to the exact ones
-        self.rectangle.setWidth(width_exact)
-        self.rectangle.setHeight(height_exact)
+        # set rectangle width height back to the exact ones, these are rotated together with the rounded ones
+        self.rectangle.useExactSize()
 
         for rectangle in self.rectangles:
             if rectangle.getName() == self.rectangle.getName():
                 rectangle.setStacked()
 
         self.grid.addRectangle(self.rectangle)
-        self.db_manager.updateRectangle(self.rectangle)
+        self.session.updateRectangle(self.rectangle)
 
-        self.db_manager.updateGrid(self.grid)
+        self.session.updateGrid(self.grid)
 
-    def computeStackingPosition(self):        
-        stacking_position = [self.grid.getWidth(), self.grid.getHeight()]
-        
-        if self.grid.getWidth() > self.rectangle.getWidth():
-            for x in self.getHorizontalLoopRange():
-                for y in self.getVerticalLoopRange():
-                    position = np.array([x,y])
-                    self.rectangle.setPosition(position)
-                    if self.grid.isValidPosition(self.rectangle) and np.linalg.norm(position) < np.linalg.norm(stacking_position):
-                        stacking_position = position
-                        
-        elif self.grid.getWidth() == self.rectangle.getWidth():
-            x = self.rectangle.getWidth() / 2
-            for y in self.getVerticalLoopRange():
-                position = np.array([x,y])
-                self.rectangle.setPosition(position)
-                if self.grid.isValidPosition(self.rectangle) and np.linalg.norm(position) < np.linalg.norm(stacking_position):
-                    stacking_position = position
-        
-        return stacking_position
+    def computeStackingPosition(self):
+        return self.placement_engine.computeStackingPosition(self.grid, self.rectangle)
 
-    def getHorizontalLoopRange(self):
-        if self.rectangle.getWidth() % 2 > 0:
-            width = self.rectangle.getWidth() + 1
-        else:
-            width = self.rectangle.getWidth()
+def createWorkerStacker(rectangle_documents, grid_documents, settings):
+    stacker = Stacker()
+    stacker.setSettings(settings)
 
-        return reversed(range(int(width/2), int(self.grid.getWidth() - width/2) + 1))        
+    stacker.session = StackingSession(stacker.db_manager)
+    stacker.session.loadDocuments(rectangle_documents, grid_documents)
+    stacker.startStacking()
 
+    return stacker
 
-    def getVerticalLoopRange(self):
-        if self.rectangle.getHeight() % 2 > 0:
-            height = self.rectangle.getHeight() + 1
-        else:
-            height = self.rectangle.getHeight()
- 
-        return reversed(range(int(height/2), int(self.grid.getHeight() - height/2) + 1))        
+def stackPartition(arguments):
+    """
+    Stacks one partition of the orders in a worker process and returns the changes of its stacking session
+    """
 
-    
+    stacker = createWorkerStacker(*arguments)
+    stacker.getAllUnstackedRectanglesFromDatabaseAndSortOnArea()
+    stacker.stackGrids(automatic=True)
+
+    return stacker.session.getChanges()
+
+def stackOrdering(arguments):
+    """
+    Stacks all orders with one ordering in a worker process and returns the changes of its stacking session and the sum of
+    the highest vertical points of the grids
+    """
+
+    stacker = createWorkerStacker(*arguments)
+    stacker.getAllUnstackedRectanglesFromDatabaseAndSortOnArea()
+    stacker.stackGrids(automatic=True)
+
+    score = sum(grid.getHighestVerticalPoint() for grid in stacker.session.getGridsNotCut())
 
+    return stacker.session.getChanges(), score
@@ -0,0 +1,380 @@
+# import own classes
+from rectangle_packing.grid import Grid
+
+# external dependencies
+from pymongo import InsertOne, UpdateOne, DeleteMany
+import numpy as np
+import copy
+
+class Error(Exception):
+    """Base class for other exceptions"""
+    pass
+
+class SessionNotLoadedError(Error):
+    """Raised when the session is used before the working set is loaded from the database"""
+    pass
+
+class StackingSession(object):
+    """
+    In memory copy of the working set of the database that is used while stacking: all grids and the rectangles that are
+    unstacked or stacked in a grid that is not cut yet. It offers the part of the DatabaseManager interface that is used while
+    stacking, but every change is only applied to the documents in memory. The changes are written to the database with one
+    bulk write per collection on commit, or thrown away on rollback. The documents are converted by the DatabaseManager.
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.rectangle_documents = None
+        self.grid_documents = None
+
+    def load(self):
+        print("Loading stacking session from database")
+
+        self.loaded_grid_documents = {}
+        for document in self.db_manager.grids_collection.find({}):
+            self.loaded_grid_documents[document["name"]] = document
+
+        grid_names_not_cut = [name for name, document in self.loaded_grid_documents.items() if not document["isCut"]]
+        query = {"$or": [{"isStacked": {"$eq": False}}, {"grid_number": {"$in": grid_names_not_cut}}]}
+
+        self.loaded_rectangle_documents = {}
+        for document in self.db_manager.rectangles_collection.find(query):
+            self.loaded_rectangle_documents[document["name"]] = document
+
+        print("Loaded " + str(len(self.loaded_grid_documents)) + " grids and " + str(len(self.loaded_rectangle_documents)) + " rectangles")
+        self.rollback()
+
+    def loadDocuments(self, rectangle_documents, grid_documents):
+        """
+        Starts the session from documents instead of the database, used to stack a partition of the orders in a worker process
+        """
+
+        self.loaded_rectangle_documents = rectangle_documents
+        self.loaded_grid_documents = grid_documents
+        self.rollback()
+
+    def rollback(self):
+        print("Rolling back stacking session")
+        self.rectangle_documents = copy.deepcopy(self.loaded_rectangle_documents)
+        self.grid_documents = copy.deepcopy(self.loaded_grid_documents)
+
+        # the updated documents by name, with the fields that are changed
+        self.inserted_rectangles = set()
+        self.updated_rectangles = {}
+        self.removed_rectangles = set()
+        self.inserted_grids = set()
+        self.updated_grids = {}
+
+    def commit(self):
+        # the documents are visited in order, so new documents are inserted in the order they were created
+        rectangle_operations = []
+        for name in self.removed_rectangles:
+            rectangle_operations.append(DeleteMany({"name": name}))
+        for name, document in self.rectangle_documents.items():
+            if name in self.inserted_rectangles:
+                rectangle_operations.append(InsertOne(document))
+            elif len(self.updated_rectangles.get(name, {})) > 0:
+                rectangle_operations.append(UpdateOne({"name": name}, {"$set": self.updated_rectangles[name]}))
+
+        grid_operations = []
+        for name, document in self.grid_documents.items():
+            if name in self.inserted_grids:
+                grid_operations.append(InsertOne(document))
+            elif len(self.updated_grids.get(name, {})) > 0:
+                grid_operations.append(UpdateOne({"name": name}, {"$set": self.updated_grids[name]}))
+
+        print("Committing " + str(len(grid_operations)) + " grid and " + str(len(rectangle_operations)) + " rectangle changes to database")
+
+        if len(grid_operations) > 0:
+            self.db_manager.grids_collection.bulk_write(grid_operations)
+        if len(rectangle_operations) > 0:
+            self.db_manager.rectangles_collection.bulk_write(rectangle_operations)
+
+        # the committed state is the new state to roll back to
+        self.loaded_rectangle_documents = self.rectangle_documents
+        self.loaded_grid_documents = self.grid_documents
+        self.rollback()
+
+    def getPartitions(self, use_grid_width=True):
+        """
+        Splits the session in independent partitions of orders and grids with the same brand, color and (optionally) grid width.
+        Every partition is a tuple of rectangle documents and grid documents, partitions without unstacked orders are left out.
+        The partitions are sorted on their lowest grid number.
+        """
+
+        def getKey(document, width_key):
+            if use_grid_width:
+                return (document["brand"], document["color"], document[width_key])
+
+            return (document["brand"], document["color"])
+
+        partitions = {}
+        grid_keys = {}
+        for name, document in self.grid_documents.items():
+            if not document["isCut"]:
+                key = getKey(document, "width")
+                grid_keys[name] = key
+                partitions.setdefault(key, ({}, {}))[1][name] = document
+
+        has_unstacked_rectangles = set()
+        for name, document in self.rectangle_documents.items():
+            if document["isStacked"] == False and document["coupage_batch"] == "batch":
+                key = getKey(document, "grid_width")
+                has_unstacked_rectangles.add(key)
+            elif document["grid_number"] in grid_keys:
+                key = grid_keys[document["grid_number"]]
+            else:
+                continue
+
+            partitions.setdefault(key, ({}, {}))[0][name] = document
+
+        keys = sorted(has_unstacked_rectangles, key=lambda k: (min(partitions[k][1], default=float("inf")), str(k)))
+
+        return [partitions[key] for key in keys]
+
+    def getDocuments(self):
+        return self.rectangle_documents, self.grid_documents
+
+    def getChanges(self):
+        return {"rectangle_documents": self.rectangle_documents, "grid_documents": self.grid_documents,
+            "removed_rectangles": list(self.removed_rectangles),
+            "inserted_grids": [name for name in self.grid_documents if name in self.inserted_grids]}
+
+    def getChangedGridNames(self):
+        return self.inserted_grids | set(self.updated_grids)
+
+    def getNewGridName(self):
+        used_names = self.listUsedGridNames()
+        if len(used_names) == 0:
+            return 1
+
+        return int(sorted(used_names)[-1] + 1)
+
+    def mergeChanges(self, changes):
+        """
+        Applies the changes of a partition that was stacked in another session, the grids that were created there are numbered
+        again after the grids of this session
+        """
+
+        new_grid_names = {}
+        for name in changes["inserted_grids"]:
+            new_grid_names[name] = self.getNewGridName()
+            print("Grid " + str(name) + " of partition is renumbered to " + str(new_grid_names[name]))
+
+            document = changes["grid_documents"][name]
+            document["name"] = new_grid_names[name]
+            self.grid_documents[document["name"]] = document
+            self.inserted_grids.add(document["name"])
+
+        for name, document in changes["grid_documents"].items():
+            if name not in new_grid_names and document != self.grid_documents.get(name):
+                self.updated_grids.setdefault(name, {}).update(self.getChangedValues(self.grid_documents.get(name, {}), document))
+                self.grid_documents[name] = document
+
+        for name in changes["removed_rectangles"]:
+            self.rectangle_documents.pop(name, None)
+            self.updated_rectangles.pop(name, None)
+            self.removed_rectangles.add(name)
+
+        for name, document in changes["rectangle_documents"].items():
+            if document["grid_number"] in new_grid_names:
+                document["grid_number"] = new_grid_names[document["grid_number"]]
+
+            if name not in self.rectangle_documents:
+                self.rectangle_documents[name] = document
+                self.inserted_rectangles.add(name)
+            elif document != self.rectangle_documents[name]:
+                self.updated_rectangles.setdefault(name, {}).update(self.getChangedValues(self.rectangle_documents[name], document))
+                self.rectangle_documents[name] = document
+
+    def getValuesToSet(self, document):
+        return {key: value for key, value in document.items() if key != "_id"}
+
+    def getChangedValues(self, document, new_document):
+        return {key: value for key, value in self.getValuesToSet(new_document).items() if document.get(key) != value}
+
+    def getRectangleDocuments(self):
+        if self.rectangle_documents is None:
+            raise SessionNotLoadedError
+
+        return self.rectangle_documents.values()
+
+    def getGridDocuments(self):
+        if self.grid_documents is None:
+            raise SessionNotLoadedError
+
+        return self.grid_documents.values()
+
+    def getNumChanges(self):
+        return (len(self.inserted_rectangles) + len(self.updated_rectangles) + len(self.removed_rectangles) +
+            len(self.inserted_grids) + len(self.updated_grids))
+
+    def listUsedGridNames(self):
+        return [document['name'] for document in self.getGridDocuments()]
+
+    def createUniqueGrid(self, width, height=None, article_name='', material='kokos', brand='kokos', color='naturel'):
+        # only do this when the height is not specified
+        if height == None:
+            height = self.db_manager.getStandardHeight(width, material, brand)
+
+        name = self.getNewGridName()
+        print("Creating unique grid with number: " + str(name))
+        grid = Grid(width=width, height=height, name=name, article_name=article_name, material=material, brand=brand, color=color)
+        self.addGrid(grid)
+
+        return grid
+
+    def addGrid(self, grid):
+        document = self.db_manager.createGridDocument(grid)
+        self.grid_documents[document["name"]] = document
+        self.inserted_grids.add(document["name"])
+
+    def updateGrid(self, grid):
+        print("Updating grid " + str(grid.getName()) + " in stacking session")
+        if grid.getName() in self.grid_documents:
+            update = self.db_manager.createGridUpdate(grid)
+            self.grid_documents[grid.getName()].update(update)
+            self.updated_grids.setdefault(grid.getName(), {}).update(update)
+
+    def getGridsNotCut(self, sort=False, for_cutting=False):
+        grids = []
+
+        for document in self.getGridDocuments():
+            if not document['isCut']:
+                grid = self.db_manager.createGridFromDocument(document)
+                grid.setStackedRectangles(self.getRectangles(grid, for_cutting))
+                grids.append(grid)
+
+        if sort == True:
+            grids = sorted(grids, key=lambda g: g.getWidth(), reverse=True)
+
+        return grids
+
+    def getGridsNotCutByWidthBrandColor(self, width='all', brand='all', color='all', for_cutting=False):
+        grids = []
+
+        # the documents are filtered first, only the matching grids are created with their rectangles
+        for document in self.getGridDocumentsNotCutByWidthBrandColor(width, brand, color):
+            grid = self.db_manager.createGridFromDocument(document)
+            grid.setStackedRectangles(self.getRectangles(grid, for_cutting))
+            grids.append(grid)
+
+        return grids
+
+    def getGridDocumentsNotCutByWidthBrandColor(self, width='all', brand='all', color='all'):
+        documents = []
+
+        for document in self.getGridDocuments():
+            if document['isCut']:
+                continue
+            if brand != 'all' and str(document['brand']) != brand:
+                continue
+            if color != 'all' and str(document['color']) != color:
+                continue
+            if width != 'all' and int(document['width']) != width:
+                continue
+
+            documents.append(document)
+
+        return documents
+
+    def getGridHash(self, grid_number):
+        """
+        Returns a hash of the grid document and the documents of the rectangles in the grid, it changes when the grid or one of
+        its rectangles is changed
+        """
+
+        documents = [self.grid_documents[grid_number]]
+        documents += sorted((document for document in self.getRectangleDocuments() if document["grid_number"] == grid_number), key=lambda k: str(k["name"]))
+
+        return hash(tuple(tuple(sorted((key, str(value)) for key, value in document.items())) for document in documents))
+
+    def getAllGrids(self):
+        grids = []
+
+        for document in self.getGridDocuments():
+            grid = self.db_manager.createGridFromDocument(document)
+            grid.setStackedRectangles(self.getRectangles(grid))
+            grids.append(grid)
+
+        return grids
+
+    def getGrid(self, grid_number, for_cutting=False):
+        document = self.grid_documents[grid_number]
+        grid = self.db_manager.createGridFromDocument(document)
+        grid.setStackedRectangles(self.getRectangles(grid, for_cutting))
+
+        return grid
+
+    def addRectangle(self, rectangle):
+        document = self.db_manager.createRectangleDocument(rectangle)
+
+        if document["name"] in self.rectangle_documents:
+            print("Rectangle already present in stacking session")
+            return
+
+        self.rectangle_documents[document["name"]] = document
+
+        # a rectangle that is removed and added again in the same session is still in the database
+        if document["name"] in self.removed_rectangles:
+            self.removed_rectangles.discard(document["name"])
+            self.updated_rectangles[document["name"]] = self.getValuesToSet(document)
+        else:
+            self.inserted_rectangles.add(document["name"])
+
+    def removeRectangle(self, rectangle):
+        print("Rectangle " + str(rectangle.getName()) + " removed from stacking session")
+        name = rectangle.getName()
+        self.rectangle_documents.pop(name, None)
+        self.updated_rectangles.pop(name, None)
+
+        if name in self.inserted_rectangles:
+            self.inserted_rectangles.discard(name)
+        else:
+            self.removed_rectangles.add(name)
+
+    def updateRectangle(self, rectangle):
+        print("Updating rectangle " + str(rectangle.getName()) + " in stacking session")
+        if rectangle.getName() in self.rectangle_documents:
+            update = self.db_manager.createRectangleUpdate(rectangle)
+            self.rectangle_documents[rectangle.getName()].update(update)
+            self.updated_rectangles.setdefault(rectangle.getName(), {}).update(update)
+
+    def getRectangle(self, rectangle_number, for_cutting=False):
+        return self.db_manager.createRectangleFromDocument(self.rectangle_documents[str(rectangle_number)], for_cutting)
+
+    def getRectangles(self, grid, for_cutting=False, sort=False):
+        documents = [document for document in self.getRectangleDocuments() if document["grid_number"] == grid.getName()]
+
+        if sort == True:
+            # sort on area: length * width
+            documents = reversed(sorted(documents, key=lambda k: k['exact_width'] * k['exact_height']))
+
+        return [self.db_manager.createRectangleFromDocument(document, for_cutting) for document in documents]
+
+    def getUnstackedRectangles(self, brand='all', color='all', grid_width='all', for_cutting=False, coupage_batch="batch"):
+        filter_on_grid = (color != 'all' and brand != 'all' and grid_width != 'all')
+
+        rectangles = []
+        for document in self.getRectangleDocuments():
+            if document["isStacked"] != False or document["coupage_batch"] != coupage_batch:
+                continue
+            if filter_on_grid and (document["color"] != color or document["brand"] != brand or document["grid_width"] != grid_width):
+                continue
+
+            rectangles.append(self.db_manager.createRectangleFromDocument(document, for_cutting))
+
+        return rectangles
+
+    def emptyGrid(self, grid):
+        rectangles = self.getRectangles(grid)
+
+        for rectangle in rectangles:
+            rectangle.setUnstacked()
+            rectangle.setGridNumber(-1)
+            rectangle.setPosition(np.array([-1, -1]))
+            self.updateRectangle(rectangle)
+
+        grid.setStackedRectangles([])
+        grid.setUncut()
+        self.updateGrid(grid)
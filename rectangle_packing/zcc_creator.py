@@ -1,18 +1,46 @@
 from rectangle_packing.helper import Helper
+from rectangle_packing.geometry import Geometry
+from rectangle_packing.cut_path_optimizer import CutPathOptimizer
+from rectangle_packing.cut_time_estimator import CutTimeEstimator
 
 import xml.etree.cElementTree as ET
-from xml.etree.ElementTree import ElementTree
+from xml.sax.saxutils import escape
 
 import ezdxf
 from datetime import datetime
-from xml.dom import minidom
 import copy
+import numpy as np
 
 class ZccCreator(object):
+
+    # the static parts of every ZCC file, the job name, creation date and material are filled in
+    header_template = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<ZCC_cmd xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:zcc="www.zund.com/ZCC" MessageID="887" '
+        'CommandID="jobdescription" xsi:noNamespaceSchemaLocation="file:ZCC_cmd.xsd" Version="3026">\n'
+        '   <Job Name={job_name}>\n'
+        '      <Meta Reserved="9809">\n'
+        '         <Description>Stacker output</Description>\n'
+        '         <Priority>Low</Priority>\n'
+        '         <Creation Name="Cut Editor" Version="3.2.6.9" Date={date}/>\n'
+        '      </Meta>\n'
+        '      <Material Name={material}/>\n')
+    footer = '   </Job>\n</ZCC_cmd>\n'
+    indent = "   "
+
+    # serialized once and reused by every ZCC file
+    methods_block = None
+
     def __init__(self, material, file_name):
         self.zcc_path = Helper.createAndGetFolderOnDesktop('zcc')
         self.setMaterial(material)
         self.setFileName(file_name)
+        self.setCutPathOptimizer(CutPathOptimizer())
+        self.setCutTimeEstimator(CutTimeEstimator())
+
+        # (path, is_reversed) in cutting order of the grids added, used for the cut metrics
+        self.cut_paths = []
+        self.grid_names = []
         self.createInitialTemplate()
 
     def setMaterial(self, material):
@@ -27,42 +55,30 @@ class ZccCreator(object):
     def getFileName(self):
         return self.file_name
 
-    def createInitialTemplate(self):
-        self.createRoot()
+    def setCutPathOptimizer(self, cut_path_optimizer):
+        self.cut_path_optimizer = cut_path_optimizer
 
-        self.addJob()
-        self.addMeta()
-        self.addDescription()
-        self.addPriority()
-        self.addCreation()
+    def getCutPathOptimizer(self):
+        return self.cut_path_optimizer
 
-        self.addMaterial()
-        
-    def createRoot(self):
-        self.root = ET.Element("ZCC_cmd", {"MessageID": "887", "CommandID": "jobdescription", 
-        "xsi:noNamespaceSchemaLocation": "file:ZCC_cmd.xsd", "Version": "3026",
-        "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance", "xmlns:zcc": "www.zund.com/ZCC"})
-    
-    def addJob(self):
-        self.job = ET.SubElement(self.root, "Job", {"Name": self.file_name + ".zcc"})
-
-    def addMeta(self):
-        self.meta = ET.SubElement(self.job, "Meta", {"Reserved": "9809"})
+    def setCutTimeEstimator(self, cut_time_estimator):
+        self.cut_time_estimator = cut_time_estimator
 
-    def addDescription(self):                
-        self.description = ET.SubElement(self.meta, "Description")
-        self.description.text = "Stacker output"
+    def getCutTimeEstimator(self):
+        return self.cut_time_estimator
 
-    def addPriority(self):
-        self.priority = ET.SubElement(self.meta, "Priority")
-        self.priority.text = "Low"
+    def createInitialTemplate(self):
+        """
+        The header and Methods block are the same for every ZCC file and are written from a template, only the geometry of the
+        job is built as elements
+        """
 
-    def addMaterial(self):
-        self.material = ET.SubElement(self.job, "Material", {"Name": self.getMaterial()})
+        self.job = ET.Element("Job")
+        self.creation_date = Helper.getDateTimeZcc()
 
-    def addCreation(self):
-        self.creation = ET.SubElement(self.meta, "Creation", {"Name": "Cut Editor", 
-        "Version": "3.2.6.9", "Date": Helper.getDateTimeZcc()})
+    def getHeader(self):
+        return self.header_template.format(job_name=self.quoteAttribute(self.getFileName() + ".zcc"),
+            date=self.quoteAttribute(self.creation_date), material=self.quoteAttribute(self.getMaterial()))
 
     def fillXmlWithLineTo(self, x, y):
         ET.SubElement(self.outline, "LineTo", {"X": str(int(x)), "Y": str(int(y))})
@@ -74,20 +90,45 @@ class ZccCreator(object):
         self.geometry = ET.SubElement(self.job, "Geometry")
 
         for r in grid.getStackedRectangles():
-            rectangle = copy.deepcopy(r)
+            # the prime center format only sets new values, a shallow copy leaves the rectangle of the grid as it is
+            rectangle = copy.copy(r)
             rectangle.toPrimeCenterFormat()
             self.addRectangleLabel(rectangle)
 
-        for line in grid.lines_without_overlap:
+        cut_polylines = self.getCutPolylines(grid)
+        for polyline, reverse in cut_polylines:
 
             self.addOutline()
 
-            self.addLineGeometry(line)
+            self.addPolylineGeometry(polyline, reverse)
             self.addThruCutLayer()
 
         self.addOutline()
         self.fillXmlWithLargeHorizontalLineAtTop(grid)
 
+        self.cut_paths.extend(cut_polylines)
+        self.cut_paths.append((self.getLargeHorizontalLineAtTop(grid), False))
+        self.grid_names.append(grid.getName())
+
+    def getCutPolylines(self, grid):
+        """
+        Returns the polylines of the grid as (polyline, is_reversed) in cutting order, ordered by the cut path optimizer when it is set
+        """
+
+        polylines = grid.polylines_without_overlap
+        cut_polylines = [(polyline, False) for polyline in polylines]
+        if self.cut_path_optimizer is None:
+            return cut_polylines
+
+        travel_before = self.cut_path_optimizer.computeTravelDistance(cut_polylines)
+        cut_polylines = self.cut_path_optimizer.optimize(polylines)
+        travel_after = self.cut_path_optimizer.computeTravelDistance(cut_polylines)
+
+        print("Cut path of grid " + str(grid.getName()) + ": knife travel " + str(round(travel_before)) + " mm -> " +
+            str(round(travel_after)) + " mm, saved " + str(round(travel_before - travel_after)) + " mm")
+
+        return cut_polylines
+
     # coupage
     def addRectangle(self, rectangle):
         self.geometry = ET.SubElement(self.job, "Geometry")
@@ -103,6 +144,14 @@ class ZccCreator(object):
         # self.fillXmlWithLineTo(line.start_point[0], line.start_point[1])
         self.fillXmlWithLineTo(line.end_point[0], line.end_point[1])
 
+    def addPolylineGeometry(self, polyline, reverse=False):
+        if reverse:
+            polyline = polyline[::-1]
+
+        self.fillXmlWithMoveTo(polyline[0][0], polyline[0][1])
+        for point in polyline[1:]:
+            self.fillXmlWithLineTo(point[0], point[1])
+
     def addRectangleGeometry(self, rectangle):
         self.fillXmlWithMoveTo(rectangle.getBottomLeft()[0], rectangle.getBottomLeft()[1])
         self.fillXmlWithLineTo(rectangle.getBottomRight()[0], rectangle.getBottomRight()[1])
@@ -127,15 +176,41 @@ class ZccCreator(object):
         self.outline = ET.SubElement(self.geometry, "Outline")
 
     def fillXmlWithLargeHorizontalLineAtTop(self, grid):
-        y_start = Helper.toMillimeters(grid.getHighestVerticalPoint())
+        start_point, end_point = self.getLargeHorizontalLineAtTop(grid)
+
+        self.fillXmlWithMoveTo(start_point[0], start_point[1])
+        self.fillXmlWithLineTo(end_point[0], end_point[1])
+        self.addThruCutLayer()
+
+    def getLargeHorizontalLineAtTop(self, grid):
+        y_start = Geometry.toMillimeters(grid.getHighestVerticalPoint())
         x_start = 0
-        y_end = Helper.toMillimeters(grid.getHighestVerticalPoint())
-        x_end = Helper.toMillimeters(grid.getWidth() + 20)
+        y_end = Geometry.toMillimeters(grid.getHighestVerticalPoint())
+        x_end = Geometry.toMillimeters(grid.getWidth() + 20)
 
         # x/y swapped for prime center
-        self.fillXmlWithMoveTo(y_start, x_start)
-        self.fillXmlWithLineTo(y_end, x_end)
-        self.addThruCutLayer()
+        return np.array([[y_start, x_start], [y_end, x_end]])
+
+    def getCutLength(self):
+        return Geometry.getLength([path for path, _ in self.cut_paths])
+
+    def getNumPenLifts(self):
+        return len(self.cut_paths)
+
+    def getTravelDistance(self):
+        return CutPathOptimizer.computeTravelDistance(self.cut_paths)
+
+    def getCutTime(self):
+        return self.cut_time_estimator.estimateCutTime(self.getCutLength(), self.getTravelDistance(), self.getNumPenLifts())
+
+    def getCutMetrics(self):
+        """
+        Returns the cut length and travel distance in millimeters, the number of pen lifts and the estimated cut time in seconds
+        of the grids that are added
+        """
+
+        return {"grid": ", ".join(str(name) for name in self.grid_names), "cut_length": self.getCutLength(),
+            "pen_lifts": self.getNumPenLifts(), "travel_distance": self.getTravelDistance(), "cut_time": self.getCutTime()}
         
     def addLabel(self):
         self.label = ET.SubElement(self.geometry, "Label", {"Text": self.coupage.getClientName(), 
@@ -143,8 +218,8 @@ class ZccCreator(object):
         self.label_position = ET.SubElement(self.label, "Position", {"X": "0.000", "Y": str(round(self.coupage.getWidth()*10, 3))})
         self.label_method = ET.SubElement(self.label, "Method", {"Type": "{none}", "Name": "TEXT"})
     
-    def addMethods(self):
-        self.methods = ET.SubElement(self.job, "Methods")
+    def createMethods(self):
+        self.methods = ET.Element("Methods")
         self.method_register = ET.SubElement(self.methods, "Method",
         {"Type": "Register", "Color": "000000", 
         "RegistrationType": "borderFrontRight"})
@@ -157,12 +232,47 @@ class ZccCreator(object):
         "AllowReverseDirection": "false",
         "Name": "TEXT"})
 
+        return self.methods
+
+    def getMethodsBlock(self):
+        if ZccCreator.methods_block is None:
+            ZccCreator.methods_block = "".join(self.serializeElement(self.createMethods(), 2))
+
+        return ZccCreator.methods_block
+
+    def quoteAttribute(self, value):
+        return '"' + escape(str(value), {'"': "&quot;"}) + '"'
+
+    def serializeElement(self, element, level):
+        """
+        Yields the lines of the element as indented XML, in the layout of a minidom pretty print
+        """
+
+        indent = self.indent * level
+        start_tag = indent + "<" + element.tag + "".join(" " + key + "=" + self.quoteAttribute(value) for key, value in element.items())
+
+        if len(element) == 0 and not element.text:
+            yield start_tag + "/>\n"
+        elif len(element) == 0:
+            yield start_tag + ">" + escape(element.text, {'"': "&quot;"}) + "</" + element.tag + ">\n"
+        else:
+            yield start_tag + ">\n"
+            for child in element:
+                yield from self.serializeElement(child, level + 1)
+            yield indent + "</" + element.tag + ">\n"
+
     def save(self):
-        self.addMethods()
+        """
+        Streams the ZCC file to disk, the geometry is written element by element between the static header and Methods block
+        """
+
+        with open(self.getZccPath() + self.getFileName() + ".zcc", 'w', encoding='UTF-8', newline='') as f:
+            f.write(self.getHeader())
+            for geometry in self.job:
+                f.writelines(self.serializeElement(geometry, 2))
 
-        xmlstr = minidom.parseString(ET.tostring(self.root)).toprettyxml(indent = "   ", encoding='UTF-8')
-        with open(self.getZccPath() + self.getFileName() + ".zcc", 'wb+') as f:
-            f.write(xmlstr)
+            f.write(self.getMethodsBlock())
+            f.write(self.footer)
 
     def getZccPath(self):
         return Helper.createAndGetFolderOnDesktop('zcc')
@@ -0,0 +1,29 @@
+import unittest
+
+from rectangle_packing.cut_path_optimizer import CutPathOptimizer
+
+class CutPathOptimizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cut_path_optimizer = CutPathOptimizer()
+
+    def tearDown(self):
+        pass
+
+    def testOptimize(self):
+        right_path = [(100, 0), (100, 100)]
+        left_path = [(0, 0), (0, 100)]
+        middle_path = [(50, 0), (50, 100)]
+        paths = [right_path, left_path, middle_path]
+
+        cut_paths = self.cut_path_optimizer.optimize(paths)
+
+        # up the left path, down the middle path and up the right path again
+        self.assertEqual(cut_paths, [(left_path, False), (middle_path, True), (right_path, False)])
+        self.assertEqual(self.cut_path_optimizer.computeTravelDistance(cut_paths), 100)
+        self.assertGreater(self.cut_path_optimizer.computeTravelDistance([(path, False) for path in paths]), 350)
+
+        self.assertEqual(self.cut_path_optimizer.optimize([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,6 +20,25 @@ class StackerTest(unittest.TestCase):
 
     def testClearNewOrders(self):
         self.db_manager.clearNewOrders()
+
+    def testRectanglePositionOnHalfMillimeter(self):
+        self.rectangle.setPosition([20.275, 10.05])
+        update = self.db_manager.createRectangleUpdate(self.rectangle)
+        self.assertEqual([update["x position"], update["y position"]], [20.275, 10.05])
+
+        document = self.db_manager.createRectangleDocument(self.rectangle)
+        self.assertEqual([document["x position"], document["y position"]], [20.275, 10.05])
     
+    def testRectangleRotation(self):
+        self.rectangle.rotate()
+        self.assertTrue(self.db_manager.createRectangleUpdate(self.rectangle)["isRotated"])
+
+        # the orientation the rectangle is stacked in is kept in the database
+        document = self.db_manager.createRectangleDocument(self.rectangle)
+        self.assertTrue(self.db_manager.createRectangleFromDocument(document).isRotated())
+
+        del document["isRotated"]
+        self.assertFalse(self.db_manager.createRectangleFromDocument(document).isRotated())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
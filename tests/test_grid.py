@@ -1,5 +1,7 @@
 import unittest
 import sys
+import numpy as np
+from unittest import mock
 
 from rectangle_packing.grid import Grid
 from rectangle_packing.rectangle import Rectangle
@@ -18,6 +20,13 @@ class GridTest(unittest.TestCase):
     def tearDown(self):
         pass
 
+    def testGridWithoutDxfDrawing(self):
+        with mock.patch("rectangle_packing.grid.Helper.createAndGetDxfFolder") as create_dxf_folder:
+            grid = Grid(100, 100, 4, create_dxf_drawing=False)
+            self.assertFalse(create_dxf_folder.called)
+
+        self.assertIsNone(grid.dxf_drawing)
+
     def testIsOutOfGrid(self):
         self.rectangle_4.setPosition([25, 40])
         self.assertFalse(self.grid_2.isOutOfGrid(self.rectangle_4))
@@ -48,5 +57,151 @@ class GridTest(unittest.TestCase):
         self.assertFalse(self.grid_2.isValidPosition(self.rectangle_5))
 
 
+    def testSkyline(self):
+        self.rectangle_4.setPosition([25, 40])
+        self.rectangle_5.setPosition([75, 80])
+        self.grid_1.addRectangle(self.rectangle_4)
+
+        skyline = self.grid_1.getSkyline()
+        self.assertEqual(skyline.getSegments(), [[0, 50, 80], [50, 200, 0]])
+
+        self.grid_1.addRectangle(self.rectangle_5)
+        self.assertEqual(skyline.getSegments(), [[0, 50, 80], [50, 100, 120], [100, 200, 0]])
+        self.assertEqual(skyline.getMaximumHeight(40, 60), 120)
+        self.assertEqual(skyline.getMaximumHeight(100, 200), 0)
+
+        self.grid_1.removeRectangle(self.rectangle_5)
+        self.assertEqual(self.grid_1.getSkyline().getSegments(), [[0, 50, 80], [50, 200, 0]])
+
+
+    def testFreeRegions(self):
+        self.rectangle_4.setPosition([25, 40])
+        self.grid_2.addRectangle(self.rectangle_4)
+
+        free_regions = self.grid_2.getFreeRegions(50, 80)
+        self.assertEqual(free_regions.tolist(), [[50, 0, 100, 100]])
+        self.assertEqual(len(self.grid_2.getFreeRegions(10, 10)), 2)
+        self.assertFalse(self.grid_2.hasFreeRegion(60, 30))
+
+        self.grid_2.removeRectangle(self.rectangle_4)
+        self.assertEqual(self.grid_2.getFreeRegions(100, 100).tolist(), [[0, 0, 100, 100]])
+
+    def testFreeRegionsAfterSetHeight(self):
+        self.rectangle_4.setPosition([25, 40])
+        self.grid_2.addRectangle(self.rectangle_4)
+        free_space_index = self.grid_2.getFreeSpaceIndex()
+
+        # the free space index is cut off and extended instead of built again
+        self.grid_2.setHeight(80)
+        self.assertEqual(self.grid_2.getFreeRegions(10, 10).tolist(), [[50, 0, 100, 80]])
+        self.grid_2.setHeight(120)
+        self.assertEqual(sorted(self.grid_2.getFreeRegions(10, 10).tolist()), [[0, 80, 100, 120], [50, 0, 100, 120]])
+        self.assertIs(self.grid_2.getFreeSpaceIndex(), free_space_index)
+
+    def testFitMask(self):
+        self.rectangle_4.setPosition([25, 40])
+        self.grid_2.addRectangle(self.rectangle_4)
+
+        # cells are half a centimeter, a window of 50 x 80 centimeters only fits right of the rectangle
+        fit_mask = self.grid_2.getFitMask(100, 160)
+        self.assertEqual(fit_mask.shape, (41, 101))
+        self.assertFalse(fit_mask[:, :100].any())
+        self.assertTrue(fit_mask[:, 100].all())
+        self.assertEqual(self.grid_2.getFitMask(202, 2).size, 0)
+
+    def testCandidatePositions(self):
+        self.assertEqual(self.grid_2.getCandidatePositions(50, 80).tolist(), [[25, 40]])
+
+        self.rectangle_4.setPosition([25, 40])
+        self.grid_2.addRectangle(self.rectangle_4)
+
+        # odd sizes are rounded up to whole centimeters, the candidates touch the border or the stacked rectangle
+        candidate_positions = self.grid_2.getCandidatePositions(21, 11)
+        self.assertEqual(candidate_positions.tolist(), [[11, 6], [61, 6], [11, 86], [61, 86]])
+        self.assertEqual(self.grid_2.getCandidatePositions(100, 10).tolist(), [[50, 5], [50, 85]])
+
+        # on millimeters the edges touch the border or the stacked rectangle exactly
+        candidate_positions = self.grid_2.getCandidatePositions(20.5, 10.3, on_millimeters=True)
+        self.assertTrue(np.allclose(candidate_positions, [[10.25, 5.15], [60.25, 5.15], [10.25, 85.15], [60.25, 85.15]]))
+
+    def testClearances(self):
+        self.rectangle_4.setPosition([25, 40])
+        self.grid_2.addRectangle(self.rectangle_4)
+
+        # the edges of the rectangle are on whole millimeters
+        rectangle = Rectangle(20.5, 10.3, 6)
+        rectangle.setPosition([70.25, 30.15])
+        self.assertEqual(self.grid_2.getLeftClearance(rectangle), 10)
+        self.assertEqual(self.grid_2.getBottomClearance(rectangle), 25)
+
+        # the stacked rectangle is not below the rectangle
+        rectangle.setPosition([70.25, 90.15])
+        self.assertEqual(self.grid_2.getLeftClearance(rectangle), 60)
+        self.assertEqual(self.grid_2.getBottomClearance(rectangle), 85)
+
+    def testSpatialIndex(self):
+        self.rectangle_4.setPosition([25, 40])
+        self.grid_2.addRectangle(self.rectangle_4)
+        self.assertEqual(self.grid_2.getSpatialIndex().getNumRectangles(), 1)
+
+        # touching edges are no overlap
+        self.rectangle_5.setPosition([75, 40])
+        self.assertTrue(self.grid_2.isValidPosition(self.rectangle_5))
+        self.rectangle_5.setPosition([74, 60])
+        self.assertFalse(self.grid_2.isValidPosition(self.rectangle_5))
+
+        self.grid_2.removeRectangle(self.rectangle_4)
+        self.assertTrue(self.grid_2.isValidPosition(self.rectangle_5))
+
+        self.grid_2.setStackedRectangles([self.rectangle_4])
+        self.assertFalse(self.grid_2.isValidPosition(self.rectangle_5))
+        self.assertEqual(self.grid_2.getSpatialIndex().getNumRectangles(), 1)
+
+    def testNoFitFrontier(self):
+        self.grid_2.addNotFittingSize(60, 90)
+        self.grid_2.addNotFittingSize(70, 95)
+        self.grid_2.addNotFittingSize(90, 60)
+
+        self.assertEqual(len(self.grid_2.no_fit_frontier), 2)
+        self.assertTrue(self.grid_2.isKnownNotToFit(60, 100))
+        self.assertTrue(self.grid_2.isKnownNotToFit(95, 65))
+        self.assertFalse(self.grid_2.isKnownNotToFit(59, 100))
+
+        # adding a rectangle keeps the frontier, removing one forgets it
+        self.rectangle_4.setPosition([25, 40])
+        version = self.grid_2.getVersion()
+        self.grid_2.addRectangle(self.rectangle_4)
+        self.assertNotEqual(self.grid_2.getVersion(), version)
+        self.assertTrue(self.grid_2.isKnownNotToFit(60, 100))
+
+        self.grid_2.removeRectangle(self.rectangle_4)
+        self.assertFalse(self.grid_2.isKnownNotToFit(60, 100))
+
+    def testRemoveOverlappingLines(self):
+        for i, (width, height, position) in enumerate([(50, 40, [25, 20]), (50, 40, [25, 60]), (30, 80, [65, 40])]):
+            rectangle = Rectangle(width, height, i)
+            rectangle.setPosition(position)
+            self.grid_2.addRectangle(rectangle)
+
+        # shared edges are cut once, lines that only touch are kept apart
+        self.grid_2.removeOverlappingLines(for_prime_center=False)
+        lines = [(list(line.start_point), list(line.end_point)) for line in self.grid_2.lines_without_overlap]
+        self.assertEqual(len(lines), 9)
+        self.assertEqual(lines.count(([0, 400], [500, 400])), 1)
+        self.assertIn(([500, 0], [500, 800]), lines)
+        self.assertNotIn(([500, 0], [500, 400]), lines)
+
+    def testCutMetrics(self):
+        for i, (width, height, position) in enumerate([(50, 40, [25, 20]), (50, 40, [25, 60]), (30, 80, [65, 40])]):
+            rectangle = Rectangle(width, height, i)
+            rectangle.setPosition(position)
+            self.grid_2.addRectangle(rectangle)
+
+        # the shared edges are counted once, the lines are chained into polylines
+        self.grid_2.removeOverlappingLines(for_prime_center=False)
+        self.assertEqual(self.grid_2.getCutLength(), 4500)
+        self.assertEqual(self.grid_2.getNumPenLifts(), 3)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
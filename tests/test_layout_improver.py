@@ -0,0 +1,55 @@
+import unittest
+import sys
+from unittest import mock
+
+from rectangle_packing.rectangle import Rectangle
+from rectangle_packing.grid import Grid
+from rectangle_packing.layout_improver import LayoutImprover, packRectangles
+from rectangle_packing.placement_engine import NormOrderedPlacementEngine
+
+class LayoutImproverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.layout_improver = LayoutImprover(max_iterations=20, seed=0)
+
+    def tearDown(self):
+        pass
+
+    def createRectangle(self, name, width, height, position):
+        rectangle = Rectangle(width=width, height=height, name=name, exact_width=width, exact_height=height)
+        rectangle.setPosition(position)
+        return rectangle
+
+    def testPackRectangles(self):
+        engine = NormOrderedPlacementEngine()
+
+        score, positions = packRectangles((100, 200, [(50, 80, False), (80, 50, False)], [0, 1], engine))
+        self.assertEqual(score, 130)
+        self.assertEqual(list(positions[1]), [40, 105])
+
+        # the rotated second rectangle fits next to the first one
+        score, positions = packRectangles((100, 200, [(50, 80, False), (80, 50, True)], [0, 1], engine))
+        self.assertEqual(score, 80)
+
+        self.assertIsNone(packRectangles((100, 100, [(50, 80, False), (80, 50, False)], [0, 1], engine)))
+
+        # only the sizes are packed, nothing is written to disk
+        with mock.patch("rectangle_packing.helper.Helper.createAndGetDxfFolder") as create_dxf_folder:
+            packRectangles((100, 200, [(50, 80, False), (80, 50, True)], [1, 0], engine))
+            self.assertFalse(create_dxf_folder.called)
+
+    def testImproveGrid(self):
+        # four squares stacked in one column use twice the length of two columns
+        grid = Grid(width=100, height=300, name=1)
+        for i in range(4):
+            grid.addRectangle(self.createRectangle(str(i), 50, 50, [25, 25 + 50*i]))
+
+        rectangles = self.layout_improver.improveGrid(grid)
+        self.assertEqual(len(rectangles), 4)
+        self.assertEqual(max(rectangle.getTopLeft()[1] for rectangle in rectangles), 100)
+
+        grid.setStackedRectangles(rectangles)
+        self.assertIsNone(self.layout_improver.improveGrid(grid))
+
+if __name__ == '__main__':
+    unittest.main()
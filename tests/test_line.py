@@ -0,0 +1,26 @@
+import unittest
+import numpy as np
+
+from rectangle_packing.line import Line, StartPointCannotBeLargerThanEndPointException, StartAndEndPointAreSameException
+
+class LineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.line = Line(np.array([0, 0]), np.array([30, 40]))
+
+    def tearDown(self):
+        pass
+
+    def testLength(self):
+        self.assertEqual(self.line.length(), 50)
+        self.assertEqual(Line(np.array([0, 400]), np.array([500, 400])).length(), 500)
+
+    def testInvalidLine(self):
+        with self.assertRaises(StartPointCannotBeLargerThanEndPointException):
+            Line(np.array([10, 0]), np.array([0, 0]))
+
+        with self.assertRaises(StartAndEndPointAreSameException):
+            Line(np.array([10, 0]), np.array([10, 0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+import numpy as np
+
+from rectangle_packing.line import Line
+from rectangle_packing.polyline_chainer import PolylineChainer
+
+class PolylineChainerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.polyline_chainer = PolylineChainer()
+
+    def tearDown(self):
+        pass
+
+    def testChain(self):
+        # the outline of two squares next to each other, the middle line is shared
+        lines = [Line(np.array([0, 0]), np.array([10, 0])), Line(np.array([10, 0]), np.array([20, 0])),
+            Line(np.array([20, 0]), np.array([20, 10])), Line(np.array([0, 10]), np.array([20, 10])),
+            Line(np.array([0, 0]), np.array([0, 10])), Line(np.array([10, 0]), np.array([10, 10]))]
+
+        polylines = self.polyline_chainer.chain(lines)
+        self.assertEqual(len(polylines), 2)
+
+        # the bottom lines are chained straight ahead without their middle point, around to the start
+        self.assertEqual(polylines[0].tolist(), [[0, 0], [20, 0], [20, 10], [0, 10], [0, 0]])
+        self.assertEqual(polylines[1].tolist(), [[10, 0], [10, 10]])
+
+        self.assertEqual(self.polyline_chainer.chain([]), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -122,5 +122,19 @@ class StackedGridTest(unittest.TestCase):
         self.assertEqual(self.rectangle_3.getWidth(), 198)
         self.assertEqual(self.rectangle_3.getHeight(), 100)
 
+    def testExactSize(self):
+        rectangle = Rectangle(50.3, 51, 1)
+        rectangle.roundWidth()
+        rectangle.roundHeight()
+        self.assertEqual(rectangle.getWidth(), 51)
+        self.assertEqual(rectangle.getExactWidth(), 50.3)
+
+        # the exact size is rotated together with the rounded size
+        rectangle.rotate()
+        self.assertTrue(rectangle.isRotated())
+        rectangle.useExactSize()
+        self.assertEqual(rectangle.getWidth(), 51)
+        self.assertEqual(rectangle.getHeight(), 50.3)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
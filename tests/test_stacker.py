@@ -1,11 +1,14 @@
 import unittest
 unittest.TestLoader.sortTestMethodsUsing = None
 import sys, os
+import multiprocessing
+from unittest import mock
 
 from rectangle_packing.stacker import *
 from rectangle_packing.rectangle import *
 from rectangle_packing.grid import *
 from rectangle_packing.excel_parser import *
+from rectangle_packing.placement_engine import *
 
 # be aware that these tests generate dxf files in the grids folder on the desktop
 # these should not be actually cut of course
@@ -67,6 +70,37 @@ class StackerTest(unittest.TestCase):
         self.assertEqual(rectangle1.getPosition()[0], 75)
         self.assertEqual(rectangle1.getPosition()[1], 40)
 
+    def testStartDeadline(self):
+        file_name = "paklijst2.xlsx"
+
+        self.stacker.setExcelParser(path=self.excel_path, file_name=file_name)
+        self.stacker.db_manager.clearDatabase()
+        self.stacker.loadOrdersAndAddToDatabase()
+
+        # without time left the skyline layout is committed
+        self.stacker.start(deadline=0)
+        self.assertEqual(len(self.stacker.db_manager.getUnstackedRectangles()), 0)
+
+        rectangle1 = self.stacker.db_manager.getRectangle("1")
+        rectangle2 = self.stacker.db_manager.getRectangle("2")
+        self.assertEqual(rectangle2.getPosition()[0], 25)
+        self.assertEqual(rectangle2.getPosition()[1], 40)
+        self.assertEqual(rectangle1.getPosition()[0], 75)
+        self.assertEqual(rectangle1.getPosition()[1], 40)
+
+    def testStartDeadlineNumProcesses(self):
+        self.stacker.setExcelParser(path=self.excel_path, file_name="paklijst2.xlsx")
+        self.stacker.db_manager.clearDatabase()
+        self.stacker.loadOrdersAndAddToDatabase()
+
+        # the candidates are stacked in the number of processes the operator has set
+        self.stacker.setNumProcesses(1)
+        with mock.patch("rectangle_packing.stacker.multiprocessing.Pool", wraps=multiprocessing.Pool) as pool:
+            self.stacker.start(deadline=60)
+            pool.assert_called_once_with(1)
+
+        self.assertEqual(len(self.stacker.db_manager.getUnstackedRectangles()), 0)
+
     def testStartMillimeters(self):
         file_name = "paklijst4.xlsx"
 
@@ -98,6 +132,120 @@ class StackerTest(unittest.TestCase):
                 self.assertEqual(rectangle.getWidth(), 74.1)
                 self.assertEqual(rectangle.getHeight(), 44.8)            
 
+    def testStartOnMillimeters(self):
+        file_name = "paklijst4.xlsx"
+
+        self.stacker.setExcelParser(path=self.excel_path, file_name=file_name)
+        self.stacker.db_manager.clearDatabase()
+        self.stacker.loadOrdersAndAddToDatabase()
+        self.stacker.setStackOnMillimeters(True)
+        self.stacker.start()
+
+        # the exact sizes are stacked in one pass, the database holds the millimeter positions
+        rectangle1 = self.stacker.db_manager.getRectangle("1")
+        rectangle2 = self.stacker.db_manager.getRectangle("2")
+        rectangle3 = self.stacker.db_manager.getRectangle("3")
+
+        self.assertEqual(list(rectangle1.getPosition()), [25.05, 40.25])
+        self.assertEqual(list(rectangle2.getPosition()), [75.2, 40.1])
+        self.assertEqual(list(rectangle3.getPosition()), [37.05, 102.9])
+
+    def testStartIncremental(self):
+        file_name = "paklijst2.xlsx"
+
+        self.stacker.setExcelParser(path=self.excel_path, file_name=file_name)
+        self.stacker.db_manager.clearDatabase()
+        self.stacker.loadOrdersAndAddToDatabase()
+        self.stacker.start()
+
+        # a new order is stacked in the gap next to the third order of the open grid
+        self.stacker.db_manager.addRectangle(Rectangle(20, 40, "4", brand="Kokos", color="antraciet", grid_width=100))
+        # an order that only fits on top of the stack is not a gap
+        self.stacker.db_manager.addRectangle(Rectangle(100, 30, "5", brand="Kokos", color="antraciet", grid_width=100))
+        height = self.stacker.db_manager.getGrid(1).getHeight()
+
+        gap_names = []
+        fill_gaps_of_open_grids = self.stacker.fillGapsOfOpenGrids
+        def fillGapsOfOpenGrids():
+            fill_gaps_of_open_grids()
+            gap_names.extend(sorted(name for name, document in self.stacker.session.getDocuments()[0].items() if document["grid_number"] == 1))
+
+        self.stacker.fillGapsOfOpenGrids = fillGapsOfOpenGrids
+        self.stacker.start(incremental=True)
+        self.assertNotIn("5", gap_names)
+        self.assertIn("4", gap_names)
+
+        rectangle4 = self.stacker.db_manager.getRectangle("4")
+        self.assertEqual(rectangle4.getGridNumber(), 1)
+        self.assertEqual(list(rectangle4.getPosition()), [84, 100])
+        self.assertEqual(list(self.stacker.db_manager.getRectangle("5").getPosition()), [50, 139])
+        self.assertEqual(self.stacker.db_manager.getGrid(1).getHeight(), height)
+        self.assertEqual(self.stacker.db_manager.listUsedGridNames(), [1])
+
+    def testStartIncrementalWithoutGaps(self):
+        file_name = "paklijst2.xlsx"
+
+        self.stacker.setExcelParser(path=self.excel_path, file_name=file_name)
+        self.stacker.db_manager.clearDatabase()
+        self.stacker.loadOrdersAndAddToDatabase()
+        self.stacker.start()
+
+        # an open grid in which no gap is filled is not changed
+        self.stacker.db_manager.addRectangle(Rectangle(100, 30, "4", brand="Kokos", color="antraciet", grid_width=100))
+
+        changed_grid_names = []
+        fill_gaps_of_open_grids = self.stacker.fillGapsOfOpenGrids
+        def fillGapsOfOpenGrids():
+            fill_gaps_of_open_grids()
+            changed_grid_names.extend(self.stacker.session.getChangedGridNames())
+
+        self.stacker.fillGapsOfOpenGrids = fillGapsOfOpenGrids
+        self.stacker.start(incremental=True)
+        self.assertEqual(changed_grid_names, [])
+        self.assertEqual(self.stacker.db_manager.getRectangle("4").getGridNumber(), 1)
+
+    def testStartIncrementalCachesOpenGrids(self):
+        file_name = "paklijst2.xlsx"
+
+        self.stacker.setExcelParser(path=self.excel_path, file_name=file_name)
+        self.stacker.db_manager.clearDatabase()
+        self.stacker.loadOrdersAndAddToDatabase()
+        self.stacker.start()
+
+        self.stacker.db_manager.addRectangle(Rectangle(100, 30, "4", brand="Kokos", color="antraciet", grid_width=100))
+        self.stacker.start(incremental=True)
+        cached_grid = self.stacker.open_grids[1][1]
+        self.assertEqual(cached_grid.getNumStackedRectangles(), 4)
+
+        # the next run fills the gaps of the cached grid, its free space is not built again
+        self.stacker.db_manager.addRectangle(Rectangle(20, 40, "5", brand="Kokos", color="antraciet", grid_width=100))
+        free_space_index = cached_grid.getFreeSpaceIndex()
+
+        filled_grids = []
+        fill_gaps_of_open_grids = self.stacker.fillGapsOfOpenGrids
+        def fillGapsOfOpenGrids():
+            fill_gaps_of_open_grids()
+            filled_grids.append((self.stacker.grid, self.stacker.grid.getFreeSpaceIndex()))
+
+        self.stacker.fillGapsOfOpenGrids = fillGapsOfOpenGrids
+        self.stacker.start(incremental=True)
+        self.assertIs(filled_grids[0][0], cached_grid)
+        self.assertIs(filled_grids[0][1], free_space_index)
+        self.assertEqual(self.stacker.db_manager.getRectangle("5").getGridNumber(), 1)
+
+    def testStartStoppedAfterCoupages(self):
+        self.stacker.db_manager.clearDatabase()
+        self.stacker.db_manager.addRectangle(Rectangle(80, 50, "coupage", brand="kokos", grid_width=100, coupage_batch="coupage"))
+        self.stacker.db_manager.addRectangle(Rectangle(50, 50, "batch", brand="kokos", grid_width=100))
+
+        # the operator presses stop while the batch orders are stacked
+        self.stacker.stackGrids = lambda automatic: self.stacker.stopStacking()
+        self.stacker.start()
+
+        # the exported coupage stays stacked, the batch order is not saved
+        self.assertEqual([rectangle.getName() for rectangle in self.stacker.db_manager.getUnstackedRectangles(coupage_batch="coupage")], [])
+        self.assertEqual(len(self.stacker.db_manager.getUnstackedRectangles()), 1)
+
     def testComputeStackingPosition1(self):
         self.stacker = Stacker()
         self.grid_1.empty()
@@ -170,6 +318,166 @@ class StackerTest(unittest.TestCase):
         self.assertEqual(stacking_position[0], 100)
         self.assertEqual(stacking_position[1], 1125)
     
+    def testComputeStackingPositionSkyline(self):
+        self.grid_1.empty()
+        self.stacker.setPlacementEngine(SkylinePlacementEngine())
+        self.stacker.setGrid(self.grid_1)
+
+        self.stacker.setRectangle(self.rectangle_3)
+        stacking_position = self.stacker.computeStackingPosition()
+        self.assertEqual(stacking_position[0], 50)
+        self.assertEqual(stacking_position[1], 50)
+        self.rectangle_3.setPosition(stacking_position)
+        self.grid_1.addRectangle(self.rectangle_3)
+
+        self.stacker.setRectangle(self.rectangle_6)
+        stacking_position = self.stacker.computeStackingPosition()
+        self.assertEqual(stacking_position[0], 150)
+        self.assertEqual(stacking_position[1], 50)
+        self.rectangle_6.setPosition(stacking_position)
+        self.grid_1.addRectangle(self.rectangle_6)
+
+        self.stacker.setRectangle(self.rectangle_4)
+        stacking_position = self.stacker.computeStackingPosition()
+        self.assertEqual(stacking_position[0], 100)
+        self.assertEqual(stacking_position[1], 150)
+
+    def testComputeStackingPositionSkylineDoesNotFit(self):
+        self.grid_1.empty()
+        self.stacker.setPlacementEngine(SkylinePlacementEngine())
+        self.stacker.setGrid(self.grid_1)
+        self.stacker.setRectangle(Rectangle(201, 100, 8))
+        stacking_position = self.stacker.computeStackingPosition()
+
+        self.assertEqual(stacking_position[0], self.grid_1.getWidth())
+        self.assertEqual(stacking_position[1], self.grid_1.getHeight())
+
+    def testComputeStackingPositionEnginesAgree(self):
+        random.seed(0)
+        brute_force_grid = Grid(60, 60, 2)
+        free_space_grid = Grid(60, 60, 3)
+        brute_force_engine = BruteForcePlacementEngine()
+        free_space_engine = FreeSpacePlacementEngine()
+
+        for i in range(12):
+            rectangle = Rectangle(random.randint(5, 20), random.randint(5, 20), i)
+            brute_force_position = brute_force_engine.computeStackingPosition(brute_force_grid, rectangle)
+            free_space_position = free_space_engine.computeStackingPosition(free_space_grid, rectangle)
+            self.assertEqual(list(brute_force_position), list(free_space_position))
+
+            rectangle.setPosition(free_space_position)
+            if brute_force_grid.isValidPosition(rectangle):
+                brute_force_grid.addRectangle(rectangle)
+                free_space_grid.addRectangle(rectangle)
+
+    def testComputeStackingPositionAllEnginesAgree(self):
+        random.seed(0)
+        brute_force_grid = Grid(60, 60, 2)
+        brute_force_engine = BruteForcePlacementEngine()
+
+        # every engine keeps the indices of its own grid up to date
+        engines = [FreeSpacePlacementEngine(), FitMapPlacementEngine(), NormOrderedPlacementEngine()]
+        grids = [Grid(60, 60, 3 + i) for i in range(len(engines))]
+
+        for i in range(12):
+            rectangle = Rectangle(random.randint(5, 20), random.randint(5, 20), i)
+            brute_force_position = brute_force_engine.computeStackingPosition(brute_force_grid, rectangle)
+
+            for engine, grid in zip(engines, grids):
+                position = engine.computeStackingPosition(grid, rectangle)
+                self.assertEqual(list(brute_force_position), list(position), engine.getName())
+
+            rectangle.setPosition(brute_force_position)
+            if brute_force_grid.isValidPosition(rectangle):
+                brute_force_grid.addRectangle(rectangle)
+                for grid in grids:
+                    grid.addRectangle(rectangle)
+
+    def testDefaultPlacementEngine(self):
+        self.assertEqual(Stacker().getPlacementEngine().getName(), "NormOrderedPlacementEngine")
+
+    def testStackOnMillimetersNotSupported(self):
+        self.stacker.setPlacementEngine(FitMapPlacementEngine())
+        self.assertRaises(StackOnMillimetersNotSupportedError, self.stacker.setStackOnMillimeters, True)
+        self.assertFalse(self.stacker.getStackOnMillimeters())
+
+        self.stacker.setPlacementEngine(FreeSpacePlacementEngine())
+        self.stacker.setStackOnMillimeters(True)
+        self.assertRaises(StackOnMillimetersNotSupportedError, self.stacker.setPlacementEngine, BruteForcePlacementEngine())
+        self.assertEqual(self.stacker.getPlacementEngine().getName(), "FreeSpacePlacementEngine")
+
+    def testComputeStackingPositionWarmStart(self):
+        grid = Grid(100, 200, 2)
+        brute_force_engine = BruteForcePlacementEngine()
+        norm_ordered_engine = NormOrderedPlacementEngine()
+
+        # identical rectangles resume the search where the previous one was placed
+        for i in range(5):
+            rectangle = Rectangle(30, 40, i)
+            position = norm_ordered_engine.computeStackingPosition(grid, rectangle)
+            self.assertEqual(list(brute_force_engine.computeStackingPosition(grid, rectangle)), list(position))
+            self.assertEqual(grid.getWarmStart(30, 40), (position[0]**2 + position[1]**2, position[0]))
+
+            rectangle.setPosition(position)
+            grid.addRectangle(rectangle)
+
+        # removing a rectangle frees space, the search starts at the origin again
+        grid.removeRectangle(Rectangle(30, 40, 0))
+        self.assertIsNone(grid.getWarmStart(30, 40))
+        self.assertEqual(list(norm_ordered_engine.computeStackingPosition(grid, Rectangle(30, 40, 5))), [15, 20])
+
+    def testComputeOriginalAndRotatedStackingPositions(self):
+        random.seed(1)
+        grid = Grid(60, 60, 2)
+        brute_force_engine = BruteForcePlacementEngine()
+        norm_ordered_engine = NormOrderedPlacementEngine()
+
+        for i in range(12):
+            rectangle = Rectangle(random.randint(5, 30), random.randint(5, 20), i)
+            positions = brute_force_engine.computeOriginalAndRotatedStackingPositions(grid, rectangle)
+            pruned_positions = norm_ordered_engine.computeOriginalAndRotatedStackingPositions(grid, rectangle)
+
+            # the rotated rectangle is only chosen when it is closer to the origin
+            is_rotated = np.linalg.norm(positions[1]) < np.linalg.norm(positions[0])
+            self.assertEqual(is_rotated, np.linalg.norm(pruned_positions[1]) < np.linalg.norm(pruned_positions[0]))
+            self.assertEqual(list(positions[int(is_rotated)]), list(pruned_positions[int(is_rotated)]))
+
+            if is_rotated:
+                rectangle.rotate()
+            rectangle.setPosition(positions[int(is_rotated)])
+            if grid.isValidPosition(rectangle):
+                grid.addRectangle(rectangle)
+
+    def testComputeRectangleOrder(self):
+        rectangles = [Rectangle(100, 20, 1), Rectangle(50, 50, 2), Rectangle(30, 90, 3)]
+
+        self.assertEqual([r.getName() for r in self.stacker.computeRectangleOrder(rectangles)], ["3", "2", "1"])
+
+        self.stacker.setOrderings(["longest_side"])
+        self.assertEqual([r.getName() for r in self.stacker.computeRectangleOrder(rectangles)], ["1", "3", "2"])
+
+        # equal perimeters keep the reversed order, like equal areas
+        self.stacker.setOrderings(["perimeter", "height"])
+        self.assertEqual([r.getName() for r in self.stacker.computeRectangleOrder(rectangles)], ["3", "1", "2"])
+
+        with self.assertRaises(UnknownOrderingError):
+            self.stacker.setOrderings(["random"])
+
+    def testStackTileOfIdenticalRectangles(self):
+        grid = Grid(200, 1230, 1)
+        self.stacker.setGrid(grid)
+        self.stacker.setTileIdenticalRectangles(True)
+        self.stacker.startStacking()
+
+        # one by one the rectangles end at 340, as a tile of three columns at 320
+        self.stacker.rectangles = [Rectangle(60, 80, str(i)) for i in range(12)]
+        self.stacker.stackUnstackedRectanglesInGrid()
+
+        rectangles = grid.getStackedRectangles()
+        self.assertEqual(len(rectangles), 12)
+        self.assertEqual(grid.getHighestVerticalPoint(), 320)
+        self.assertFalse(any(a.intersection(b) for i, a in enumerate(rectangles) for b in rectangles[i+1:]))
+
     # only turn on when working on more optimal stacking
     # of smaller grid widths in larger ones
     
@@ -0,0 +1,103 @@
+import unittest
+import sys
+
+from rectangle_packing.rectangle import Rectangle
+from rectangle_packing.grid import Grid
+from rectangle_packing.database_manager import DatabaseManager
+from rectangle_packing.stacking_session import StackingSession
+
+class StackingSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.rectangle = Rectangle(width=50, height=80, name="123456", brand="kokos", grid_width=100)
+        self.db_manager = DatabaseManager()
+        self.db_manager.clearDatabase()
+        self.db_manager.addRectangle(self.rectangle)
+
+        self.session = StackingSession(self.db_manager)
+        self.session.load()
+
+    def tearDown(self):
+        pass
+
+    def stackRectangleInNewGrid(self):
+        grid = self.session.createUniqueGrid(width=100, height=1230)
+        self.rectangle.setPosition([25, 40])
+        self.rectangle.setStacked()
+        self.rectangle.setGridNumber(grid.getName())
+        grid.addRectangle(self.rectangle)
+
+        self.session.updateRectangle(self.rectangle)
+        self.session.updateGrid(grid)
+
+        return grid
+
+    def testCommit(self):
+        grid = self.stackRectangleInNewGrid()
+
+        # nothing is written before the commit
+        self.assertEqual(len(self.session.getUnstackedRectangles()), 0)
+        self.assertEqual(len(self.db_manager.getUnstackedRectangles()), 1)
+        self.assertEqual(len(self.db_manager.listUsedGridNames()), 0)
+
+        self.session.commit()
+        self.assertEqual(self.session.getNumChanges(), 0)
+        self.assertEqual(len(self.db_manager.getUnstackedRectangles()), 0)
+        self.assertEqual(self.db_manager.getGrid(grid.getName()).getNumStackedRectangles(), 1)
+
+        rectangle = self.db_manager.getRectangle("123456")
+        self.assertEqual(rectangle.getPosition()[0], 25)
+        self.assertEqual(rectangle.getPosition()[1], 40)
+
+    def testCommitOnlyChangedFields(self):
+        # another client changes the order while the session is open
+        self.db_manager.rectangles_collection.update_one({"name": "123456"}, {"$set": {"client_name": "Dhr. Jansen"}})
+        self.stackRectangleInNewGrid()
+
+        self.session.commit()
+        rectangle = self.db_manager.getRectangle("123456")
+        self.assertEqual(rectangle.getClientName(), "Dhr. Jansen")
+        self.assertTrue(rectangle.isStacked())
+
+    def testRollback(self):
+        self.stackRectangleInNewGrid()
+        self.session.addRectangle(Rectangle(width=60, height=90, name="Voorraad_60x90", brand="kokos", grid_width=100))
+
+        self.session.rollback()
+        self.assertEqual(self.session.getNumChanges(), 0)
+        self.assertEqual(len(self.session.getUnstackedRectangles()), 1)
+        self.assertEqual(len(self.session.listUsedGridNames()), 0)
+
+        self.session.commit()
+        self.assertEqual(len(self.db_manager.getUnstackedRectangles()), 1)
+        self.assertEqual(len(self.db_manager.listUsedGridNames()), 0)
+
+    def testEmptyGrid(self):
+        grid = self.stackRectangleInNewGrid()
+
+        self.session.emptyGrid(grid)
+        self.assertEqual(len(self.session.getUnstackedRectangles()), 1)
+        self.assertEqual(self.session.getGrid(grid.getName()).getNumStackedRectangles(), 0)
+
+        # methods of the DatabaseManager that work on the collections directly are not part of the session
+        self.assertFalse(hasattr(self.session, "getGridsCut"))
+
+    def testPartitions(self):
+        self.db_manager.addRectangle(Rectangle(width=50, height=80, name="654321", brand="kokos", grid_width=200))
+        self.session.load()
+
+        partitions = self.session.getPartitions()
+        self.assertEqual(len(partitions), 2)
+        self.assertEqual(len(self.session.getPartitions(use_grid_width=False)), 1)
+
+        # a grid created in a partition is numbered after the grids of the session when merged
+        partition_session = StackingSession(self.db_manager)
+        partition_session.loadDocuments(*partitions[1])
+        partition_session.createUniqueGrid(width=200, height=605)
+        self.session.createUniqueGrid(width=100, height=1230)
+
+        self.session.mergeChanges(partition_session.getChanges())
+        self.assertEqual(sorted(self.session.listUsedGridNames()), [1, 2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+import xml.etree.cElementTree as ET
+from xml.dom import minidom
+
+from rectangle_packing.zcc_creator import ZccCreator
+
+class ZccCreatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.zcc_creator = ZccCreator("Kokos", "test")
+
+    def tearDown(self):
+        pass
+
+    def testSerializeElement(self):
+        geometry = ET.Element("Geometry")
+        label = ET.SubElement(geometry, "Label", {"Text": 'Mevr. "de Vries" & <Zn>', "Height": "100.00"})
+        ET.SubElement(label, "Position", {"X": "0", "Y": "500"})
+        ET.SubElement(geometry, "Description").text = "Stacker output"
+
+        # the streamed lines are the same as the pretty print of minidom
+        pretty_xml = minidom.parseString(ET.tostring(geometry)).toprettyxml(indent="   ")
+        self.assertEqual("".join(self.zcc_creator.serializeElement(geometry, 0)), pretty_xml.split("\n", 1)[1])
+
+if __name__ == '__main__':
+    unittest.main()